@@ -0,0 +1,163 @@
+"""
+Local stand-in for the Cartesia TTS API, for offline tests and benchmarks.
+
+Speaks the same protocol as the real service: POST /tts/bytes (whole
+utterance) and the /tts/websocket continuation protocol (`context_id`,
+`continue`, `cancel`, base64 `chunk` messages and `done`). Instead of
+speech it renders a quiet tone whose duration grows with the text, with a
+fixed time to first byte and a configurable real-time factor.
+
+Text in a continuation context is spoken phrase by phrase: at punctuation,
+when the context is closed, or after `max_buffer_delay_ms` without new
+text.
+
+Usage:
+    python -m benchmarks.cartesia_standin --port 8765
+    # then CartesiaTTS(api_key="x", base_url="http://127.0.0.1:8765", websocket=True, sample_rate=16000)
+"""
+import argparse
+import asyncio
+import base64
+import json
+import re
+
+import numpy as np
+from aiohttp import web, WSMsgType
+
+_PHRASE_END = re.compile(r"[.!?,;:]\s*$")
+
+
+class StandInSynth:
+    """Timing model shared by both endpoints."""
+
+    def __init__(self, ttfb_ms: float = 120, rtf: float = 0.15, ms_per_char: float = 65, chunk_ms: float = 40):
+        self.ttfb = ttfb_ms / 1000
+        self.rtf = rtf
+        self.ms_per_char = ms_per_char
+        self.chunk_ms = chunk_ms
+
+    def render(self, text: str, sample_rate: int) -> bytes:
+        n = int(len(text.strip()) * self.ms_per_char / 1000 * sample_rate)
+        t = np.arange(n) / sample_rate
+        return (np.sin(2 * np.pi * 220 * t) * 3000).astype(np.int16).tobytes()
+
+    async def chunks(self, text: str, sample_rate: int):
+        """Yield the audio of `text` in chunk_ms pieces, paced by the real-time factor."""
+        pcm = self.render(text, sample_rate)
+        step = int(sample_rate * self.chunk_ms / 1000) * 2
+        await asyncio.sleep(self.ttfb)
+        for start in range(0, len(pcm), step):
+            await asyncio.sleep(self.chunk_ms / 1000 * self.rtf)
+            yield pcm[start:start + step]
+
+
+class _Context:
+    def __init__(self, ws, synth: StandInSynth, request: dict):
+        self.ws = ws
+        self.synth = synth
+        self.context_id = request["context_id"]
+        self.sample_rate = request["output_format"]["sample_rate"]
+        self.max_delay = request.get("max_buffer_delay_ms", 3000) / 1000
+        self.buffer = ""
+        self.closed = False
+        self.phrases: asyncio.Queue = asyncio.Queue()
+        self.arrived = asyncio.Event()
+        self.speaker = asyncio.create_task(self._speak())
+        self.flusher = asyncio.create_task(self._flush_on_delay())
+
+    def add(self, text: str, more: bool):
+        self.buffer += text
+        if _PHRASE_END.search(self.buffer) or not more:
+            self._flush()
+        if not more:
+            self.closed = True
+            self.phrases.put_nowait(None)
+        self.arrived.set()
+
+    def _flush(self):
+        if self.buffer.strip():
+            self.phrases.put_nowait(self.buffer)
+        self.buffer = ""
+
+    async def _flush_on_delay(self):
+        while not self.closed:
+            self.arrived.clear()
+            try:
+                await asyncio.wait_for(self.arrived.wait(), timeout=self.max_delay)
+            except asyncio.TimeoutError:
+                self._flush()
+
+    async def _speak(self):
+        while (phrase := await self.phrases.get()) is not None:
+            async for pcm in self.synth.chunks(phrase, self.sample_rate):
+                await self.ws.send_str(json.dumps({
+                    "type": "chunk",
+                    "data": base64.b64encode(pcm).decode(),
+                    "done": False,
+                    "status_code": 206,
+                    "context_id": self.context_id,
+                }))
+        await self.ws.send_str(json.dumps({
+            "type": "done", "done": True, "status_code": 200, "context_id": self.context_id,
+        }))
+
+    def cancel(self):
+        self.closed = True
+        self.speaker.cancel()
+        self.flusher.cancel()
+
+
+def create_app(synth: StandInSynth) -> web.Application:
+    async def tts_bytes(request: web.Request) -> web.Response:
+        body = await request.json()
+        pcm = b"".join([c async for c in synth.chunks(body["transcript"], body["output_format"]["sample_rate"])])
+        return web.Response(body=pcm, content_type="application/octet-stream")
+
+    async def tts_websocket(request: web.Request) -> web.WebSocketResponse:
+        ws = web.WebSocketResponse()
+        await ws.prepare(request)
+        contexts = {}
+        async for msg in ws:
+            if msg.type != WSMsgType.TEXT:
+                continue
+            data = json.loads(msg.data)
+            context_id = data["context_id"]
+            if data.get("cancel"):
+                if context_id in contexts:
+                    contexts.pop(context_id).cancel()
+                continue
+            if context_id not in contexts:
+                contexts[context_id] = _Context(ws, synth, data)
+            contexts[context_id].add(data.get("transcript", ""), data.get("continue", False))
+        for context in contexts.values():
+            context.cancel()
+        return ws
+
+    app = web.Application()
+    app.router.add_post("/tts/bytes", tts_bytes)
+    app.router.add_get("/tts/websocket", tts_websocket)
+    return app
+
+
+async def start(host: str = "127.0.0.1", port: int = 0, **synth_kwargs):
+    """Start the stand-in in the running loop; returns (runner, base_url)."""
+    runner = web.AppRunner(create_app(StandInSynth(**synth_kwargs)))
+    await runner.setup()
+    site = web.TCPSite(runner, host, port)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+    return runner, f"http://{host}:{port}"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline Cartesia TTS stand-in")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--ttfb-ms", type=float, default=120)
+    parser.add_argument("--rtf", type=float, default=0.15)
+    args = parser.parse_args()
+    web.run_app(create_app(StandInSynth(ttfb_ms=args.ttfb_ms, rtf=args.rtf)), host=args.host, port=args.port)
+
+
+if __name__ == "__main__":
+    main()
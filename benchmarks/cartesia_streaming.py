@@ -0,0 +1,100 @@
+"""
+Cartesia REST per sentence vs WebSocket continuation, against the local stand-in.
+
+A simulated LLM streams a reply token by token. The REST mode buffers
+tokens into TTS chunks like the pipeline does (min_tts_chars plus a
+delimiter) and posts each chunk. The WebSocket mode forwards every token
+into one continuation context. Times are measured from the first token.
+
+Usage:
+    python -m benchmarks.cartesia_streaming [--tokens-per-sec 40] [--turns 5] [--ttfb-ms 120]
+    python -m benchmarks.cartesia_streaming --base-url https://api.cartesia.ai --api-key ...
+"""
+import argparse
+import asyncio
+from time import perf_counter
+
+import numpy as np
+
+from benchmarks import cartesia_standin
+from src.tts.cartesia import CartesiaTTS
+
+REPLY = (
+    "Thank you for calling the admissions office. The fee for the undergraduate programme is "
+    "due at the start of each semester, and you can pay it online or at the accounts desk. "
+    "Is there anything else I can help you with today?"
+)
+
+
+async def _tokens(rate: float, started: list):
+    for i, word in enumerate(REPLY.split(" ")):
+        if i == 0:
+            started.append(perf_counter())
+        yield word if i == 0 else " " + word
+        await asyncio.sleep(1 / rate)
+
+
+async def _rest_turn(tts: CartesiaTTS, rate: float, min_chars: int):
+    started, first, buffer = [], None, ""
+    async for token in _tokens(rate, started):
+        buffer += token
+        if buffer.rstrip().endswith((".", "!", "?", ",")) and len(buffer.strip()) >= min_chars:
+            await tts.synthesize(buffer.strip())
+            first = first or perf_counter()
+            buffer = ""
+    if buffer.strip():
+        await tts.synthesize(buffer.strip())
+        first = first or perf_counter()
+    return (first - started[0]) * 1000, (perf_counter() - started[0]) * 1000
+
+
+async def _ws_turn(tts: CartesiaTTS, rate: float):
+    started, first = [], None
+    async for _ in tts.synthesize_text_stream(_tokens(rate, started)):
+        first = first or perf_counter()
+    return (first - started[0]) * 1000, (perf_counter() - started[0]) * 1000
+
+
+async def _run(args):
+    runner = None
+    base_url = args.base_url
+    if base_url is None:
+        runner, base_url = await cartesia_standin.start(ttfb_ms=args.ttfb_ms, rtf=args.rtf)
+
+    common = {"api_key": args.api_key, "base_url": base_url, "sample_rate": 16000}
+    rest = CartesiaTTS(output_format="pcm", **common)
+    ws = CartesiaTTS(websocket=True, **common)
+    ws.prepare()
+
+    results = {"REST per sentence": [], "WebSocket continuation": []}
+    for _ in range(args.turns):
+        results["REST per sentence"].append(await _rest_turn(rest, args.tokens_per_sec, args.min_tts_chars))
+        results["WebSocket continuation"].append(await _ws_turn(ws, args.tokens_per_sec))
+
+    print(f"{len(REPLY.split())} tokens at {args.tokens_per_sec}/s, {args.turns} turns, from first token")
+    print(f"{'mode':<24} {'first audio ms':>15} {'last audio ms':>14}")
+    for mode, rows in results.items():
+        first = np.median([r[0] for r in rows])
+        last = np.median([r[1] for r in rows])
+        print(f"{mode:<24} {first:15.0f} {last:14.0f}")
+
+    await ws.close()
+    if runner:
+        await runner.cleanup()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Cartesia REST vs WebSocket streaming")
+    parser.add_argument("--base-url", default=None, help="Real endpoint (default: start the local stand-in)")
+    parser.add_argument("--api-key", default="offline")
+    parser.add_argument("--tokens-per-sec", type=float, default=40)
+    parser.add_argument("--min-tts-chars", type=int, default=100)
+    parser.add_argument("--turns", type=int, default=5)
+    parser.add_argument("--ttfb-ms", type=float, default=120)
+    parser.add_argument("--rtf", type=float, default=0.15)
+    args = parser.parse_args()
+    asyncio.run(_run(args))
+
+
+if __name__ == "__main__":
+    main()
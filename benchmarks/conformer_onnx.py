@@ -0,0 +1,114 @@
+"""
+Real-time factor and memory of the Indic-Conformer torch path vs the int8 ONNX backend.
+
+Each backend runs in its own process so RSS numbers are not polluted by the
+other. RTF = decode time / audio duration (lower is better).
+
+Usage:
+    python -m benchmarks.conformer_onnx --onnx-dir models/indic-conformer-int8 \
+        [--audio sample.wav] [--seconds 5] [--runs 10] [--threads 4]
+"""
+import argparse
+import multiprocessing as mp
+import os
+from time import perf_counter
+
+import numpy as np
+
+SAMPLE_RATE = 16000
+
+
+def _rss_mb() -> float:
+    import psutil
+
+    return psutil.Process(os.getpid()).memory_info().rss / 2**20
+
+
+def _load_audio(path, seconds):
+    if path:
+        import soundfile as sf
+
+        audio, sr = sf.read(path, dtype="float32")
+        if audio.ndim > 1:
+            audio = audio.mean(axis=1)
+        if sr != SAMPLE_RATE:
+            import soxr
+
+            audio = soxr.resample(audio, sr, SAMPLE_RATE)
+        return audio.astype(np.float32)
+    rng = np.random.default_rng(0)
+    return (rng.standard_normal(int(seconds * SAMPLE_RATE)) * 0.05).astype(np.float32)
+
+
+def _worker(backend, args, results):
+    import torch
+
+    if args.threads:
+        torch.set_num_threads(args.threads)
+
+    audio = _load_audio(args.audio, args.seconds)
+    rss_before = _rss_mb()
+    t0 = perf_counter()
+
+    if backend == "torch":
+        from transformers import AutoModel
+
+        model = AutoModel.from_pretrained(args.model, trust_remote_code=True)
+    else:
+        from src.stt.indic_conformer_onnx import OnnxConformerModel
+
+        model = OnnxConformerModel(args.onnx_dir, num_threads=args.threads)
+
+    load_s = perf_counter() - t0
+    rss_loaded = _rss_mb()
+
+    wav = torch.from_numpy(audio).unsqueeze(0)
+    with torch.no_grad():
+        text = model(wav, args.language, "ctc")  # warm up
+        timings = []
+        for _ in range(args.runs):
+            t0 = perf_counter()
+            model(wav, args.language, "ctc")
+            timings.append(perf_counter() - t0)
+
+    duration = len(audio) / SAMPLE_RATE
+    results[backend] = {
+        "load_s": load_s,
+        "model_rss_mb": rss_loaded - rss_before,
+        "peak_rss_mb": _rss_mb(),
+        "rtf_mean": float(np.mean(timings)) / duration,
+        "rtf_p90": float(np.percentile(timings, 90)) / duration,
+        "text": text,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Indic-Conformer torch vs int8 ONNX")
+    parser.add_argument("--model", default="ai4bharat/indic-conformer-600m-multilingual")
+    parser.add_argument("--onnx-dir", default="models/indic-conformer-int8")
+    parser.add_argument("--audio", default=None, help="WAV file to decode (defaults to noise)")
+    parser.add_argument("--seconds", type=float, default=5.0)
+    parser.add_argument("--language", default="hi")
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--threads", type=int, default=None)
+    args = parser.parse_args()
+
+    ctx = mp.get_context("spawn")
+    results = ctx.Manager().dict()
+    for backend in ("torch", "onnx-int8"):
+        p = ctx.Process(target=_worker, args=(backend, args, results))
+        p.start()
+        p.join()
+
+    print(f"{'backend':<10} {'load s':>7} {'model MB':>9} {'peak MB':>8} {'RTF':>7} {'RTF p90':>8}")
+    for backend, r in results.items():
+        print(
+            f"{backend:<10} {r['load_s']:7.1f} {r['model_rss_mb']:9.0f} {r['peak_rss_mb']:8.0f} "
+            f"{r['rtf_mean']:7.3f} {r['rtf_p90']:8.3f}"
+        )
+    for backend, r in results.items():
+        print(f"{backend}: {r['text']}")
+
+
+if __name__ == "__main__":
+    main()
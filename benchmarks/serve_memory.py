@@ -0,0 +1,86 @@
+"""
+Per-worker memory of serve.py with preloading vs loading in every worker.
+
+Each mode runs in a fresh interpreter: it builds the server as serve.py does
+(preloaded in the parent, or imported by every worker), waits for the
+workers to load and start, and measures the parent and every worker. The
+parent is counted because in preload mode it holds the shared copy, so
+PSS per worker = (parent + workers PSS) / workers is what each extra worker
+really costs.
+
+Usage:
+    python -m benchmarks.serve_memory [--workers 4] [--settle 60]
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+
+MODES = {"per-worker": False, "preload": True}
+
+
+def _run(preload: bool, workers: int, settle: float):
+    """Child side: start the workers, measure, stop them, print JSON."""
+    os.environ.setdefault("HF_HUB_OFFLINE", "1")
+    os.environ.setdefault("TRANSFORMERS_OFFLINE", "1")
+
+    import serve
+
+    sock = serve._bind("127.0.0.1", 0)
+    server = serve._preload() if preload else None
+    children = serve._start_workers(sock, workers, server)
+    try:
+        time.sleep(settle)
+        parent = serve._memory_usage([os.getpid()])
+        rows = serve._memory_usage(children)
+    finally:
+        serve._stop(children)
+        for pid in children:
+            os.waitpid(pid, 0)
+    print(json.dumps({"parent": parent, "workers": rows}))
+
+
+def _measure(mode: str, workers: int, settle: float) -> dict:
+    out = subprocess.run(
+        [sys.executable, "-m", "benchmarks.serve_memory", "--run", mode,
+         "--workers", str(workers), "--settle", str(settle)],
+        capture_output=True, text=True, check=True,
+    )
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="serve.py memory: preload vs per-worker loading")
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--settle", type=float, default=60.0, help="Seconds for the workers to load and start")
+    parser.add_argument("--run", choices=list(MODES), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.run:
+        _run(MODES[args.run], args.workers, args.settle)
+        return
+
+    print(f"{'mode':<12} {'workers':>7} {'PSS/worker':>11} {'RSS/worker':>11} {'USS/worker':>11} {'parent PSS':>11}")
+    per_worker = {}
+    for mode in MODES:
+        r = _measure(mode, args.workers, args.settle)
+        n = len(r["workers"])
+        if n == 0:
+            print(f"{mode:<12} no worker survived startup")
+            continue
+        parent_pss = sum(p["pss"] for p in r["parent"])
+        pss = (parent_pss + sum(w["pss"] for w in r["workers"])) / n
+        rss = sum(w["rss"] for w in r["workers"]) / n
+        uss = sum(w["uss"] for w in r["workers"]) / n
+        per_worker[mode] = pss
+        print(f"{mode:<12} {n:>7} {pss:>8.0f} MB {rss:>8.0f} MB {uss:>8.0f} MB {parent_pss:>8.0f} MB")
+
+    if len(per_worker) == len(MODES):
+        saved = per_worker["per-worker"] - per_worker["preload"]
+        print(f"\npreload saves {saved:.0f} MB PSS per worker ({saved / per_worker['per-worker']:.0%})")
+
+
+if __name__ == "__main__":
+    main()
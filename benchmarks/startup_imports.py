@@ -0,0 +1,77 @@
+"""
+Import time and RSS of every provider module, each in a fresh interpreter.
+
+Shows what each provider costs at startup, what the old eager factory
+(importing all of them) cost compared to the lazy registry, and what the
+server as configured in main.py costs (its imports plus building every
+provider, the shared VAD included).
+
+Usage:
+    python -m benchmarks.startup_imports [--repeat 3]
+"""
+import argparse
+import json
+import subprocess
+import sys
+
+import numpy as np
+
+from src.factory import _REGISTRY
+
+PROBE = """
+import json, sys, time
+import psutil
+def rss():
+    return psutil.Process().memory_info().rss / 2**20
+before = rss()
+t0 = time.perf_counter()
+ok = True
+for name in sys.argv[1:]:
+    try:
+        __import__(name)
+    except Exception as e:
+        ok = repr(e)
+print(json.dumps({"s": time.perf_counter() - t0, "mb": rss() - before, "ok": ok}))
+"""
+
+
+def _measure(modules, repeat):
+    runs = []
+    for _ in range(repeat):
+        out = subprocess.run(
+            [sys.executable, "-c", PROBE, *modules],
+            capture_output=True, text=True, check=True,
+        )
+        runs.append(json.loads(out.stdout.strip().splitlines()[-1]))
+    return {
+        "s": float(np.median([r["s"] for r in runs])),
+        "mb": float(np.median([r["mb"] for r in runs])),
+        "ok": runs[-1]["ok"],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Startup import cost per provider")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    rows = []
+    for kind, providers in _REGISTRY.items():
+        for provider, path in providers.items():
+            module = path.partition(":")[0]
+            rows.append((f"{kind}:{provider}", [module]))
+
+    all_modules = sorted({p.partition(":")[0] for providers in _REGISTRY.values() for p in providers.values()})
+    rows.append(("eager factory (all providers)", all_modules))
+    rows.append(("lazy factory", ["src.factory"]))
+    rows.append(("server (import main)", ["main"]))
+
+    print(f"{'import':<32} {'time s':>7} {'RSS MB':>7}")
+    for label, modules in rows:
+        r = _measure(modules, args.repeat)
+        note = "" if r["ok"] is True else f"  (failed: {r['ok']})"
+        print(f"{label:<32} {r['s']:7.2f} {r['mb']:7.0f}{note}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+"""
+Per-frame CPU and allocation cost of the Indic-Conformer streaming front end.
+
+Compares the old path (PCM16 -> float32 copy, Python RMS, deque append and a
+concatenate per utterance) with the preallocated ring buffer, with and
+without the silero VAD.
+
+Usage:
+    python -m benchmarks.stt_frame_cost [--seconds 30] [--vad-model path/to/silero_vad.onnx]
+"""
+import argparse
+import tracemalloc
+from collections import deque
+from time import perf_counter
+
+import numpy as np
+
+from src.stt.ring_buffer import AudioRingBuffer
+from src.stt.vad import Endpointer, SileroVAD
+
+SAMPLE_RATE = 16000
+MESSAGE_SAMPLES = 4096  # what index.html's ScriptProcessor sends per message
+FRAME = 512
+
+
+def _messages(seconds: float):
+    rng = np.random.default_rng(0)
+    n = int(seconds * SAMPLE_RATE) // MESSAGE_SAMPLES * MESSAGE_SAMPLES
+    pcm = (rng.standard_normal(n) * 3000).astype(np.int16)
+    return [pcm[i:i + MESSAGE_SAMPLES].tobytes() for i in range(0, len(pcm), MESSAGE_SAMPLES)]
+
+
+# Each benchmark sets up its per-session state once and returns the per-message loop
+
+def legacy():
+    chunks = deque()
+
+    def run(messages):
+        for i, msg in enumerate(messages):
+            chunk = np.frombuffer(msg, dtype=np.int16).astype(np.float32) / 32768.0
+            if np.sqrt(np.mean(chunk ** 2)) >= 0.02:
+                chunks.append(chunk)
+            if i % 12 == 11:  # ~3 s utterances
+                np.concatenate(chunks)
+                chunks.clear()
+    return run
+
+
+def ring_only():
+    ring = AudioRingBuffer(25 * SAMPLE_RATE, FRAME)
+
+    def run(messages):
+        start = ring.write_pos
+        for i, msg in enumerate(messages):
+            ring.write_pcm16(msg)
+            if i % 12 == 11:
+                ring.read(start, ring.write_pos)
+                start = ring.write_pos
+    return run
+
+
+def ring_vad(vad: SileroVAD):
+    ring = AudioRingBuffer(25 * SAMPLE_RATE, FRAME)
+    state = vad.new_state()
+    endpointer = Endpointer(0.5, 9, 8)
+
+    def run(messages):
+        pos = ring.write_pos
+        for msg in messages:
+            ring.write_pcm16(msg)
+            while ring.write_pos - pos >= FRAME:
+                endpointer.update(vad.speech_prob(ring.frame(pos), state))
+                pos += FRAME
+    return run
+
+
+def measure(name, run, messages, frames):
+    run(messages)  # warm up
+    t0 = perf_counter()
+    run(messages)
+    cpu_us = (perf_counter() - t0) / frames * 1e6
+
+    tracemalloc.start()
+    run(messages)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    print(f"{name:<28} {cpu_us:8.2f} us/frame   peak transient alloc {peak / 1024:8.1f} KiB")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--seconds", type=float, default=30.0)
+    parser.add_argument("--vad-model", default=None, help="Path to silero_vad.onnx")
+    args = parser.parse_args()
+
+    messages = _messages(args.seconds)
+    frames = len(messages) * MESSAGE_SAMPLES // FRAME
+    print(f"{args.seconds:.0f} s of audio, {frames} frames of {FRAME} samples\n")
+
+    measure("legacy (astype + RMS)", legacy(), messages, frames)
+    measure("ring buffer", ring_only(), messages, frames)
+    measure("ring buffer + silero VAD", ring_vad(SileroVAD(args.vad_model)), messages, frames)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,133 @@
+"""
+Latency and BLEU of IndicTrans2 on HF PyTorch vs the CTranslate2 int8 backend.
+
+Each backend runs in its own process. Sentences are translated one at a
+time, as the pipeline does. BLEU is computed against the references, and
+the CTranslate2 output is also scored against the HF output (agreement).
+
+Usage:
+    python -m benchmarks.translation_ct2 --ct2-dir models/indictrans2-indic-en-1B-ct2 \
+        [--src hi.txt --ref en.txt] [--beams 1] [--threads 4] [--runs 3]
+"""
+import argparse
+import multiprocessing as mp
+import os
+from time import perf_counter
+
+import numpy as np
+
+# Small call-centre style sample used when no files are given
+SAMPLE = [
+    ("नमस्ते, मुझे अपने ऑर्डर के बारे में जानकारी चाहिए।", "Hello, I need information about my order."),
+    ("मेरा पार्सल अभी तक नहीं आया है।", "My parcel has not arrived yet."),
+    ("क्या आप मुझे फीस के बारे में बता सकते हैं?", "Can you tell me about the fees?"),
+    ("मैं अपना पासवर्ड भूल गया हूँ।", "I have forgotten my password."),
+    ("कृपया मेरा कॉल किसी अधिकारी से जोड़ दीजिए।", "Please connect my call to an officer."),
+    ("मुझे रिफंड कब तक मिलेगा?", "When will I get the refund?"),
+    ("आपका ऑफिस कितने बजे खुलता है?", "What time does your office open?"),
+    ("मैं अपना पता बदलना चाहता हूँ।", "I want to change my address."),
+    ("कल मेरे खाते से दो बार पैसे कट गए।", "Yesterday money was deducted twice from my account."),
+    ("धन्यवाद, आपने मेरी बहुत मदद की।", "Thank you, you helped me a lot."),
+]
+
+
+def _rss_mb() -> float:
+    import psutil
+
+    return psutil.Process(os.getpid()).memory_info().rss / 2**20
+
+
+def _load(args):
+    if args.src:
+        with open(args.src, encoding="utf-8") as f:
+            src = [line.strip() for line in f if line.strip()]
+        refs = None
+        if args.ref:
+            with open(args.ref, encoding="utf-8") as f:
+                refs = [line.strip() for line in f if line.strip()]
+        return src, refs
+    return [s for s, _ in SAMPLE], [r for _, r in SAMPLE]
+
+
+def _worker(backend, args, results):
+    src, _ = _load(args)
+    rss_before = _rss_mb()
+    t0 = perf_counter()
+
+    if backend == "hf":
+        import torch
+
+        if args.threads:
+            torch.set_num_threads(args.threads)
+        from src.translators.indicTrans2 import IndicTrans2Translator
+
+        translator = IndicTrans2Translator(model_name=args.model, device="cpu")
+        kwargs = {"num_beams": 5}  # what the pipeline uses today
+    else:
+        from src.translators.indicTrans2_ct2 import CT2IndicTrans2Translator
+
+        translator = CT2IndicTrans2Translator(
+            args.ct2_dir,
+            beam_size=args.beams,
+            intra_threads=args.threads or 0,
+        )
+        kwargs = {}
+
+    load_s = perf_counter() - t0
+    rss_loaded = _rss_mb()
+
+    translator.translate(src[0], **kwargs)  # warm up
+    timings, outputs = [], []
+    for _ in range(args.runs):
+        outputs = []
+        for sentence in src:
+            t0 = perf_counter()
+            outputs.append(translator.translate(sentence, **kwargs))
+            timings.append((perf_counter() - t0) * 1000)
+
+    results[backend] = {
+        "load_s": load_s,
+        "model_rss_mb": rss_loaded - rss_before,
+        "mean_ms": float(np.mean(timings)),
+        "p90_ms": float(np.percentile(timings, 90)),
+        "outputs": outputs,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="IndicTrans2 HF vs CTranslate2 int8")
+    parser.add_argument("--model", default="ai4bharat/indictrans2-indic-en-1B")
+    parser.add_argument("--ct2-dir", default="models/indictrans2-indic-en-1B-ct2")
+    parser.add_argument("--src", default=None, help="Source sentences, one per line")
+    parser.add_argument("--ref", default=None, help="Reference translations, one per line")
+    parser.add_argument("--beams", type=int, default=1, help="CTranslate2 beam size")
+    parser.add_argument("--threads", type=int, default=None)
+    parser.add_argument("--runs", type=int, default=3)
+    args = parser.parse_args()
+
+    import sacrebleu
+
+    _, refs = _load(args)
+
+    ctx = mp.get_context("spawn")
+    results = ctx.Manager().dict()
+    for backend in ("hf", "ct2-int8"):
+        p = ctx.Process(target=_worker, args=(backend, args, results))
+        p.start()
+        p.join()
+
+    print(f"{'backend':<9} {'load s':>7} {'model MB':>9} {'mean ms':>8} {'p90 ms':>7} {'BLEU':>6}")
+    for backend, r in results.items():
+        bleu = sacrebleu.corpus_bleu(r["outputs"], [refs]).score if refs else float("nan")
+        print(
+            f"{backend:<9} {r['load_s']:7.1f} {r['model_rss_mb']:9.0f} "
+            f"{r['mean_ms']:8.0f} {r['p90_ms']:7.0f} {bleu:6.1f}"
+        )
+
+    if "hf" in results and "ct2-int8" in results:
+        agreement = sacrebleu.corpus_bleu(results["ct2-int8"]["outputs"], [results["hf"]["outputs"]]).score
+        print(f"BLEU of ct2-int8 against hf output: {agreement:.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+"""
+Per-sentence TTS latency with several sessions speaking at once.
+
+Every session speaks the same sentences one after another through
+synthesize(), all sessions start together. The provider is built once per
+pool size, so an engine pool can be compared against a single instance.
+
+Usage:
+    python -m benchmarks.tts_concurrency --provider pyttsx3 [--sessions 1,2,4,8] [--pool-sizes 1,4]
+    python -m benchmarks.tts_concurrency --provider coqui --pool-sizes 1,2 --kw model_name=tts_models/en/ljspeech/glow-tts
+"""
+import argparse
+import asyncio
+from time import perf_counter
+
+import numpy as np
+
+from benchmarks.tts_first_audio import SENTENCES
+from src.factory import ProviderFactory
+
+
+async def _session(tts, timings: list):
+    for text in SENTENCES:
+        t0 = perf_counter()
+        await tts.synthesize(text)
+        timings.append((perf_counter() - t0) * 1000)
+
+
+async def _run(args):
+    kwargs = {}
+    for item in args.kw:
+        key, _, value = item.partition("=")
+        kwargs[key] = value
+
+    print(f"{args.provider}: per-sentence latency, {len(SENTENCES)} sentences per session")
+    print(f"{'pool':>4} {'sessions':>8} {'p50 ms':>7} {'p90 ms':>7} {'sentences/s':>12}")
+    for pool_size in [int(n) for n in args.pool_sizes.split(",")]:
+        tts = ProviderFactory.create_tts(args.provider, pool_size=pool_size, **kwargs)
+        await tts.synthesize("Warm up.")
+
+        for sessions in [int(n) for n in args.sessions.split(",")]:
+            timings = []
+            t0 = perf_counter()
+            await asyncio.gather(*(_session(tts, timings) for _ in range(sessions)))
+            elapsed = perf_counter() - t0
+            print(
+                f"{pool_size:4d} {sessions:8d} {np.percentile(timings, 50):7.0f} "
+                f"{np.percentile(timings, 90):7.0f} {len(timings) / elapsed:12.1f}"
+            )
+
+        if hasattr(tts, "close"):
+            await tts.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="TTS latency under concurrent sessions")
+    parser.add_argument("--provider", default="pyttsx3")
+    parser.add_argument("--kw", action="append", default=[], help="Extra constructor argument key=value")
+    parser.add_argument("--sessions", default="1,2,4,8", help="Comma-separated concurrent session counts")
+    parser.add_argument("--pool-sizes", default="1,4", help="Comma-separated engine pool sizes")
+    args = parser.parse_args()
+    asyncio.run(_run(args))
+
+
+if __name__ == "__main__":
+    main()
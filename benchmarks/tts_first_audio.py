@@ -0,0 +1,135 @@
+"""
+Time to first audio of a TTS provider, streamed vs whole-sentence.
+
+For every sentence the provider is asked through synthesize_stream()
+(time until the first audio chunk) and through synthesize() (time until
+the complete sentence, which is when the pipeline used to get its first
+byte). For Azure the previous implementation, which created a synthesizer
+per call and blocked in speak_text, is measured as well, and for Edge the
+previous whole-sentence MP3 collection.
+
+Usage:
+    python -m benchmarks.tts_first_audio --provider azure [--runs 3] [--kw voice=hi-IN-SwaraNeural]
+    python -m benchmarks.tts_first_audio --provider piper --kw model_path=models/en_US-lessac-medium.onnx
+    python -m benchmarks.tts_first_audio --provider edge --kw voice=en-US-AriaNeural
+"""
+import argparse
+import asyncio
+import os
+from time import perf_counter
+
+import numpy as np
+from dotenv import load_dotenv
+
+from src.factory import ProviderFactory
+
+SENTENCES = [
+    "Hello, thank you for calling. How can I help you today?",
+    "Your order was shipped yesterday and should arrive within two days.",
+    "The admissions office is open from nine in the morning to five in the evening.",
+    "I have forwarded your request to the accounts team, they will call you back.",
+]
+
+# Constructor arguments read from the environment
+PROVIDER_ENV = {
+    "azure": {"speech_key": "AZURE_SPEECH_KEY", "region": "AZURE_SPEECH_REGION"},
+    "openai": {"api_key": "OPENAI_API_KEY"},
+    "gemini": {"api_key": "GOOGLE_API_KEY"},
+    "cartesia": {"api_key": "CARTESIA_API_KEY"},
+}
+
+
+def _azure_legacy_sync(tts, text: str) -> bytes:
+    import azure.cognitiveservices.speech as speechsdk
+
+    synthesizer = speechsdk.SpeechSynthesizer(speech_config=tts.speech_config, audio_config=None)
+    result = synthesizer.speak_text(text)
+    if result.reason != speechsdk.ResultReason.SynthesizingAudioCompleted:
+        raise RuntimeError(f"Azure TTS failed: {result.reason}")
+    return result.audio_data
+
+
+async def _azure_legacy(tts, text: str) -> bytes:
+    """What AzureTTS.synthesize did before: a new synthesizer per call, blocking speak_text."""
+    return await asyncio.to_thread(_azure_legacy_sync, tts, text)
+
+
+async def _edge_legacy(tts, text: str) -> bytes:
+    """What EdgeTTS.synthesize did before: concatenate the whole MP3 stream, then return it."""
+    import edge_tts
+
+    communicate = edge_tts.Communicate(text=text, voice=tts.voice, rate=tts.rate, volume=tts.volume, pitch=tts.pitch)
+    audio_data = b""
+    async for chunk in communicate.stream():
+        if chunk["type"] == "audio":
+            audio_data += chunk["data"]
+    return audio_data
+
+
+# Previous implementations measured alongside the current one
+LEGACY = {
+    "azure": ("legacy per-call synthesizer", _azure_legacy),
+    "edge": ("legacy whole-sentence MP3", _edge_legacy),
+}
+
+
+async def _first_chunk_ms(tts, text: str) -> float:
+    t0 = perf_counter()
+    first = None
+    async for _ in tts.synthesize_stream(text):
+        if first is None:
+            first = (perf_counter() - t0) * 1000
+    return first
+
+
+async def _run(args):
+    kwargs = {k: os.getenv(v) for k, v in PROVIDER_ENV.get(args.provider, {}).items()}
+    for item in args.kw:
+        key, _, value = item.partition("=")
+        kwargs[key] = value
+    tts = ProviderFactory.create_tts(args.provider, **kwargs)
+
+    # Let pre-connected providers finish connecting, then warm up
+    await asyncio.sleep(1.0)
+    await tts.synthesize("Warm up.")
+
+    rows = {"stream first audio": [], "synthesize() complete": []}
+    legacy = LEGACY.get(args.provider)
+    if legacy:
+        rows[legacy[0]] = []
+
+    for _ in range(args.runs):
+        for text in SENTENCES:
+            rows["stream first audio"].append(await _first_chunk_ms(tts, text))
+
+            t0 = perf_counter()
+            await tts.synthesize(text)
+            rows["synthesize() complete"].append((perf_counter() - t0) * 1000)
+
+            if legacy:
+                t0 = perf_counter()
+                await legacy[1](tts, text)
+                rows[legacy[0]].append((perf_counter() - t0) * 1000)
+
+    print(f"{args.provider}: first audio, {args.runs * len(SENTENCES)} sentences")
+    print(f"{'mode':<30} {'p50 ms':>7} {'p90 ms':>7}")
+    for mode, timings in rows.items():
+        print(f"{mode:<30} {np.percentile(timings, 50):7.0f} {np.percentile(timings, 90):7.0f}")
+
+    if hasattr(tts, "close"):
+        await tts.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="TTS time to first audio")
+    parser.add_argument("--provider", default="azure")
+    parser.add_argument("--kw", action="append", default=[], help="Extra constructor argument key=value")
+    parser.add_argument("--runs", type=int, default=3)
+    args = parser.parse_args()
+
+    load_dotenv()
+    asyncio.run(_run(args))
+
+
+if __name__ == "__main__":
+    main()
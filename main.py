@@ -5,20 +5,29 @@ Server controls audio queue & interruption.
 """
 
 from contextlib import asynccontextmanager
+from time import perf_counter
+_t_start = perf_counter()
+
 import os
 import asyncio
 import base64
 import logging
 from fastapi import FastAPI, WebSocket, WebSocketDisconnect
 from dotenv import load_dotenv
-from transformers import AutoModel
-from faster_whisper import WhisperModel
+import psutil
 
 from src.data.knowledge_base import knowledge_base
 from src.logging_config import setup_logging
 from src.pipeline import VoicePipeline
+from src.filler import AcknowledgementFiller
+from src.metrics import metrics
+from src.model_manager import ModelManager
+from src.pacer import AudioPacer
 from src.factory import ProviderFactory
-from src.translators.indicTrans2 import IndicTrans2Translator
+from src.stt.vad import SileroVAD
+from src.stt.vad_gate import VADGatedSTT
+from src.tts.scheduler import TTSScheduler
+from src.translators.fast_path import TranslationFastPath
 
 # ------------------------------------------------------------------
 # ENV & LOGGING
@@ -39,6 +48,49 @@ PIPELINE_CONFIG = {
     "max_tts_chars": 200,
     "sentence_delimiters": (".", "!", "?", ","),
     "enable_timing": True,
+    "output_sample_rate": 16000,  # index.html plays PCM16 at this rate; all TTS output is converted to it
+}
+
+# Forward only speech (plus padding) to the STT provider
+VAD_GATE_CONFIG = {
+    "enabled": True,
+    "threshold": 0.5,
+    "min_speech_ms": 100,
+    "hangover_ms": 600,
+    "speech_pad_ms": 300,
+}
+
+# Interrupt the assistant as soon as the caller starts speaking
+BARGE_IN_CONFIG = {
+    "enabled": True,
+    "threshold": 0.6,
+    "min_speech_ms": 200,
+}
+
+# Keep the client only slightly ahead of real-time playback
+PACER_CONFIG = {
+    "frame_ms": 100,
+    "lead_ms": 300,
+}
+
+# Local models are loaded on first use and unloaded when idle or over budget
+MODEL_MANAGER_CONFIG = {
+    "budget_mb": None,          # e.g. 6000 to cap resident model weights
+    "idle_seconds": 600,
+    "eviction_interval": 30,
+}
+
+# Sentence requests of all sessions share these per-provider limits; first sentences go first
+TTS_SCHEDULER_CONFIG = {
+    "azure": {"concurrency": 8, "rate_per_sec": 20, "burst": 20},   # max_pool_size; stay under the tier's TPS quota
+    "piper": {"concurrency": 2},                                      # pool_size
+    "openai": {"concurrency": 4, "rate_per_sec": 5, "burst": 10},
+}
+
+FILLER_CONFIG = {
+    "enabled": True,
+    "threshold_ms": 700,
+    "default_language": "en",
 }
 
 # ------------------------------------------------------------------
@@ -47,26 +99,62 @@ PIPELINE_CONFIG = {
 
 logger.info("🔧 Initializing providers...")
 
+model_manager = ModelManager(
+    budget_mb=MODEL_MANAGER_CONFIG["budget_mb"],
+    idle_seconds=MODEL_MANAGER_CONFIG["idle_seconds"],
+)
+
 logger.info("🔧 Loading stt model")
+# Heavy libraries are imported only for the provider that is configured
+# from transformers import AutoModel
 # model = AutoModel.from_pretrained("ai4bharat/indic-conformer-600m-multilingual", trust_remote_code=True)
+# Int8 ONNX Runtime variant (export once with `python -m src.stt.indic_conformer_onnx`)
+# from src.stt.indic_conformer_onnx import OnnxConformerModel
+# model = OnnxConformerModel("models/indic-conformer-int8")
+# from faster_whisper import WhisperModel
 # model = WhisperModel(
 #             "base",
 #             device="cpu",
 #             compute_type="int8"
 #         )
+# Or host it in worker processes (off the server's GIL, audio through shared memory):
+# from src.inference_pool import InferencePool
+# stt_pool = InferencePool("src.inference_pool:WhisperService", {"model_size": "base", "language": "en"}, num_workers=2)
+# stt_pool = InferencePool("src.inference_pool:ConformerService", {"language": "hi"}, num_workers=2)
+# Or let the model manager load it on first use (serve.py preloads it before forking):
+# model_manager.register("stt:indic-conformer", lambda: AutoModel.from_pretrained(
+#     "ai4bharat/indic-conformer-600m-multilingual", trust_remote_code=True))
+# CTranslate2 models (faster-whisper) gain nothing from preloading; each worker loads its own:
+# model_manager.register("stt:whisper-base", lambda: WhisperModel("base", device="cpu", compute_type="int8"),
+#                        fork_safe=False)
+
+# Optional: batch decodes from all sessions through one shared model
+# from src.stt.batching import STTBatcher, WhisperBatchBackend, ConformerBatchBackend
+# stt_batcher = STTBatcher(WhisperBatchBackend(model, language="en"), max_batch_size=8, max_wait_ms=20)
+# stt_batcher = STTBatcher(ConformerBatchBackend(model, language="hi"), max_batch_size=8, max_wait_ms=20)
 
 STT_CONFIG = {
     # "provider": "indic",
-    # "model": model
+    # "model": model,
+    # "batcher": stt_batcher,
+    # "model": None, "model_manager": model_manager, "model_key": "stt:indic-conformer",
+    # "model": None, "inference_pool": stt_pool,
     
     "provider": "deepgram",
     "api_key" : os.getenv("DEEPGRAM_API_KEY"),
 }
 
+# One silero session; barge-in reuses the gate's per-frame scores (and runs it itself without the gate)
+vad = SileroVAD() if VAD_GATE_CONFIG["enabled"] or BARGE_IN_CONFIG["enabled"] else None
+
 stt = ProviderFactory.create_stt(**STT_CONFIG)
+if VAD_GATE_CONFIG["enabled"]:
+    stt = VADGatedSTT(stt, vad=vad, **{k: v for k, v in VAD_GATE_CONFIG.items() if k != "enabled"})
 
 LLM_CONFIG = {
     #  "provider": "local",
+    #  "model_manager": model_manager,
+    #  "inference_pool": InferencePool("src.inference_pool:LLMService", {"model_name": "Qwen/Qwen2.5-0.5B-Instruct"}, num_workers=1),
 
     "provider": "openai",
     "api_key" : os.getenv("OPENAI_API_KEY"),
@@ -76,27 +164,89 @@ llm = ProviderFactory.create_llm(**LLM_CONFIG)
 
 TTS_CONFIG = {
     # "provider": "piper",
-    # "model_path": "models/en_US-lessac-medium.onnx"
+    # "model_path": "models/en_US-lessac-medium.onnx",
+    # "pool_size": 2,             # concurrent synthesis sessions (default: half the cores)
     
+    # "provider": "cartesia",
+    # "api_key": os.getenv("CARTESIA_API_KEY"),
+    # "websocket": True,          # stream LLM tokens into one continuation context per turn
+    # "sample_rate": 16000,
+
     # "provider": "gemini",
     # "api_key" : os.getenv("GOOGLE_API_KEY"),
+    # "sample_rate": 16000,       # streamed 24 kHz PCM is resampled to the client rate
     
     "provider": "azure",
     "speech_key" : os.getenv("AZURE_SPEECH_KEY"),
     "region" : os.getenv("AZURE_SPEECH_REGION"),
-    "voice" : "hi-IN-SwaraNeural"
+    "voice" : "hi-IN-SwaraNeural",
+    "pool_size": 2,               # synthesizers connected at startup
 }
-tts = ProviderFactory.create_tts(**TTS_CONFIG)
+tts_scheduler = TTSScheduler(TTS_SCHEDULER_CONFIG)
+tts = tts_scheduler.wrap(ProviderFactory.create_tts(**TTS_CONFIG), TTS_CONFIG["provider"])
+# Or hedge the cloud voice with local Piper when it has no audio after 400 ms:
+# from src.tts.hedged import HedgedTTS
+# tts = HedgedTTS(
+#     primary=tts,
+#     fallback=tts_scheduler.wrap(ProviderFactory.create_tts("piper", model_path="models/en_US-lessac-medium.onnx"), "piper"),
+#     hedge_after_ms=400,
+#     primary_name=TTS_CONFIG["provider"],
+#     fallback_name="piper",
+#     sample_rate=PIPELINE_CONFIG["output_sample_rate"],
+# )
+
+# Translation loads a 1B model; construct it only when it is wired into the pipeline
+# from src.translators.indicTrans2 import IndicTrans2Translator
+# translator = IndicTrans2Translator(hf_token=HF_TOKEN, model_manager=model_manager)
+# Or in worker processes:
+# from src.translators.remote import RemoteTranslator
+# translator = RemoteTranslator(InferencePool("src.inference_pool:TranslatorService", {"hf_token": HF_TOKEN}, num_workers=2))
+# CTranslate2 int8 variant (convert once with `python -m src.translators.indicTrans2_ct2`)
+# from src.translators.indicTrans2_ct2 import CT2IndicTrans2Translator
+# translator = CT2IndicTrans2Translator("models/indictrans2-indic-en-1B-ct2", beam_size=1, intra_threads=4)
+
+# Optional: batch translations from all sessions into one padded translate() call
+# from src.translators.batching import TranslationBatcher
+# translation_batcher = TranslationBatcher(translator, max_batch_size=16, max_wait_ms=10)
+
+filler = None
+if FILLER_CONFIG["enabled"]:
+    filler = AcknowledgementFiller(
+        tts=tts,
+        threshold_ms=FILLER_CONFIG["threshold_ms"],
+        default_language=FILLER_CONFIG["default_language"],
+        sample_rate=PIPELINE_CONFIG["output_sample_rate"],
+    )
 
-translator = IndicTrans2Translator(hf_token=HF_TOKEN)
+translation_fast_path = TranslationFastPath(min_indic_ratio=0.3, cache_size=1024)
+
+
+def new_pipeline() -> VoicePipeline:
+    """
+    Pipeline for one connection. Providers, caches and the VAD session are
+    shared; utterance ids, the running response, the filler and the
+    playback estimate belong to the caller, so one caller's speech never
+    interrupts another's response.
+    """
+    return VoicePipeline(
+        stt=stt,
+        llm=llm,
+        tts=tts,
+        # translator=translator,
+        # translation_batcher=translation_batcher,
+        translation_fast_path=translation_fast_path,
+        filler=filler,
+        vad=vad if BARGE_IN_CONFIG["enabled"] else None,
+        barge_in_threshold=BARGE_IN_CONFIG["threshold"],
+        barge_in_min_speech_ms=BARGE_IN_CONFIG["min_speech_ms"],
+        **PIPELINE_CONFIG
+    )
 
-pipeline = VoicePipeline(
-    stt=stt,
-    llm=llm,
-    tts=tts,
-    # translator=translator,
-    **PIPELINE_CONFIG
-)
+_startup_s = perf_counter() - _t_start
+_rss_mb = psutil.Process().memory_info().rss / 2**20
+metrics.set("startup_s", _startup_s)
+metrics.set("startup_rss_mb", _rss_mb)
+logger.info(f"🚀 Providers ready in {_startup_s:.1f}s (RSS {_rss_mb:.0f} MB)")
 
 # ------------------------------------------------------------------
 # FASTAPI APP
@@ -130,15 +280,42 @@ async def warmup():
     # if translator:
     #     translator.translate("hello")
 
+    # Pre-render acknowledgement clips with the configured voice
+    if filler:
+        await filler.prepare()
+
+    asyncio.create_task(model_manager.run_eviction(MODEL_MANAGER_CONFIG["eviction_interval"]))
+
     logger.info("✅ Warmup complete")
     
 @app.get("/health")
 async def health():
     return {"status": "ok"}
 
+@app.get("/metrics")
+async def get_metrics():
+    return metrics.snapshot()
+
+
+@app.get("/tts/queues")
+async def get_tts_queues():
+    return tts_scheduler.stats()
+
+
+@app.get("/models")
+async def get_models():
+    return {
+        "budget_mb": model_manager.budget_mb,
+        "resident_mb": round(model_manager.resident_mb, 1),
+        "models": model_manager.residency(),
+    }
+
 
 @app.websocket("/ws")
 async def websocket_endpoint(ws: WebSocket):
+    # Open the STT (and streaming TTS) connections while the client handshake completes
+    stt.prepare()
+    tts.prepare()
     await ws.accept()
     logger.info("🔌 Client connected")
 
@@ -156,8 +333,7 @@ async def websocket_endpoint(ws: WebSocket):
             audio_bytes: bytes = data["data"]
             encoded = base64.b64encode(audio_bytes)
             data = {
-                "seq": data["seq"],
-                "utterance_id": data["utterance_id"],
+                **data,
                 "data": base64.b64encode(audio_bytes).decode("utf-8"),
                 # "data": base64.b64encode(audio_bytes).decode("utf-8"),
             }
@@ -177,8 +353,12 @@ async def websocket_endpoint(ws: WebSocket):
                 break
             yield chunk
 
+    # Audio leaves the server at playback speed so interruptions waste little
+    pacer = AudioPacer(audio_callback, **PACER_CONFIG)
+    pipeline = new_pipeline()
+
     pipeline_task = asyncio.create_task(
-        pipeline.run(audio_input_stream(), audio_callback)
+        pipeline.run(audio_input_stream(), pacer)
     )
 
     try:
@@ -203,6 +383,7 @@ async def websocket_endpoint(ws: WebSocket):
     finally:
         await audio_queue.put(None)
         pipeline_task.cancel()
+        await pacer.close()
         await pipeline.cleanup()
 
 
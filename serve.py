@@ -0,0 +1,183 @@
+"""
+Multi-worker server sharing one listening socket and the model weights.
+
+The parent verifies the artifact cache and binds the socket. In preload mode
+(the default) it then imports `main`, which builds every provider, loads the
+models registered with the model manager, freezes the GC and forks the
+workers, so their weights are shared copy-on-write:
+- torch models (HF Indic-Conformer, IndicTrans2, Coqui, local LLM) are
+  loaded once; OMP_NUM_THREADS=1 keeps torch's OpenMP pool from starting in
+  the parent, and every worker gets its thread count back after the fork.
+- ONNX Runtime sessions are reopened in every worker, so each has its own
+  thread pool. The int8 conformer maps its external weights, so the reopened
+  sessions still share them; the small silero and Piper graphs are reloaded.
+- CTranslate2 copies its weights into its own buffers, so CTranslate2 models
+  are reloaded in every worker (register them with `fork_safe=False`).
+- Azure TTS connections and inference-pool processes are re-created per worker.
+
+With --no-preload every worker imports `main` and loads its own models; only
+what the loaders memory-map from the same snapshots is shared. The memory
+report and `python -m benchmarks.serve_memory` compare the two modes. Workers
+run offline (HF_HUB_OFFLINE=1).
+
+Usage:
+    python serve.py --workers 4 --port 9000 [--no-preload]
+"""
+import argparse
+import gc
+import logging
+import os
+import signal
+import socket
+import sys
+import time
+from typing import List
+
+logger = logging.getLogger("app")
+
+
+def _bind(host: str, port: int) -> socket.socket:
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((host, port))
+    sock.set_inheritable(True)
+    return sock
+
+
+def _preload():
+    """Build the server in this process so the forked workers share its models."""
+    # torch reads this when it first starts OpenMP; a pool started here would be
+    # dead in the workers. Registered before any provider hook, so it runs first.
+    threads = os.environ.get("OMP_NUM_THREADS")
+    os.environ["OMP_NUM_THREADS"] = "1"
+
+    def restore_threads():
+        if threads is None:
+            os.environ.pop("OMP_NUM_THREADS", None)
+        else:
+            os.environ["OMP_NUM_THREADS"] = threads
+        torch = sys.modules.get("torch")
+        if torch is not None:
+            torch.set_num_threads(int(threads) if threads else os.cpu_count() or 1)
+
+    os.register_at_fork(after_in_child=restore_threads)
+
+    import main as server
+
+    server.model_manager.preload()
+    # Keep the collector from touching (and so copying) every preloaded object
+    gc.collect()
+    gc.freeze()
+    return server
+
+
+def _start_workers(sock: socket.socket, workers: int, server=None) -> List[int]:
+    """Fork the workers; each imports `main` itself unless `server` was preloaded."""
+    children = []
+    for _ in range(workers):
+        pid = os.fork()
+        if pid == 0:
+            signal.signal(signal.SIGINT, signal.SIG_DFL)
+            if server is None:
+                import main as server
+            import uvicorn
+
+            config = uvicorn.Config(server.app, log_config=None)
+            uvicorn.Server(config).run(sockets=[sock])
+            os._exit(0)
+        children.append(pid)
+    return children
+
+
+def _memory_usage(pids: List[int]) -> List[dict]:
+    """RSS, proportional and unique set size (MB) of every live process in `pids`."""
+    import psutil
+
+    rows = []
+    for pid in pids:
+        try:
+            info = psutil.Process(pid).memory_full_info()
+        except psutil.NoSuchProcess:
+            continue
+        rows.append({"pid": pid, "rss": info.rss / 2**20, "pss": info.pss / 2**20, "uss": info.uss / 2**20})
+    return rows
+
+
+def _memory_report(children: List[int], preload: bool):
+    """Per-worker memory; the parent counts too, since it holds the preloaded copy."""
+    rows = _memory_usage(children)
+    if not rows:
+        return
+    parent = _memory_usage([os.getpid()])
+
+    for row in rows:
+        logger.info(
+            f"🧮 worker {row['pid']}: RSS {row['rss']:.0f} MB, PSS {row['pss']:.0f} MB, "
+            f"private {row['uss']:.0f} MB, shared {row['rss'] - row['uss']:.0f} MB"
+        )
+
+    total_rss = sum(r["rss"] for r in rows)
+    total_pss = sum(r["pss"] for r in rows + parent)
+    logger.info(
+        f"🧮 {len(rows)} workers ({'preloaded' if preload else 'loaded per worker'}) and the parent use "
+        f"{total_pss:.0f} MB PSS ({total_pss / len(rows):.0f} MB per worker) instead of {total_rss:.0f} MB RSS"
+    )
+
+
+def _stop(children: List[int]):
+    for pid in children:
+        try:
+            os.kill(pid, signal.SIGTERM)
+        except ProcessLookupError:
+            pass
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Pre-forking voice assistant server")
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=9000)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--preload", action=argparse.BooleanOptionalAction, default=True,
+                        help="Load the models before forking so the workers share them")
+    parser.add_argument("--verify-artifacts", choices=["none", "size", "full"], default="size")
+    parser.add_argument("--report-after", type=float, default=60.0, help="Seconds before the memory report (workers load their models first)")
+    args = parser.parse_args()
+
+    from src.logging_config import setup_logging
+
+    setup_logging()
+
+    # Everything must already be local; never reach the hub from a worker
+    os.environ.setdefault("HF_HUB_OFFLINE", "1")
+    os.environ.setdefault("TRANSFORMERS_OFFLINE", "1")
+
+    if args.verify_artifacts != "none":
+        from src.artifacts import ArtifactCache
+
+        problems = ArtifactCache().verify_all(full=args.verify_artifacts == "full")
+        if problems:
+            for problem in problems:
+                print(problem, file=sys.stderr)
+            raise SystemExit("Artifact cache verification failed")
+
+    sock = _bind(args.host, args.port)
+    server = _preload() if args.preload else None
+    children = _start_workers(sock, args.workers, server)
+
+    logger.info(f"🚀 {len(children)} workers serving on {args.host}:{args.port}")
+
+    signal.signal(signal.SIGINT, lambda signum, frame: _stop(children))
+    signal.signal(signal.SIGTERM, lambda signum, frame: _stop(children))
+
+    time.sleep(args.report_after)
+    _memory_report(children, args.preload)
+
+    for pid in children:
+        try:
+            os.waitpid(pid, 0)
+        except ChildProcessError:
+            pass
+
+
+if __name__ == "__main__":
+    main()
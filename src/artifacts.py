@@ -0,0 +1,147 @@
+"""
+Verified local cache of model artifacts.
+
+`fetch` downloads a HuggingFace snapshot into the regular hub cache and
+writes a manifest (revision, size and sha256 of every file). At startup
+`verify` checks the snapshot against its manifest, so workers can run with
+HF_HUB_OFFLINE=1 and never reach the hub, and a truncated or modified file
+is caught before a model is loaded from it.
+
+    python -m src.artifacts fetch ai4bharat/indictrans2-indic-en-1B
+    python -m src.artifacts verify --full
+"""
+import argparse
+import hashlib
+import json
+import logging
+import os
+from typing import Dict, List, Optional
+
+logger = logging.getLogger("app")
+
+DEFAULT_MANIFEST_DIR = "models/manifests"
+
+
+def _sha256(path: str, chunk_size: int = 1 << 20) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(chunk_size), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class ArtifactCache:
+    """Fetches HF snapshots once and verifies them against a manifest."""
+
+    def __init__(self, manifest_dir: str = DEFAULT_MANIFEST_DIR, cache_dir: Optional[str] = None):
+        """
+        Initialize artifact cache.
+
+        Args:
+            manifest_dir: Where manifests are stored
+            cache_dir: HF hub cache directory (None = the default hub cache)
+        """
+        self.manifest_dir = manifest_dir
+        self.cache_dir = cache_dir
+
+    def _manifest_path(self, repo_id: str) -> str:
+        return os.path.join(self.manifest_dir, repo_id.replace("/", "--") + ".json")
+
+    def fetch(self, repo_id: str, revision: Optional[str] = None, allow_patterns: Optional[List[str]] = None) -> str:
+        """Download a snapshot (if needed) and record its manifest; returns the local path."""
+        from huggingface_hub import snapshot_download
+
+        path = snapshot_download(
+            repo_id,
+            revision=revision,
+            allow_patterns=allow_patterns,
+            cache_dir=self.cache_dir,
+        )
+
+        files: Dict[str, dict] = {}
+        for root, _, names in os.walk(path):
+            for name in names:
+                full = os.path.join(root, name)
+                rel = os.path.relpath(full, path)
+                files[rel] = {"size": os.path.getsize(full), "sha256": _sha256(full)}
+
+        os.makedirs(self.manifest_dir, exist_ok=True)
+        with open(self._manifest_path(repo_id), "w", encoding="utf-8") as f:
+            json.dump({"repo_id": repo_id, "path": path, "revision": os.path.basename(path), "files": files}, f, indent=2)
+
+        logger.info(f"📦 Cached {repo_id} ({len(files)} files) at {path}")
+        return path
+
+    def manifests(self) -> List[dict]:
+        if not os.path.isdir(self.manifest_dir):
+            return []
+        result = []
+        for name in sorted(os.listdir(self.manifest_dir)):
+            if name.endswith(".json"):
+                with open(os.path.join(self.manifest_dir, name), encoding="utf-8") as f:
+                    result.append(json.load(f))
+        return result
+
+    def verify(self, repo_id: str, full: bool = False) -> List[str]:
+        """
+        Check a snapshot against its manifest.
+
+        Args:
+            repo_id: Repository to check
+            full: Re-hash every file (otherwise only presence and size are checked)
+
+        Returns:
+            List of problems (empty when the snapshot is intact)
+        """
+        path = self._manifest_path(repo_id)
+        if not os.path.exists(path):
+            return [f"{repo_id}: no manifest, run `python -m src.artifacts fetch {repo_id}`"]
+        with open(path, encoding="utf-8") as f:
+            manifest = json.load(f)
+
+        problems = []
+        for rel, info in manifest["files"].items():
+            full_path = os.path.join(manifest["path"], rel)
+            if not os.path.exists(full_path):
+                problems.append(f"{repo_id}: missing {rel}")
+            elif os.path.getsize(full_path) != info["size"]:
+                problems.append(f"{repo_id}: size mismatch for {rel}")
+            elif full and _sha256(full_path) != info["sha256"]:
+                problems.append(f"{repo_id}: checksum mismatch for {rel}")
+        return problems
+
+    def verify_all(self, full: bool = False) -> List[str]:
+        problems = []
+        for manifest in self.manifests():
+            problems.extend(self.verify(manifest["repo_id"], full=full))
+        return problems
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Manage the local model artifact cache")
+    parser.add_argument("--manifest-dir", default=DEFAULT_MANIFEST_DIR)
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    fetch = sub.add_parser("fetch", help="Download snapshots and write manifests")
+    fetch.add_argument("repo_ids", nargs="+")
+    fetch.add_argument("--revision", default=None)
+
+    verify = sub.add_parser("verify", help="Check every cached snapshot")
+    verify.add_argument("--full", action="store_true", help="Re-hash every file")
+
+    args = parser.parse_args()
+    cache = ArtifactCache(args.manifest_dir)
+
+    if args.command == "fetch":
+        for repo_id in args.repo_ids:
+            print(cache.fetch(repo_id, revision=args.revision))
+    else:
+        problems = cache.verify_all(full=args.full)
+        for problem in problems:
+            print(problem)
+        print("OK" if not problems else f"{len(problems)} problem(s)")
+        raise SystemExit(1 if problems else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,141 @@
+"""Process-wide micro-batching of inference requests across sessions."""
+import asyncio
+import logging
+from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor
+from time import perf_counter
+from typing import Any, Dict, List, Optional
+
+from src.metrics import metrics
+
+logger = logging.getLogger("app")
+
+
+class _Request:
+    __slots__ = ("item", "options", "future", "enqueued")
+
+    def __init__(self, item: Any, options: dict, future: asyncio.Future):
+        self.item = item
+        self.options = options
+        self.future = future
+        self.enqueued = perf_counter()
+
+
+class MicroBatcher(ABC):
+    """
+    Gathers requests from all sessions into micro-batches.
+
+    The first request opens a batch; it is dispatched once `max_batch_size`
+    requests are waiting or `max_wait_ms` has elapsed. Requests with the same
+    options share one `run_batch()` call, which runs on a dedicated thread so
+    the model owns the CPU threads it uses; the results are fanned back out
+    to the waiting callers.
+
+    Subclasses implement `run_batch()`.
+    """
+
+    def __init__(
+        self,
+        max_batch_size: int,
+        max_wait_ms: float,
+        metric_prefix: str,
+        thread_name: str,
+        labels: Optional[Dict[str, str]] = None,
+    ):
+        """
+        Initialize batcher.
+
+        Args:
+            max_batch_size: Maximum requests per batch
+            max_wait_ms: Latency window for collecting a batch
+            metric_prefix: Prefix of the queue delay, batch size and batch time metrics
+            thread_name: Name prefix of the inference thread
+            labels: Labels attached to every metric
+        """
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+        self.metric_prefix = metric_prefix
+        self.labels = labels or {}
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker: Optional[asyncio.Task] = None
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix=thread_name)
+
+    @abstractmethod
+    def run_batch(self, items: List[Any], **options) -> List[Any]:
+        """Process a batch on the inference thread; one result per item, in order."""
+        pass
+
+    async def submit(self, item: Any, **options) -> Any:
+        """Queue one request and wait for its result."""
+        self._ensure_worker()
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put(_Request(item, options, future))
+        return await future
+
+    def _ensure_worker(self):
+        if self._worker is None or self._worker.done():
+            self._queue = asyncio.Queue()
+            self._worker = asyncio.create_task(self._run())
+
+    async def _collect(self) -> List[_Request]:
+        batch = [await self._queue.get()]
+        deadline = batch[0].enqueued + self.max_wait
+
+        while len(batch) < self.max_batch_size:
+            # Requests already waiting join without further delay
+            if not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+                continue
+            timeout = deadline - perf_counter()
+            if timeout <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+            except asyncio.TimeoutError:
+                break
+
+        # Drop requests whose session has gone away
+        return [r for r in batch if not r.future.done()]
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        prefix = self.metric_prefix
+        while True:
+            batch = await self._collect()
+            if not batch:
+                continue
+
+            # Only requests with identical options can share a batch
+            groups: dict = {}
+            for request in batch:
+                groups.setdefault(tuple(sorted(request.options.items())), []).append(request)
+
+            for key, requests in groups.items():
+                started = perf_counter()
+                for request in requests:
+                    metrics.observe(f"{prefix}_queue_delay_ms", (started - request.enqueued) * 1000, **self.labels)
+                metrics.observe(f"{prefix}_batch_size", len(requests), **self.labels)
+
+                try:
+                    results = await loop.run_in_executor(
+                        self._executor,
+                        lambda: self.run_batch([r.item for r in requests], **dict(key)),
+                    )
+                except Exception as e:
+                    logger.exception(f"Batched {prefix} inference failed")
+                    for request in requests:
+                        if not request.future.done():
+                            request.future.set_exception(e)
+                    continue
+
+                metrics.observe(f"{prefix}_batch_ms", (perf_counter() - started) * 1000, **self.labels)
+                for request, result in zip(requests, results):
+                    if not request.future.done():
+                        request.future.set_result(result)
+
+    async def close(self):
+        """Stop the worker and release the inference thread."""
+        if self._worker:
+            self._worker.cancel()
+            self._worker = None
+        self._executor.shutdown(wait=False)
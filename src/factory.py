@@ -1,22 +1,48 @@
-"""Provider factory for easy instantiation."""
+"""Provider factory for easy instantiation.
+
+Providers are registered by import path and imported on first use, so the
+server only pays for the modules (torch, SDKs, ...) of configured providers.
+"""
+import importlib
+from typing import Dict, Type
 
-from src.llm.local import LocalLLM
 from src.llm.llm_provider import LLMProvider
-from src.llm.openai import OpenAILLM
-from src.stt.deepgram import DeepgramSTT
-from src.stt.faster_whisper import FasterWhisperSTT
-from src.stt.indic_conformer import IndicConformerSTT
 from src.stt.stt_provider import STTProvider
-from src.tts.azure import AzureTTS
-from src.tts.cartesia import CartesiaTTS
-from src.tts.coqui import CoquiTTS
-from src.tts.edge import EdgeTTS
-from src.tts.espeak import EspeakTTS
-from src.tts.gemini import GeminiTTS
-from src.tts.openai import OpenAITTS
-from src.tts.piper import PiperTTS
 from src.tts.tts_provider import TTSProvider
 
+# provider name -> "module:ClassName"
+_REGISTRY: Dict[str, Dict[str, str]] = {
+    "stt": {
+        "whisper": "src.stt.faster_whisper:FasterWhisperSTT",
+        "indic": "src.stt.indic_conformer:IndicConformerSTT",
+        "deepgram": "src.stt.deepgram:DeepgramSTT",
+    },
+    "llm": {
+        "openai": "src.llm.openai:OpenAILLM",
+        "local": "src.llm.local:LocalLLM",
+    },
+    "tts": {
+        "piper": "src.tts.piper:PiperTTS",
+        "azure": "src.tts.azure:AzureTTS",
+        "gemini": "src.tts.gemini:GeminiTTS",
+        "cartesia": "src.tts.cartesia:CartesiaTTS",
+        "openai": "src.tts.openai:OpenAITTS",
+        "pyttsx3": "src.tts.espeak:EspeakTTS",
+        "edge": "src.tts.edge:EdgeTTS",
+        "coqui": "src.tts.coqui:CoquiTTS",
+    },
+}
+
+
+def _load(kind: str, provider: str) -> Type:
+    """Import and return the class registered for a provider."""
+    try:
+        path = _REGISTRY[kind][provider]
+    except KeyError:
+        raise ValueError(f"Unknown {kind.upper()} provider: {provider}") from None
+    module, _, name = path.partition(":")
+    return getattr(importlib.import_module(module), name)
+
 
 class ProviderFactory:
     """Factory for creating provider instances."""
@@ -30,17 +56,10 @@ class ProviderFactory:
         Create STT provider.
         
         Args:
-            provider: "local" (Faster Whisper) or "deepgram"
+            provider: "whisper", "indic" or "deepgram"
             **kwargs: Provider-specific arguments
         """
-        if provider == "whisper":
-            return FasterWhisperSTT(**kwargs)
-        if provider == "indic":
-            return IndicConformerSTT(**kwargs)
-        elif provider == "deepgram":
-            return DeepgramSTT(**kwargs)
-        else:
-            raise ValueError(f"Unknown STT provider: {provider}")
+        return _load("stt", provider)(**kwargs)
     
     @staticmethod
     def create_llm(
@@ -51,15 +70,10 @@ class ProviderFactory:
         Create LLM provider.
         
         Args:
-            provider: "openai" 
+            provider: "openai" or "local"
             **kwargs: Provider-specific arguments
         """
-        if provider == "openai":
-            return OpenAILLM(**kwargs)
-        elif provider == "local":
-            return LocalLLM(**kwargs)
-        else:
-            raise ValueError(f"Unknown LLM provider: {provider}")
+        return _load("llm", provider)(**kwargs)
     
     @staticmethod
     def create_tts(
@@ -70,24 +84,19 @@ class ProviderFactory:
         Create TTS provider.
         
         Args:
-            provider: "local" (Piper) or "cartesia"
+            provider: "piper", "azure", "gemini", "cartesia", "openai", "pyttsx3", "edge" or "coqui"
             **kwargs: Provider-specific arguments
         """
-        if provider == "piper":
-            return PiperTTS(**kwargs)
-        elif provider == "azure":
-            return AzureTTS(**kwargs)
-        elif provider == "gemini":
-            return GeminiTTS(**kwargs)
-        elif provider == "cartesia":
-            return CartesiaTTS(**kwargs)
-        elif provider == "openai":
-            return OpenAITTS(**kwargs)
-        elif provider == "pyttsx3":
-            return EspeakTTS(**kwargs)
-        elif provider == "edge":
-            return EdgeTTS(**kwargs)
-        elif provider == "coqui":
-            return CoquiTTS(**kwargs)
-        else:
-            raise ValueError(f"Unknown TTS provider: {provider}")
+        return _load("tts", provider)(**kwargs)
+
+    @staticmethod
+    def register(kind: str, provider: str, path: str):
+        """
+        Register a provider without importing it.
+
+        Args:
+            kind: "stt", "llm" or "tts"
+            provider: Name used in the config
+            path: "module:ClassName"
+        """
+        _REGISTRY[kind][provider] = path
@@ -0,0 +1,143 @@
+"""Pre-synthesized acknowledgement clips played while the LLM is thinking."""
+import logging
+import random
+from time import perf_counter
+from typing import Dict, List, Optional
+
+from src.tts.pcm import to_pcm16
+from src.tts.scheduler import BACKGROUND, tts_priority
+from src.tts.tts_provider import TTSProvider
+
+logger = logging.getLogger("app")
+
+DEFAULT_PHRASES = {
+    "en": ["Okay.", "Sure, one moment.", "Let me check that for you."],
+    "hi": ["जी।", "ठीक है, एक पल।", "मैं देखती हूँ।"],
+}
+
+
+def detect_language(text: str, default: str = "en") -> str:
+    """Cheap language guess from script: Devanagari -> "hi", otherwise default."""
+    for ch in text:
+        if "ऀ" <= ch <= "ॿ":
+            return "hi"
+    return default
+
+
+class FirstAudioEstimator:
+    """
+    Tracks exponential moving averages of the stages before the first TTS chunk
+    and projects when the first real audio of an utterance will be ready.
+    """
+
+    def __init__(
+        self,
+        alpha: float = 0.2,
+        translation_ms: float = 300.0,
+        llm_ttft_ms: float = 600.0,
+        llm_chars_per_sec: float = 80.0,
+        tts_ms: float = 400.0,
+    ):
+        """
+        Initialize estimator with prior values used until real samples arrive.
+
+        Args:
+            alpha: EMA smoothing factor (higher reacts faster)
+            translation_ms: Prior translation latency
+            llm_ttft_ms: Prior LLM time to first token
+            llm_chars_per_sec: Prior LLM streaming throughput
+            tts_ms: Prior TTS latency for one sentence
+        """
+        self.alpha = alpha
+        self.stats = {
+            "translation_ms": translation_ms,
+            "llm_ttft_ms": llm_ttft_ms,
+            "llm_chars_per_sec": llm_chars_per_sec,
+            "tts_ms": tts_ms,
+        }
+
+    def observe(self, stage: str, value: float):
+        """Fold a new measurement into the moving average for a stage."""
+        if value <= 0:
+            return
+        prev = self.stats[stage]
+        self.stats[stage] = prev + self.alpha * (value - prev)
+
+    def projected_ms(self, min_tts_chars: int, with_translation: bool) -> float:
+        """Projected time from final transcript to first audio chunk."""
+        projected = (
+            self.stats["llm_ttft_ms"]
+            + min_tts_chars / self.stats["llm_chars_per_sec"] * 1000
+            + self.stats["tts_ms"]
+        )
+        if with_translation:
+            projected += self.stats["translation_ms"]
+        return projected
+
+
+class AcknowledgementFiller:
+    """
+    Short acknowledgement clips ("Okay.", "जी।") rendered once at startup with
+    the configured TTS provider, so they share its voice, and held in memory.
+    """
+
+    def __init__(
+        self,
+        tts: TTSProvider,
+        phrases: Optional[Dict[str, List[str]]] = None,
+        threshold_ms: float = 700.0,
+        default_language: str = "en",
+        estimator: Optional[FirstAudioEstimator] = None,
+        sample_rate: int = 16000,
+    ):
+        """
+        Initialize acknowledgement filler.
+
+        Args:
+            tts: TTS provider used to pre-render the clips
+            phrases: Dict of {language: [phrases]} (defaults to DEFAULT_PHRASES)
+            threshold_ms: Play a clip when projected first audio exceeds this
+            default_language: Language used when the transcript script is ambiguous
+            estimator: First-audio estimator (a fresh one is created if None)
+            sample_rate: Clips are stored as PCM16 mono at the pipeline's output rate
+        """
+        self.tts = tts
+        self.phrases = phrases or DEFAULT_PHRASES
+        self.threshold_ms = threshold_ms
+        self.default_language = default_language
+        self.estimator = estimator or FirstAudioEstimator()
+        self.sample_rate = sample_rate
+        self.clips: Dict[str, List[bytes]] = {}
+
+    async def prepare(self):
+        """Pre-synthesize every phrase. Failures are logged and skipped."""
+        t0 = perf_counter()
+        for language, phrases in self.phrases.items():
+            for phrase in phrases:
+                try:
+                    # Yields to live sessions' sentences on a shared TTS scheduler
+                    with tts_priority(BACKGROUND):
+                        audio = await self.tts.synthesize(phrase)
+                    audio = to_pcm16(audio, self.tts.get_audio_format(), self.sample_rate)
+                except Exception:
+                    logger.exception(f"Failed to pre-synthesize filler '{phrase}'")
+                    continue
+                if audio:
+                    self.clips.setdefault(language, []).append(audio)
+
+        count = sum(len(c) for c in self.clips.values())
+        logger.info(f"🎧 Pre-synthesized {count} filler clips in {(perf_counter()-t0)*1000:.0f} ms")
+
+    def should_play(self, min_tts_chars: int, with_translation: bool) -> bool:
+        """Whether projected first-audio time is long enough to warrant a clip."""
+        if not self.clips:
+            return False
+        return self.estimator.projected_ms(min_tts_chars, with_translation) > self.threshold_ms
+
+    def pick(self, text: str) -> Optional[bytes]:
+        """Pick a clip matching the language of the caller's transcript."""
+        language = detect_language(text, self.default_language)
+        clips = self.clips.get(language) or self.clips.get(self.default_language)
+        if not clips:
+            return None
+        return random.choice(clips)
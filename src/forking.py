@@ -0,0 +1,25 @@
+"""Re-create per-process native state in workers that serve.py forks after preloading."""
+import os
+import weakref
+
+
+def reopen_after_fork(method):
+    """
+    Call a bound method in every forked child while its object is still alive.
+
+    Native thread pools and network connections do not survive fork(); a
+    provider built before serve.py forks registers the method that rebuilds
+    them. Only a weak reference is kept, so the hook does not keep an
+    evicted model resident.
+
+    Args:
+        method: Bound method taking no arguments
+    """
+    ref = weakref.WeakMethod(method)
+
+    def reopen():
+        bound = ref()
+        if bound is not None:
+            bound()
+
+    os.register_at_fork(after_in_child=reopen)
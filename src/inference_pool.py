@@ -0,0 +1,450 @@
+"""
+Pool of worker processes that host heavy local models.
+
+Each worker builds one "service" object (a model plus the few lines of
+inference code around it) in its own process, so inference runs outside
+the web server's GIL and a crashing model only takes its worker down.
+NumPy arrays in arguments and results travel through a pair of
+shared-memory buffers per worker; only small control messages go through
+the pipe.
+
+    pool = InferencePool("src.inference_pool:WhisperService", {"model_size": "base"}, num_workers=2)
+    text, words = await pool.call("transcribe", audio)
+    async for chunk in pool.stream("generate", prompt):
+        ...
+
+Create the pool in a single server process. The workers are children of
+the process that started them, so it does not combine with serve.py's
+pre-forked workers.
+"""
+import asyncio
+import atexit
+import importlib
+import logging
+import multiprocessing as mp
+import queue
+import signal
+import threading
+import traceback
+from multiprocessing.shared_memory import SharedMemory
+from time import perf_counter
+from typing import Any, AsyncIterator, Optional
+
+import numpy as np
+
+from src.forking import reopen_after_fork
+from src.metrics import metrics
+
+logger = logging.getLogger("app")
+
+
+class InferenceError(RuntimeError):
+    """A worker raised, or died, while serving a call."""
+
+
+class _ShmRef:
+    """Placeholder for an array stored in a shared-memory buffer."""
+
+    __slots__ = ("offset", "shape", "dtype")
+
+    def __init__(self, offset: int, shape: tuple, dtype: str):
+        self.offset = offset
+        self.shape = shape
+        self.dtype = dtype
+
+
+def _pack(value: Any, buf, offset: int = 0):
+    """Move arrays in `value` (or in a top-level tuple/list) into `buf`."""
+    if isinstance(value, np.ndarray):
+        value = np.ascontiguousarray(value)
+        end = offset + value.nbytes
+        if end > len(buf):
+            raise ValueError(f"{value.nbytes} byte array does not fit the {len(buf)} byte shared buffer")
+        buf[offset:end] = value.reshape(-1).view(np.uint8)
+        return _ShmRef(offset, value.shape, value.dtype.str), end
+    if isinstance(value, (tuple, list)):
+        packed = []
+        for item in value:
+            item, offset = _pack(item, buf, offset) if isinstance(item, np.ndarray) else (item, offset)
+            packed.append(item)
+        return type(value)(packed), offset
+    return value, offset
+
+
+def _unpack(value: Any, buf, copy: bool):
+    if isinstance(value, _ShmRef):
+        array = np.ndarray(value.shape, dtype=np.dtype(value.dtype), buffer=buf, offset=value.offset)
+        return array.copy() if copy else array
+    if isinstance(value, (tuple, list)):
+        return type(value)(_unpack(item, buf, copy) for item in value)
+    return value
+
+
+def _resolve(path: str):
+    module, _, attr = path.partition(":")
+    return getattr(importlib.import_module(module), attr)
+
+
+def _worker_main(conn, service_path: str, service_kwargs: dict, in_name: str, out_name: str):
+    """Worker process: build the service, then serve calls until told to stop."""
+    signal.signal(signal.SIGINT, signal.SIG_IGN)  # the server handles Ctrl+C
+    # Spawned children share the parent's resource tracker; the parent unlinks the segments
+    shm_in = SharedMemory(name=in_name)
+    shm_out = SharedMemory(name=out_name)
+
+    try:
+        service = _resolve(service_path)(**service_kwargs)
+    except Exception as e:
+        conn.send(("error", f"{type(e).__name__}: {e}", traceback.format_exc()))
+        return
+    conn.send(("ready",))
+
+    while True:
+        try:
+            msg = conn.recv()
+        except EOFError:
+            break
+        if msg[0] == "stop":
+            break
+        if msg[0] != "call":
+            continue  # late ack of a finished stream
+
+        _, method, args, kwargs, stream = msg
+        try:
+            # Inputs are read in place; the parent does not touch the buffer until we reply
+            args = _unpack(args, shm_in.buf, copy=False)
+            result = getattr(service, method)(*args, **kwargs)
+            if not stream:
+                conn.send(("result", _pack(result, shm_out.buf)[0]))
+                continue
+            for item in result:
+                conn.send(("item", _pack(item, shm_out.buf)[0]))
+                # The parent acks once it has copied the item out
+                if conn.recv()[0] == "cancel":
+                    result.close()
+                    break
+            conn.send(("done",))
+        except Exception as e:
+            conn.send(("error", f"{type(e).__name__}: {e}", traceback.format_exc()))
+
+
+class _Worker:
+    """One worker process, its pipe and its two shared-memory buffers."""
+
+    def __init__(self, pool: "InferencePool", index: int):
+        self.pool = pool
+        self.index = index
+        self.shm_in = SharedMemory(create=True, size=pool.shm_bytes)
+        self.shm_out = SharedMemory(create=True, size=pool.shm_bytes)
+        self.process = None
+        self.conn = None
+
+    def start(self):
+        self.conn, child = self.pool._ctx.Pipe()
+        self.process = self.pool._ctx.Process(
+            target=_worker_main,
+            args=(child, self.pool.service, self.pool.service_kwargs, self.shm_in.name, self.shm_out.name),
+            name=f"inference-{self.index}",
+            daemon=True,
+        )
+        self.process.start()
+        child.close()
+
+        if not self.conn.poll(self.pool.startup_timeout):
+            self.process.kill()
+            raise InferenceError(f"Worker {self.index} did not start within {self.pool.startup_timeout}s")
+        try:
+            msg = self.conn.recv()
+        except EOFError:
+            msg = ("error", f"exit code {self.process.join() or self.process.exitcode}", "")
+        if msg[0] == "error":
+            self.process.join()
+            raise InferenceError(f"Worker {self.index} failed to start: {msg[1]}\n{msg[2]}")
+        logger.info(f"⚙️ Inference worker {self.index} ready (pid {self.process.pid})")
+
+    def restart(self):
+        metrics.incr("inference_worker_restarts")
+        logger.error(f"💥 Inference worker {self.index} died (exit code {self.process.exitcode}), restarting")
+        self.process.kill()
+        self.process.join()
+        self.conn.close()
+        self.start()
+
+    def send_call(self, method: str, args: tuple, kwargs: dict, stream: bool):
+        if not self.process.is_alive():
+            self.restart()
+        packed, _ = _pack(args, self.shm_in.buf)
+        self.conn.send(("call", method, packed, kwargs, stream))
+
+    def recv(self):
+        """Next reply, with arrays copied out of shared memory."""
+        try:
+            msg = self.conn.recv()
+        except (EOFError, OSError):
+            self.restart()
+            raise InferenceError(f"Inference worker {self.index} died during a call")
+        if msg[0] == "error":
+            raise InferenceError(f"{msg[1]}\n{msg[2]}")
+        if msg[0] in ("result", "item"):
+            return msg[0], _unpack(msg[1], self.shm_out.buf, copy=True)
+        return msg[0], None
+
+    def stop(self):
+        if self.process is not None and self.process.pid is not None:
+            try:
+                self.conn.send(("stop",))
+            except (BrokenPipeError, OSError):
+                pass
+            self.process.join(timeout=5)
+            if self.process.is_alive():
+                self.process.kill()
+        for shm in (self.shm_in, self.shm_out):
+            shm.close()
+            shm.unlink()
+
+
+class InferencePool:
+    """Dispatches calls to the first idle worker; async and blocking entry points."""
+
+    def __init__(
+        self,
+        service: str,
+        service_kwargs: Optional[dict] = None,
+        num_workers: int = 2,
+        shm_bytes: int = 8 * 2**20,
+        startup_timeout: float = 300.0,
+    ):
+        """
+        Initialize inference pool and start its workers.
+
+        Args:
+            service: "module:Class" built once in every worker
+            service_kwargs: Keyword arguments for the service constructor
+            num_workers: Number of worker processes
+            shm_bytes: Size of each worker's input and output buffer
+            startup_timeout: Seconds a worker may take to load its model
+        """
+        self.service = service
+        self.service_kwargs = service_kwargs or {}
+        self.shm_bytes = shm_bytes
+        self.startup_timeout = startup_timeout
+        # Never fork a process that may already hold torch/ORT thread pools
+        self._ctx = mp.get_context("spawn")
+
+        self.num_workers = num_workers
+        self._start_workers()
+        self._closed = False
+        atexit.register(self.close, 1.0)
+        # A server worker forked by serve.py gets inference workers of its own;
+        # the inherited ones stay with the parent
+        reopen_after_fork(self._start_workers)
+
+    def _start_workers(self):
+        self._workers = [_Worker(self, i) for i in range(self.num_workers)]
+        self._idle: "queue.Queue[_Worker]" = queue.Queue()
+        try:
+            for worker in self._workers:
+                worker.start()
+                self._idle.put(worker)
+        except Exception:
+            for worker in self._workers:
+                worker.stop()
+            raise
+
+    def _acquire(self, method: str) -> _Worker:
+        t0 = perf_counter()
+        worker = self._idle.get()
+        metrics.observe("inference_queue_wait_ms", (perf_counter() - t0) * 1000, method=method)
+        return worker
+
+    def call_sync(self, method: str, *args, **kwargs) -> Any:
+        """Blocking call of `service.method(*args, **kwargs)` on an idle worker."""
+        worker = self._acquire(method)
+        t0 = perf_counter()
+        try:
+            worker.send_call(method, args, kwargs, stream=False)
+            _, result = worker.recv()
+            return result
+        finally:
+            self._idle.put(worker)
+            metrics.observe("inference_call_ms", (perf_counter() - t0) * 1000, method=method)
+
+    async def call(self, method: str, *args, **kwargs) -> Any:
+        """Async call of `service.method(*args, **kwargs)` on an idle worker."""
+        return await asyncio.to_thread(self.call_sync, method, *args, **kwargs)
+
+    async def stream(self, method: str, *args, **kwargs) -> AsyncIterator[Any]:
+        """Yield the items of a generator method as the worker produces them."""
+        worker = await asyncio.to_thread(self._acquire, method)
+        loop = asyncio.get_running_loop()
+        items: asyncio.Queue = asyncio.Queue()
+        cancelled = threading.Event()
+        # One thread owns the worker's pipe for the whole call, so there is never a second reader
+        threading.Thread(
+            target=self._read_stream,
+            args=(worker, method, args, kwargs, loop, items, cancelled),
+            name=f"inference-stream-{worker.index}",
+            daemon=True,
+        ).start()
+        try:
+            while True:
+                kind, item = await items.get()
+                if kind == "done":
+                    return
+                if kind == "error":
+                    raise item
+                yield item
+        finally:
+            # Consumer stopped early (or was cancelled): the reader cancels the generator and drains
+            cancelled.set()
+
+    def _read_stream(self, worker: _Worker, method: str, args: tuple, kwargs: dict, loop, items, cancelled):
+        """Runs a streaming call to completion and hands the items to the event loop."""
+        def put(kind, item=None):
+            try:
+                loop.call_soon_threadsafe(items.put_nowait, (kind, item))
+            except RuntimeError:
+                pass  # event loop already closed
+
+        try:
+            worker.send_call(method, args, kwargs, stream=True)
+            while True:
+                kind, item = worker.recv()
+                if kind == "done":
+                    break
+                # Copied out already; let the worker go on, or stop its generator
+                worker.conn.send(("cancel",) if cancelled.is_set() else ("next",))
+                if not cancelled.is_set():
+                    put(kind, item)
+            put("done")
+        except Exception as e:
+            put("error", e if isinstance(e, InferenceError) else InferenceError(str(e)))
+        finally:
+            self._idle.put(worker)
+
+    def close(self, timeout: float = 5.0):
+        """Stop every worker (after its current call, up to `timeout`) and release the shared buffers."""
+        if self._closed:
+            return
+        self._closed = True
+        for _ in self._workers:
+            try:
+                self._idle.get(timeout=timeout)
+            except queue.Empty:
+                break
+        for worker in self._workers:
+            worker.stop()
+
+
+# ------------------------------------------------------------------
+# Services (constructed inside the worker processes)
+# ------------------------------------------------------------------
+
+class WhisperService:
+    """faster-whisper model; same decode options as FasterWhisperSTT."""
+
+    def __init__(self, model_size: str = "base", device: str = "cpu", compute_type: str = "int8",
+                 language: Optional[str] = "en", vad_filter: bool = False):
+        from faster_whisper import WhisperModel
+
+        self.model = WhisperModel(model_size, device=device, compute_type=compute_type)
+        self.language = language
+        self.vad_filter = vad_filter
+
+    def transcribe(self, audio: np.ndarray, initial_prompt: Optional[str] = None, word_timestamps: bool = False):
+        segments, _ = self.model.transcribe(
+            audio,
+            language=self.language,
+            vad_filter=self.vad_filter,
+            initial_prompt=initial_prompt,
+            condition_on_previous_text=False,
+            word_timestamps=word_timestamps,
+            without_timestamps=not word_timestamps,
+        )
+        texts = []
+        words = []
+        for segment in segments:
+            if segment.text.strip():
+                texts.append(segment.text.strip())
+            words.extend((w.start, w.end, w.word) for w in segment.words or [])
+        return " ".join(texts), words
+
+
+class ConformerService:
+    """Indic-Conformer (HF AutoModel, or the int8 ONNX export when `onnx_dir` is set)."""
+
+    def __init__(self, model_name: str = "ai4bharat/indic-conformer-600m-multilingual",
+                 onnx_dir: Optional[str] = None, language: str = "hi", decoder_type: str = "ctc"):
+        if onnx_dir:
+            from src.stt.indic_conformer_onnx import OnnxConformerModel
+
+            self.model = OnnxConformerModel(onnx_dir)
+        else:
+            from transformers import AutoModel
+
+            self.model = AutoModel.from_pretrained(model_name, trust_remote_code=True)
+        self.language = language
+        self.decoder_type = decoder_type
+
+    def transcribe(self, audio: np.ndarray) -> str:
+        import torch
+
+        with torch.no_grad():
+            return self.model(torch.from_numpy(audio).unsqueeze(0), self.language, self.decoder_type).strip()
+
+
+class TranslatorService:
+    """IndicTrans2 translator (HF, or the CTranslate2 int8 conversion when `ct2_dir` is set)."""
+
+    def __init__(self, ct2_dir: Optional[str] = None, **kwargs):
+        if ct2_dir:
+            from src.translators.indicTrans2_ct2 import CT2IndicTrans2Translator
+
+            self.translator = CT2IndicTrans2Translator(ct2_dir, **kwargs)
+        else:
+            from src.translators.indicTrans2 import IndicTrans2Translator
+
+            self.translator = IndicTrans2Translator(**kwargs)
+
+    def translate(self, text, **options):
+        return self.translator.translate(text, **options)
+
+
+class LLMService:
+    """Causal LM that streams decoded text for an already formatted prompt."""
+
+    def __init__(self, model_name: str = "Qwen/Qwen2.5-0.5B-Instruct", device: str = "auto"):
+        import torch
+        from transformers import AutoModelForCausalLM, AutoTokenizer
+
+        self.tokenizer = AutoTokenizer.from_pretrained(model_name)
+        self.model = AutoModelForCausalLM.from_pretrained(
+            model_name,
+            torch_dtype=torch.bfloat16 if torch.cuda.is_available() else torch.float32,
+            device_map=device,
+            low_cpu_mem_usage=True,
+        )
+
+    def generate(self, prompt: str, **generation_kwargs):
+        from transformers import StoppingCriteriaList
+        from transformers.generation.streamers import TextIteratorStreamer
+
+        stop = threading.Event()
+        inputs = self.tokenizer(prompt, return_tensors="pt").to(self.model.device)
+        streamer = TextIteratorStreamer(self.tokenizer, skip_prompt=True, skip_special_tokens=True)
+        thread = threading.Thread(
+            target=self.model.generate,
+            kwargs={
+                **inputs,
+                "streamer": streamer,
+                # Checked after every token; set when the parent cancels the stream
+                "stopping_criteria": StoppingCriteriaList([lambda input_ids, scores, **kw: stop.is_set()]),
+                **generation_kwargs,
+            },
+        )
+        thread.start()
+        try:
+            yield from streamer
+        finally:
+            stop.set()
+            thread.join()
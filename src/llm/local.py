@@ -6,7 +6,9 @@ from transformers import AutoModelForCausalLM, AutoTokenizer
 from transformers.generation.streamers import TextIteratorStreamer
 import threading
 
+from src.inference_pool import InferencePool
 from src.llm.llm_provider import LLMProvider
+from src.model_manager import ModelManager
 
 
 class LocalLLM(LLMProvider):
@@ -19,6 +21,8 @@ class LocalLLM(LLMProvider):
         max_new_tokens: int = 512,
         max_history: int = 1000,
         knowledge_base: Optional[Dict[str, str]] = None,
+        model_manager: Optional[ModelManager] = None,
+        inference_pool: Optional[InferencePool] = None,
     ):
         """
         Initialize Local LLM.
@@ -29,21 +33,45 @@ class LocalLLM(LLMProvider):
             max_new_tokens: Maximum tokens to generate
             max_history: Maximum number of conversation turns to keep
             knowledge_base: Optional dict of {question: answer} for RAG
+            model_manager: Load the weights lazily through a shared ModelManager
+            inference_pool: Generate in worker processes (LLMService with the same model_name)
         """
         super().__init__(max_history=max_history, knowledge_base=knowledge_base)
         
-        print(f"Loading model: {model_name}")
-        
         self.tokenizer = AutoTokenizer.from_pretrained(model_name)
-        self.model = AutoModelForCausalLM.from_pretrained(
-            model_name,
-            torch_dtype=torch.bfloat16 if torch.cuda.is_available() else torch.float32,
-            device_map=device,
-            low_cpu_mem_usage=True
-        )
         self.max_new_tokens = max_new_tokens
-        
-        print(f"✅ Model loaded on {self.model.device}")
+        self.model_manager = model_manager
+        self.model_key = f"llm:{model_name}"
+        self.inference_pool = inference_pool
+
+        def load():
+            return AutoModelForCausalLM.from_pretrained(
+                model_name,
+                torch_dtype=torch.bfloat16 if torch.cuda.is_available() else torch.float32,
+                device_map=device,
+                low_cpu_mem_usage=True
+            )
+
+        if inference_pool:
+            # Only the tokenizer is needed here, for the chat template
+            self.model = None
+        elif model_manager:
+            # Instances with the same model name share one copy of the weights
+            model_manager.register(self.model_key, load)
+            self.model = None
+        else:
+            print(f"Loading model: {model_name}")
+            self.model = load()
+            print(f"✅ Model loaded on {self.model.device}")
+
+    def _acquire_model(self):
+        if self.model_manager:
+            return self.model_manager.acquire(self.model_key)
+        return self.model
+
+    def _release_model(self):
+        if self.model_manager:
+            self.model_manager.release(self.model_key)
     
     def _format_messages_for_local_model(
         self, 
@@ -162,39 +190,63 @@ class LocalLLM(LLMProvider):
             tokenize=False,
             add_generation_prompt=True
         )
-        
-        inputs = self.tokenizer(
-            formatted_prompt, 
-            return_tensors="pt"
-        ).to(self.model.device)
-        
-        # Setup streaming
-        streamer = TextIteratorStreamer(
-            self.tokenizer,
-            skip_prompt=True,
-            skip_special_tokens=True
-        )
-        
-        generation_kwargs = {
-            **inputs,
-            "streamer": streamer,
+
+        sampling_kwargs = {
             "max_new_tokens": self.max_new_tokens,
             "temperature": 0.7,
             "do_sample": True,
             "top_p": 0.9,
             "repetition_penalty": 1.1
         }
+
+        if self.inference_pool:
+            # Tokens stream back from a worker process; closing this generator cancels it
+            full_response = ""
+            async for text_chunk in self.inference_pool.stream("generate", formatted_prompt, **sampling_kwargs):
+                full_response += text_chunk
+                yield text_chunk
+            self.add_to_history("assistant", full_response)
+            return
         
-        # Run generation in thread to avoid blocking
-        thread = threading.Thread(
-            target=self.model.generate,
-            kwargs=generation_kwargs
-        )
-        thread.start()
-        
-        # Stream tokens asynchronously
+        # Held until generation finishes so the manager cannot evict it mid-reply
+        acquiring = asyncio.ensure_future(asyncio.to_thread(self._acquire_model))
+        try:
+            model = await asyncio.shield(acquiring)
+        except asyncio.CancelledError:
+            # Interrupted while loading: the thread still takes a reference, give it back
+            acquiring.add_done_callback(
+                lambda f: None if f.cancelled() or f.exception() else self._release_model()
+            )
+            raise
+        thread = None
         full_response = ""
         try:
+            inputs = self.tokenizer(
+                formatted_prompt, 
+                return_tensors="pt"
+            ).to(model.device)
+            
+            # Setup streaming
+            streamer = TextIteratorStreamer(
+                self.tokenizer,
+                skip_prompt=True,
+                skip_special_tokens=True
+            )
+            
+            generation_kwargs = {
+                **inputs,
+                "streamer": streamer,
+                **sampling_kwargs
+            }
+            
+            # Run generation in thread to avoid blocking
+            thread = threading.Thread(
+                target=model.generate,
+                kwargs=generation_kwargs
+            )
+            thread.start()
+            
+            # Stream tokens asynchronously
             for text_chunk in streamer:
                 full_response += text_chunk
                 yield text_chunk
@@ -203,7 +255,9 @@ class LocalLLM(LLMProvider):
             print(f"❌ Generation error: {e}")
             raise
         finally:
-            thread.join()
+            if thread is not None:
+                thread.join()
+            self._release_model()
         
         # Add assistant response to history
         self.add_to_history("assistant", full_response)
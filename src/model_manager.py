@@ -0,0 +1,235 @@
+"""Process-wide registry of local models with a memory budget and idle eviction."""
+import asyncio
+import gc
+import logging
+import threading
+from contextlib import contextmanager
+from time import monotonic, perf_counter
+from typing import Any, Callable, Dict, List, Optional
+
+import psutil
+
+from src.forking import reopen_after_fork
+from src.metrics import metrics
+
+logger = logging.getLogger("app")
+
+
+def _rss_mb() -> float:
+    return psutil.Process().memory_info().rss / 2**20
+
+
+def _model_size_mb(model: Any) -> Optional[float]:
+    """Parameter + buffer size of torch modules (also inside tuples/lists), if any."""
+    if isinstance(model, (tuple, list)):
+        sizes = [_model_size_mb(m) for m in model]
+        known = [s for s in sizes if s is not None]
+        return sum(known) if known else None
+    if hasattr(model, "parameters") and hasattr(model, "buffers"):
+        tensors = list(model.parameters()) + list(model.buffers())
+        return sum(t.numel() * t.element_size() for t in tensors) / 2**20
+    return None
+
+
+class _Entry:
+    def __init__(self, key: str, loader: Callable[[], Any], size_mb: Optional[float], fork_safe: bool):
+        self.key = key
+        self.loader = loader
+        self.size_mb = size_mb
+        self.fork_safe = fork_safe
+        self.model: Any = None
+        self.refs = 0
+        self.last_used = 0.0
+        self.loads = 0
+        self.load_ms: Optional[float] = None
+        self.load_lock = threading.Lock()
+
+
+class ModelManager:
+    """
+    Hands out shared model instances by key.
+
+    Providers register a loader once and wrap each inference in
+    `with manager.use(key) as model:`. Instances are shared and ref-counted;
+    a model nobody is using is unloaded when it has been idle for
+    `idle_seconds`, or earlier in LRU order when loading another model would
+    exceed `budget_mb`. The next `use()` reloads it.
+
+    Before serve.py forks its workers, `preload()` loads every fork-safe
+    model so the workers share its weights copy-on-write. Models that own
+    threads which do not survive fork() (CTranslate2) are registered with
+    `fork_safe=False`; a forked child forgets them and loads its own copy on
+    first use.
+    """
+
+    def __init__(self, budget_mb: Optional[float] = None, idle_seconds: Optional[float] = 600.0):
+        """
+        Initialize model manager.
+
+        Args:
+            budget_mb: Memory budget for resident models (None = unlimited)
+            idle_seconds: Unload models unused for this long (None = never)
+        """
+        self.budget_mb = budget_mb
+        self.idle_seconds = idle_seconds
+        self._entries: Dict[str, _Entry] = {}
+        self._lock = threading.RLock()
+        reopen_after_fork(self._after_fork)
+
+    def register(
+        self,
+        key: str,
+        loader: Callable[[], Any],
+        size_mb: Optional[float] = None,
+        fork_safe: bool = True,
+    ) -> str:
+        """
+        Register a model loader; registering an existing key keeps the first loader.
+
+        Args:
+            key: Model key shared by every provider using the same weights
+            loader: Zero-argument callable that loads and returns the model
+            size_mb: Expected resident size (measured on first load if None)
+            fork_safe: Whether a forked child can keep using an instance loaded before the fork
+        """
+        with self._lock:
+            if key not in self._entries:
+                self._entries[key] = _Entry(key, loader, size_mb, fork_safe)
+        return key
+
+    def preload(self):
+        """Load every fork-safe model now (serve.py calls this before forking)."""
+        for entry in list(self._entries.values()):
+            if entry.fork_safe:
+                with entry.load_lock:
+                    if entry.model is None:
+                        self._load(entry)
+
+    def _after_fork(self):
+        """In a forked child: fresh locks, and no instance whose threads stayed in the parent."""
+        self._lock = threading.RLock()
+        for entry in self._entries.values():
+            entry.load_lock = threading.Lock()
+            entry.refs = 0
+            entry.last_used = monotonic()
+            if not entry.fork_safe:
+                entry.model = None
+
+    def acquire(self, key: str) -> Any:
+        """Take a reference, loading the model if it is not resident. Blocks while loading."""
+        entry = self._entries[key]
+        with self._lock:
+            entry.refs += 1
+        try:
+            with entry.load_lock:
+                if entry.model is None:
+                    self._load(entry)
+        except Exception:
+            self.release(key)
+            raise
+        return entry.model
+
+    def release(self, key: str):
+        entry = self._entries[key]
+        with self._lock:
+            entry.refs -= 1
+            entry.last_used = monotonic()
+
+    @contextmanager
+    def use(self, key: str):
+        """Context manager around acquire()/release()."""
+        model = self.acquire(key)
+        try:
+            yield model
+        finally:
+            self.release(key)
+
+    @property
+    def resident_mb(self) -> float:
+        with self._lock:
+            return sum(e.size_mb or 0 for e in self._entries.values() if e.model is not None)
+
+    def _load(self, entry: _Entry):
+        if entry.size_mb is not None:
+            self._make_room(entry.size_mb, exclude=entry)
+
+        logger.info(f"📥 Loading model {entry.key}")
+        rss_before = _rss_mb()
+        t0 = perf_counter()
+        model = entry.loader()
+        load_ms = (perf_counter() - t0) * 1000
+
+        size = _model_size_mb(model)
+        if size is None:
+            size = max(_rss_mb() - rss_before, 0.0)
+
+        with self._lock:
+            entry.model = model
+            entry.size_mb = size
+            entry.loads += 1
+            entry.load_ms = load_ms
+            entry.last_used = monotonic()
+
+        metrics.observe("model_load_ms", load_ms, model=entry.key)
+        metrics.set("model_resident_mb", size, model=entry.key)
+        logger.info(f"✅ Loaded {entry.key} in {load_ms:.0f} ms ({size:.0f} MB)")
+
+        # The measured size may be larger than expected
+        self._make_room(0, exclude=entry)
+
+    def _make_room(self, needed_mb: float, exclude: Optional[_Entry] = None):
+        """Unload idle models, least recently used first, until `needed_mb` fits the budget."""
+        if self.budget_mb is None:
+            return
+        with self._lock:
+            idle = sorted(
+                (e for e in self._entries.values() if e.model is not None and e.refs == 0 and e is not exclude),
+                key=lambda e: e.last_used,
+            )
+            while self.resident_mb + needed_mb > self.budget_mb and idle:
+                self._unload(idle.pop(0), reason="memory budget")
+            if self.resident_mb + needed_mb > self.budget_mb:
+                logger.warning(
+                    f"⚠️ Model memory {self.resident_mb + needed_mb:.0f} MB exceeds budget "
+                    f"{self.budget_mb:.0f} MB; every resident model is in use"
+                )
+
+    def _unload(self, entry: _Entry, reason: str):
+        entry.model = None
+        metrics.set("model_resident_mb", 0, model=entry.key)
+        metrics.incr("model_evictions", model=entry.key)
+        logger.info(f"📤 Unloaded {entry.key} ({reason})")
+        gc.collect()
+
+    def evict_idle(self):
+        """Unload models unused for longer than `idle_seconds`."""
+        if self.idle_seconds is None:
+            return
+        now = monotonic()
+        with self._lock:
+            for entry in self._entries.values():
+                if entry.model is not None and entry.refs == 0 and now - entry.last_used > self.idle_seconds:
+                    self._unload(entry, reason="idle")
+
+    async def run_eviction(self, interval: float = 30.0):
+        """Background task that periodically evicts idle models."""
+        while True:
+            await asyncio.sleep(interval)
+            self.evict_idle()
+
+    def residency(self) -> List[dict]:
+        """Current state of every registered model."""
+        now = monotonic()
+        with self._lock:
+            return [
+                {
+                    "model": e.key,
+                    "resident": e.model is not None,
+                    "size_mb": round(e.size_mb, 1) if e.size_mb is not None else None,
+                    "refs": e.refs,
+                    "loads": e.loads,
+                    "last_load_ms": round(e.load_ms, 1) if e.load_ms is not None else None,
+                    "idle_s": round(now - e.last_used, 1) if e.model is not None and e.refs == 0 else None,
+                }
+                for e in self._entries.values()
+            ]
@@ -0,0 +1,123 @@
+"""Per-session outbound audio pacing."""
+import asyncio
+import logging
+from collections import deque
+from time import monotonic
+from typing import Awaitable, Callable, Deque, Optional, Tuple
+
+from src.metrics import metrics
+
+logger = logging.getLogger("app")
+
+
+class AudioPacer:
+    """
+    Sends TTS audio to the client only a small lead ahead of real time.
+
+    Drop-in replacement for the pipeline's audio callback. `audio_chunk`
+    payloads are split into fixed-duration frames and held server-side until
+    the client's estimated playback position is within `lead_ms` of them;
+    other messages keep their place in the stream. `clear_queue` is sent
+    immediately and discards every frame not yet sent, so an interruption
+    costs at most `lead_ms` of already-delivered audio.
+    """
+
+    def __init__(
+        self,
+        send: Callable[[str, dict], Awaitable[None]],
+        sample_rate: int = 16000,
+        frame_ms: int = 100,
+        lead_ms: int = 300,
+    ):
+        """
+        Initialize pacer.
+
+        Args:
+            send: Coroutine function(message_type, data) that writes to the client
+            sample_rate: Sample rate of the outgoing PCM16 audio
+            frame_ms: Duration of each frame sent to the client
+            lead_ms: How far ahead of playback the client is kept
+        """
+        self.send = send
+        self.bytes_per_sec = sample_rate * 2
+        self.frame_bytes = int(sample_rate * frame_ms / 1000) * 2
+        self.lead = lead_ms / 1000
+
+        self._queue: Deque[Tuple[str, dict]] = deque()
+        self._queued_bytes = 0
+        self._wakeup = asyncio.Event()
+        self._playback_end = 0.0  # when the client runs out of audio we sent
+        self._task: Optional[asyncio.Task] = None
+        self.closed = False  # set when sending fails (client gone) or on close()
+
+    async def __call__(self, message_type: str, data: dict):
+        if self.closed:
+            # Nobody is draining the queue any more
+            return
+
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+        if message_type == "clear_queue":
+            saved = self._drop()
+            if saved:
+                metrics.observe("pacer_bytes_saved", saved)
+                metrics.incr("pacer_bytes_saved_total", saved)
+                logger.info(f"✂️  Dropped {saved} unsent audio bytes ({saved / self.bytes_per_sec:.1f}s)")
+            self._playback_end = 0.0
+            await self.send(message_type, data)
+            return
+
+        if message_type == "audio_chunk":
+            audio = data["data"]
+            for frame, start in enumerate(range(0, len(audio), self.frame_bytes)):
+                chunk = audio[start:start + self.frame_bytes]
+                self._queue.append((message_type, {**data, "data": chunk, "frame": frame}))
+                self._queued_bytes += len(chunk)
+        else:
+            self._queue.append((message_type, data))
+
+        self._wakeup.set()
+
+    def _drop(self) -> int:
+        """Discard unsent frames; returns the number of audio bytes saved."""
+        saved = self._queued_bytes
+        self._queue.clear()
+        self._queued_bytes = 0
+        return saved
+
+    async def _run(self):
+        while True:
+            if not self._queue:
+                self._wakeup.clear()
+                await self._wakeup.wait()
+                continue
+
+            message_type, data = self._queue[0]
+
+            if message_type == "audio_chunk":
+                now = monotonic()
+                ahead = self._playback_end - now
+                if ahead > self.lead:
+                    # The queue may be cleared meanwhile, so re-check afterwards
+                    await asyncio.sleep(ahead - self.lead)
+                    continue
+                self._queued_bytes -= len(data["data"])
+                self._playback_end = max(now, self._playback_end) + len(data["data"]) / self.bytes_per_sec
+
+            self._queue.popleft()
+            try:
+                await self.send(message_type, data)
+            except Exception as e:
+                # Typically the client disconnected; stop accepting audio for it
+                logger.warning(f"⚠️ [AudioPacer] Send failed, dropping the rest of the stream: {e!r}")
+                self.closed = True
+                self._drop()
+                return
+
+    async def close(self):
+        # Frames left at disconnect were never going to be played; not an interruption saving
+        self.closed = True
+        self._drop()
+        if self._task:
+            self._task.cancel()
@@ -1,17 +1,38 @@
 """Voice assistant pipeline orchestrating STT -> LLM -> TTS with interruption handling."""
 import asyncio
 import logging
-from time import perf_counter
-from typing import AsyncIterator, Callable, Optional
+from contextlib import aclosing
+from time import monotonic, perf_counter
+from typing import TYPE_CHECKING, AsyncIterator, Awaitable, Callable, Optional
+
+import numpy as np
+
+from src.filler import AcknowledgementFiller
 from src.llm.llm_provider import LLMProvider
+from src.metrics import metrics
 from src.stt.stt_provider import STTProvider
-from src.translators.indicTrans2 import IndicTrans2Translator
+from src.stt.vad import Endpointer, SileroVAD
+from src.stt.vad_gate import VADGatedSTT
+from src.translators.batching import TranslationBatcher
+from src.translators.fast_path import TranslationFastPath
+from src.tts.pcm import converter_for
+from src.tts.scheduler import FIRST, NEXT, tts_priority
 from src.tts.tts_provider import TTSProvider
 
+if TYPE_CHECKING:
+    # Importing the translator pulls in torch/transformers
+    from src.translators.indicTrans2 import IndicTrans2Translator
+
 logger = logging.getLogger("app")
 
 class VoicePipeline:
-    """Pipeline orchestrating STT, LLM, and TTS providers with server-side audio queue management."""
+    """
+    Pipeline orchestrating STT, LLM, and TTS providers with server-side audio queue management.
+
+    Holds the interruption state of one conversation (utterance ids, the
+    running response, filler, playback estimate); create one per connection
+    over shared providers.
+    """
     
     def __init__(
         self,
@@ -20,9 +41,16 @@ class VoicePipeline:
         tts: TTSProvider,
         min_tts_chars,
         max_tts_chars,
-        translator: Optional[IndicTrans2Translator] = None,
+        translator: Optional["IndicTrans2Translator"] = None,
         sentence_delimiters: tuple = (".", "!", "?", ","),
         enable_timing: bool = True,
+        filler: Optional[AcknowledgementFiller] = None,
+        vad: Optional[SileroVAD] = None,
+        barge_in_threshold: float = 0.6,
+        barge_in_min_speech_ms: int = 200,
+        output_sample_rate: int = 16000,
+        translation_batcher: Optional[TranslationBatcher] = None,
+        translation_fast_path: Optional[TranslationFastPath] = None,
     ):
         """
         Initialize voice pipeline.
@@ -33,17 +61,35 @@ class VoicePipeline:
             tts: Text-to-speech provider
             sentence_delimiters: Punctuation marks that trigger TTS
             enable_timing: Enable performance timing logs
+            filler: Optional acknowledgement clips played while the LLM is thinking
+            vad: Shared SileroVAD; enables barge-in as soon as the caller starts speaking
+                (a VADGatedSTT's frame probabilities are used instead of a second VAD pass)
+            barge_in_threshold: Speech probability that counts towards a barge-in
+            barge_in_min_speech_ms: Speech required before barging in (ignores coughs and clicks)
+            output_sample_rate: Sample rate of the PCM16 audio sent to the client
+            translation_batcher: Shared TranslationBatcher; batches translations across sessions
+            translation_fast_path: Skips translation for non-Indic text and caches frequent phrases
         """
         self.stt = stt
         self.llm = llm
         self.tts = tts
         self.translator = translator
+        self.translation_batcher = translation_batcher
+        self.translation_fast_path = translation_fast_path
         self.sentence_delimiters = sentence_delimiters
         self.min_tts_chars = min_tts_chars
         self.max_tts_chars = max_tts_chars
         self.enable_timing = enable_timing
+        self.filler = filler
         self._utterance_id = 0
         self._current_task = None
+        self._filler_task: Optional[asyncio.Task] = None
+        self.vad = vad
+        self.barge_in_threshold = barge_in_threshold
+        self.barge_in_min_speech_ms = barge_in_min_speech_ms
+        self.output_sample_rate = output_sample_rate
+        # Estimated wall-clock time at which the client finishes playing what we sent
+        self._playback_end = 0.0
     
     async def process_utterance(
         self,
@@ -69,11 +115,19 @@ class VoicePipeline:
             t_stt = (perf_counter() - t0) * 1000
             logger.info(f"⏱️  STT complete @ {t_stt:.0f} ms")
 
+        if self.tts.accepts_text_stream:
+            await self._speak_token_stream(text, audio_callback, utterance_id, t0)
+            return
         
         buffer = ""
         seq = 0
         first_token = True
         first_audio = True
+        t_first_token = t0
+        # TTS priority: sentences requested so far and when the audio sent so far finishes playing
+        sentences = 0
+        playback_end = 0.0
+        bytes_per_sec = self.output_sample_rate * 2
         
         # Stream LLM response
         async for chunk in self.llm.generate_stream(text):
@@ -82,8 +136,11 @@ class VoicePipeline:
                     logger.info("⛔ Interrupted during LLM")
                 return
             
-            if first_token and self.enable_timing:
-                logger.info(f"⏱️  LLM first token @ {(perf_counter()-t0)*1000:.0f} ms")
+            if first_token:
+                t_first_token = perf_counter()
+                self._observe("llm_ttft_ms", (t_first_token - t0) * 1000)
+                if self.enable_timing:
+                    logger.info(f"⏱️  LLM first token @ {(t_first_token-t0)*1000:.0f} ms")
                 first_token = False
             
             buffer += chunk
@@ -109,42 +166,62 @@ class VoicePipeline:
                 if self.enable_timing:
                     logger.info(f"🗣️  TTS chunk: {sentence}")
 
-                # Synthesize audio
-                audio = await self.tts.synthesize(sentence)
-                
-                # Check again if interrupted after synthesis
-                if utterance_id != self._utterance_id:
-                    if self.enable_timing:
-                        logger.info("⛔ Interrupted during TTS")
-                    return
-                
-                if self.enable_timing:
-                    t_audio = (perf_counter() - t0) * 1000
-                    logger.info(f"⏱️  TTS done @ {t_audio:.0f} ms ({len(audio)} bytes)")
-                
-                # Send audio chunk via callback
-                await audio_callback("audio_chunk", {
-                    "seq": seq,
-                    "data": audio,
-                    "utterance_id": utterance_id
-                })
-                
-                if first_audio and self.enable_timing:
-                    t_first = (perf_counter() - t0) * 1000
-                    logger.info(f"⏱️  First audio sent @ {t_first:.0f} ms")
-                    first_audio = False
-                
-                seq += 1
+                if first_audio:
+                    elapsed = perf_counter() - t_first_token
+                    if elapsed > 0:
+                        self._observe("llm_chars_per_sec", len(sentence) / elapsed)
+
+                # Synthesize audio; streaming providers hand it over sentence by sentence
+                # The caller is waiting for the first sentence; later ones are due when the audio sent so far runs out
+                priority, deadline = (FIRST, monotonic()) if sentences == 0 else (NEXT, playback_end)
+                sentences += 1
+                t_tts = perf_counter()
+                with tts_priority(priority, deadline):
+                    async with aclosing(self._normalized(self.tts.synthesize_stream(sentence))) as pieces:
+                        async for audio in pieces:
+                            # Check again if interrupted during synthesis
+                            if utterance_id != self._utterance_id:
+                                if self.enable_timing:
+                                    logger.info("⛔ Interrupted during TTS")
+                                return
+
+                            if t_tts is not None:
+                                self._observe("tts_ms", (perf_counter() - t_tts) * 1000)
+                                t_tts = None
+
+                            if self.enable_timing:
+                                t_audio = (perf_counter() - t0) * 1000
+                                logger.info(f"⏱️  TTS audio @ {t_audio:.0f} ms ({len(audio)} bytes)")
+
+                            # Send audio chunk via callback
+                            await audio_callback("audio_chunk", {
+                                "seq": seq,
+                                "data": audio,
+                                "utterance_id": utterance_id
+                            })
+
+                            if first_audio and self.enable_timing:
+                                t_first = (perf_counter() - t0) * 1000
+                                logger.info(f"⏱️  First audio sent @ {t_first:.0f} ms")
+                                first_audio = False
+
+                            playback_end = max(monotonic(), playback_end) + len(audio) / bytes_per_sec
+                            seq += 1
         
         # Flush remaining buffer
         if buffer.strip() and utterance_id == self._utterance_id:
-            audio = await self.tts.synthesize(buffer.strip())
-            if utterance_id == self._utterance_id:
-                await audio_callback("audio_chunk", {
-                    "seq": seq,
-                    "data": audio,
-                    "utterance_id": utterance_id
-                })
+            priority, deadline = (FIRST, monotonic()) if sentences == 0 else (NEXT, playback_end)
+            with tts_priority(priority, deadline):
+                async with aclosing(self._normalized(self.tts.synthesize_stream(buffer.strip()))) as pieces:
+                    async for audio in pieces:
+                        if utterance_id != self._utterance_id:
+                            break
+                        await audio_callback("audio_chunk", {
+                            "seq": seq,
+                            "data": audio,
+                            "utterance_id": utterance_id
+                        })
+                        seq += 1
         
         # Send completion signal
         if utterance_id == self._utterance_id:
@@ -156,6 +233,187 @@ class VoicePipeline:
             total = (perf_counter() - t0) * 1000
             logger.info(f"⏱️  Total time: {total:.0f} ms\n")
     
+    async def _speak_token_stream(
+        self,
+        text: str,
+        audio_callback: Callable[[str, dict], asyncio.Task],
+        utterance_id: int,
+        t0: float,
+    ):
+        """LLM tokens go straight to a streaming TTS without waiting for sentence boundaries."""
+        t_first_token = None
+
+        async def tokens():
+            nonlocal t_first_token
+            async for chunk in self.llm.generate_stream(text):
+                if utterance_id != self._utterance_id:
+                    return
+                if t_first_token is None:
+                    t_first_token = perf_counter()
+                    self._observe("llm_ttft_ms", (t_first_token - t0) * 1000)
+                    if self.enable_timing:
+                        logger.info(f"⏱️  LLM first token @ {(t_first_token-t0)*1000:.0f} ms")
+                yield chunk
+
+        seq = 0
+        # The whole turn is one request; the caller is waiting for its first audio (a scheduler slot is held only until then)
+        with tts_priority(FIRST, monotonic()):
+            async with aclosing(self._normalized(self.tts.synthesize_text_stream(tokens()))) as pieces:
+                async for audio in pieces:
+                    if utterance_id != self._utterance_id:
+                        if self.enable_timing:
+                            logger.info("⛔ Interrupted during TTS")
+                        return
+
+                    if seq == 0:
+                        self._observe("tts_ms", (perf_counter() - (t_first_token or t0)) * 1000)
+                        if self.enable_timing:
+                            logger.info(f"⏱️  First audio sent @ {(perf_counter() - t0) * 1000:.0f} ms")
+
+                    await audio_callback("audio_chunk", {
+                        "seq": seq,
+                        "data": audio,
+                        "utterance_id": utterance_id
+                    })
+                    seq += 1
+
+        if utterance_id == self._utterance_id:
+            await audio_callback("audio_complete", {
+                "utterance_id": utterance_id
+            })
+
+        if self.enable_timing:
+            total = (perf_counter() - t0) * 1000
+            logger.info(f"⏱️  Total time: {total:.0f} ms\n")
+
+    async def _normalized(self, pieces: AsyncIterator[bytes]) -> AsyncIterator[bytes]:
+        """Convert TTS output to PCM16 mono at output_sample_rate as it streams."""
+        converter = None
+        async with aclosing(pieces):
+            async for audio in pieces:
+                if converter is None:
+                    # Asked once audio arrives: some providers learn their format from the stream
+                    converter = converter_for(self.tts.get_audio_format(), self.output_sample_rate)
+                audio = converter.push(audio)
+                if audio:
+                    yield audio
+        if converter is not None:
+            tail = converter.flush()
+            if tail:
+                yield tail
+
+    def _observe(self, stage: str, value: float):
+        """Feed a stage timing to the filler's first-audio estimator."""
+        if self.filler:
+            self.filler.estimator.observe(stage, value)
+
+    async def _play_filler(
+        self,
+        text: str,
+        audio_callback: Callable[[str, dict], asyncio.Task],
+        utterance_id: int,
+    ):
+        """Send a pre-rendered acknowledgement clip ahead of the real response."""
+        clip = self.filler.pick(text)
+        if clip is None or utterance_id != self._utterance_id:
+            return
+
+        if self.enable_timing:
+            logger.info(f"🎧 Playing filler clip ({len(clip)} bytes)")
+
+        await audio_callback("audio_chunk", {
+            "seq": -1,
+            "data": clip,
+            "utterance_id": utterance_id,
+            "filler": True,
+        })
+
+    def _track_playback(self, audio_callback: Callable[[str, dict], asyncio.Task]):
+        """Wrap the callback to estimate how long the client will keep playing."""
+        bytes_per_sec = self.output_sample_rate * 2
+
+        async def callback(message_type: str, data: dict):
+            if message_type == "audio_chunk":
+                now = monotonic()
+                self._playback_end = max(now, self._playback_end) + len(data["data"]) / bytes_per_sec
+            elif message_type == "clear_queue":
+                self._playback_end = 0.0
+            await audio_callback(message_type, data)
+
+        return callback
+
+    def _is_responding(self) -> bool:
+        """Whether the assistant is generating or (probably) still playing audio."""
+        busy = self._current_task is not None and not self._current_task.done()
+        return busy or monotonic() < self._playback_end
+
+    async def _barge_in(self, audio_callback: Callable[[str, dict], asyncio.Task]):
+        """Caller started talking over the assistant: stop it right away."""
+        if not self._is_responding():
+            return
+
+        old_id = self._utterance_id
+        self._utterance_id += 1
+
+        self._cancel_filler()
+        if self._current_task and not self._current_task.done():
+            self._current_task.cancel()
+        metrics.incr("barge_ins")
+
+        if self.enable_timing:
+            logger.info(f"✋ Barge-in detected, interrupting utterance {old_id}")
+
+        await audio_callback("clear_queue", {
+            "old_utterance_id": old_id,
+            "new_utterance_id": self._utterance_id
+        })
+
+    def _barge_in_detector(
+        self,
+        audio_callback: Callable[[str, dict], asyncio.Task],
+    ) -> Callable[[float], Awaitable[None]]:
+        """Per-session onset detector fed one speech probability per VAD frame."""
+        frame_ms = self.vad.frame_duration * 1000
+        endpointer = Endpointer(
+            self.barge_in_threshold,
+            min_speech_frames=max(1, int(self.barge_in_min_speech_ms / frame_ms)),
+            min_silence_frames=max(1, int(300 / frame_ms)),
+        )
+
+        async def on_speech_prob(prob: float):
+            if endpointer.update(prob) == "start":
+                await self._barge_in(audio_callback)
+
+        return on_speech_prob
+
+    async def _watch_voice_activity(
+        self,
+        audio_stream: AsyncIterator[bytes],
+        on_speech_prob: Callable[[float], Awaitable[None]],
+    ) -> AsyncIterator[bytes]:
+        """Pass inbound audio through unchanged, running the VAD over every frame (no VAD gate)."""
+        state = self.vad.new_state()
+        n = self.vad.frame_samples
+        leftover = np.zeros(0, dtype=np.float32)
+
+        async for chunk in audio_stream:
+            samples = np.frombuffer(chunk, dtype=np.int16).astype(np.float32) / 32768.0
+            if len(leftover):
+                samples = np.concatenate((leftover, samples))
+            usable = len(samples) - len(samples) % n
+            leftover = samples[usable:]
+
+            for i in range(0, usable, n):
+                await on_speech_prob(await asyncio.to_thread(self.vad.speech_prob, samples[i:i + n], state))
+
+            yield chunk
+
+    def _cancel_filler(self):
+        """Cancel a filler clip that has not been sent yet."""
+        if self._filler_task and not self._filler_task.done():
+            self._filler_task.cancel()
+        self._filler_task = None
+
     async def run(
         self,
         audio_input_stream: AsyncIterator[bytes],
@@ -168,8 +426,21 @@ class VoicePipeline:
             audio_input_stream: Stream of incoming audio chunks
             audio_callback: Callback for sending control messages and audio
         """
+        audio_callback = self._track_playback(audio_callback)
+        if not self.vad:
+            transcripts = self.stt.transcribe_stream(audio_input_stream)
+        elif isinstance(self.stt, VADGatedSTT):
+            # The gate already scores every frame; barge-in reuses its probabilities
+            transcripts = self.stt.transcribe_stream(
+                audio_input_stream, on_speech_prob=self._barge_in_detector(audio_callback)
+            )
+        else:
+            transcripts = self.stt.transcribe_stream(
+                self._watch_voice_activity(audio_input_stream, self._barge_in_detector(audio_callback))
+            )
+
         # Stream transcription
-        async for text in self.stt.transcribe_stream(audio_input_stream):
+        async for text in transcripts:
             # Interrupt any ongoing response
             old_id = self._utterance_id
             self._utterance_id += 1
@@ -178,25 +449,47 @@ class VoicePipeline:
             if self.enable_timing:
                 logger.info(f"🔔 New utterance detected (ID: {current_id}, interrupting: {old_id})")
             
+            # Drop any filler still pending for the previous utterance
+            self._cancel_filler()
+            
             # Signal client to clear audio queue
             await audio_callback("clear_queue", {
                 "old_utterance_id": old_id,
                 "new_utterance_id": current_id
             })
             
-            # 🌐 OPTIONAL TRANSLATION (SYNC → run in executor)
-            if self.translator:
+            # 🎧 OPTIONAL ACKNOWLEDGEMENT while translation + LLM are running
+            translating = self.translator is not None or self.translation_batcher is not None
+            translated_text = None
+            if translating and self.translation_fast_path:
+                # English / Latin-script text or a cached phrase: no model call
+                translated_text = self.translation_fast_path.lookup(text)
+                translating = translated_text is None
+            if self.filler and self.filler.should_play(self.min_tts_chars, translating):
+                self._filler_task = asyncio.create_task(
+                    self._play_filler(text, audio_callback, current_id)
+                )
+            
+            # 🌐 OPTIONAL TRANSLATION (batched across sessions, or SYNC → run in executor)
+            if translating:
                 loop = asyncio.get_running_loop()
+                t_translate = perf_counter()
                 try:
-                    translated_text = await loop.run_in_executor(
-                        None,
-                        self.translator.translate,
-                        text
-                    )
+                    if self.translation_batcher:
+                        translated_text = await self.translation_batcher.submit(text)
+                    else:
+                        translated_text = await loop.run_in_executor(
+                            None,
+                            self.translator.translate,
+                            text
+                        )
+                    self._observe("translation_ms", (perf_counter() - t_translate) * 1000)
+                    if self.translation_fast_path:
+                        self.translation_fast_path.store(text, translated_text)
                 except Exception as e:
                     logger.exception("Translation failed, falling back to original text")
                     translated_text = text
-            else:
+            elif translated_text is None:
                 translated_text = text
 
             # Abort if interrupted during translation
@@ -206,10 +499,13 @@ class VoicePipeline:
                 continue
         
             # Process each transcribed utterance
-            asyncio.create_task(
+            self._current_task = asyncio.create_task(
                 self.process_utterance(translated_text, audio_callback, current_id)
             )
     
     async def cleanup(self):
-        """Clean up all providers."""
+        """Stop this session's response; the shared STT only releases unclaimed connections."""
+        self._cancel_filler()
+        if self._current_task and not self._current_task.done():
+            self._current_task.cancel()
         await self.stt.close()
\ No newline at end of file
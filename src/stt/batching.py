@@ -0,0 +1,154 @@
+"""Process-wide micro-batching of local STT inference across sessions."""
+import bisect
+import inspect
+import logging
+from typing import Any, List, Optional, Tuple
+
+import numpy as np
+
+from src.batching import MicroBatcher
+
+logger = logging.getLogger("app")
+
+Word = Tuple[float, float, str]
+
+
+class WhisperBatchBackend:
+    """
+    Batches speech segments from many sessions through faster-whisper's
+    BatchedInferencePipeline: segments are laid end to end and passed as
+    clip_timestamps, so each one becomes a row of a single encoder/decoder batch.
+    """
+
+    name = "whisper"
+
+    def __init__(self, model, language: Optional[str] = "en", beam_size: int = 1):
+        """
+        Args:
+            model: Loaded faster_whisper.WhisperModel
+            language: Language code passed to every batch
+            beam_size: Beam size for batched decoding
+        """
+        from faster_whisper import BatchedInferencePipeline
+
+        self.pipeline = BatchedInferencePipeline(model=model)
+        self.language = language
+        self.beam_size = beam_size
+        self.sample_rate = 16000
+
+    def transcribe_batch(self, audios: List[np.ndarray], word_timestamps: bool = False) -> List[Tuple[str, List[Word]]]:
+        """Transcribe several segments at once; returns (text, words) per segment."""
+        starts = []
+        clips = []
+        offset = 0
+        for audio in audios:
+            start = offset / self.sample_rate
+            starts.append(start)
+            clips.append({"start": start, "end": (offset + len(audio)) / self.sample_rate})
+            offset += len(audio)
+
+        self.pipeline.last_speech_timestamp = 0.0
+        segments, _ = self.pipeline.transcribe(
+            np.concatenate(audios),
+            language=self.language,
+            clip_timestamps=clips,
+            batch_size=len(audios),
+            beam_size=self.beam_size,
+            word_timestamps=word_timestamps,
+            without_timestamps=not word_timestamps,
+        )
+
+        texts: List[List[str]] = [[] for _ in audios]
+        words: List[List[Word]] = [[] for _ in audios]
+        for segment in segments:
+            # Segment times are offsets into the concatenated audio
+            idx = max(bisect.bisect_right(starts, segment.start + 1e-3) - 1, 0)
+            if segment.text.strip():
+                texts[idx].append(segment.text.strip())
+            for w in segment.words or []:
+                words[idx].append((w.start - starts[idx], w.end - starts[idx], w.word))
+
+        return [(" ".join(t), w) for t, w in zip(texts, words)]
+
+
+class ConformerBatchBackend:
+    """
+    Padded batches for Indic-Conformer. Models whose remote code only decodes
+    the first row of a batch fall back to one call per segment on the same
+    worker thread, which still keeps sessions from competing for CPU threads.
+    """
+
+    name = "conformer"
+
+    def __init__(self, model, language: str = "hi", decoder_type: str = "ctc"):
+        """
+        Args:
+            model: Loaded Indic-Conformer AutoModel or OnnxConformerModel
+            language: Language code
+            decoder_type: "ctc" or "rnnt"
+        """
+        self.model = model
+        self.language = language
+        self.decoder_type = decoder_type
+        self._batch_supported: Optional[bool] = None
+        # OnnxConformerModel takes the real row lengths; otherwise the padding is decoded as audio
+        try:
+            self._accepts_lengths = "lengths" in inspect.signature(model).parameters
+        except (TypeError, ValueError):
+            self._accepts_lengths = False
+
+    def transcribe_batch(self, audios: List[np.ndarray]) -> List[str]:
+        import torch
+
+        with torch.no_grad():
+            if len(audios) > 1 and self._batch_supported is not False:
+                padded = np.zeros((len(audios), max(len(a) for a in audios)), dtype=np.float32)
+                for i, audio in enumerate(audios):
+                    padded[i, :len(audio)] = audio
+
+                kwargs = {}
+                if self._accepts_lengths:
+                    kwargs["lengths"] = torch.tensor([len(a) for a in audios], dtype=torch.int64)
+                result = self.model(torch.from_numpy(padded), self.language, self.decoder_type, **kwargs)
+                if isinstance(result, (list, tuple)) and len(result) == len(audios):
+                    self._batch_supported = True
+                    return [text.strip() for text in result]
+
+                logger.info("Conformer model does not decode padded batches, running segments one by one")
+                self._batch_supported = False
+
+            return [
+                self.model(torch.from_numpy(audio).unsqueeze(0), self.language, self.decoder_type).strip()
+                for audio in audios
+            ]
+
+
+class STTBatcher(MicroBatcher):
+    """
+    Gathers ready speech segments from all sessions into micro-batches.
+
+    The first request opens a batch; it is dispatched once `max_batch_size`
+    requests are waiting or `max_wait_ms` has elapsed. Batches run one at a
+    time on a dedicated thread so the model owns the CPU threads it uses.
+    """
+
+    def __init__(self, backend, max_batch_size: int = 8, max_wait_ms: float = 20.0):
+        """
+        Initialize batcher.
+
+        Args:
+            backend: WhisperBatchBackend or ConformerBatchBackend
+            max_batch_size: Maximum segments per batch
+            max_wait_ms: Latency window for collecting a batch
+        """
+        super().__init__(
+            max_batch_size,
+            max_wait_ms,
+            metric_prefix="stt",
+            thread_name=f"stt-{backend.name}",
+            labels={"backend": backend.name},
+        )
+        self.backend = backend
+
+    def run_batch(self, audios: List[np.ndarray], **options) -> List[Any]:
+        return self.backend.transcribe_batch(audios, **options)
@@ -1,37 +1,206 @@
 """Deepgram STT provider."""
 import asyncio
 import json
+import logging
 import websockets
-from typing import AsyncIterator
+from collections import deque
+from time import monotonic, perf_counter
+from typing import AsyncIterator, Deque, Optional, Tuple
 
+from src.metrics import metrics
 from src.stt.stt_provider import STTProvider
 
+logger = logging.getLogger("app")
+
+
+class _DeepgramConnection:
+    """
+    One session's Deepgram WebSocket.
+
+    Connects as soon as it is created, sends KeepAlive while no audio flows,
+    and reconnects transparently if the socket drops. Audio sent while the
+    socket is down is buffered (bounded) and replayed in order.
+    """
+
+    def __init__(self, stt: "DeepgramSTT"):
+        self.stt = stt
+        self.ws = None
+        self.transcripts: asyncio.Queue = asyncio.Queue()
+        self.created = monotonic()
+        self.last_audio = monotonic()
+        self.closed = False
+        self.finishing = False
+        self._buffer: Deque[bytes] = deque()
+        self._buffered_bytes = 0
+        self._connected = asyncio.Event()
+        self._keepalive_task: Optional[asyncio.Task] = None
+        self._task = asyncio.create_task(self._run())
+
+    async def _connect(self):
+        t0 = perf_counter()
+        ws = await websockets.connect(
+            self.stt.ws_url,
+            additional_headers={"Authorization": f"Token {self.stt.api_key}"},
+            open_timeout=self.stt.connect_timeout,
+        )
+        metrics.observe("deepgram_connect_ms", (perf_counter() - t0) * 1000)
+        return ws
+
+    async def _run(self):
+        """Connection manager: connect, receive, reconnect until closed."""
+        attempts = 0
+        while not self.closed:
+            try:
+                self.ws = await self._connect()
+                attempts = 0
+
+                # Replay audio that arrived while we were (re)connecting
+                if self._buffer:
+                    metrics.observe("deepgram_replayed_bytes", self._buffered_bytes)
+                while self._buffer:
+                    chunk = self._buffer.popleft()
+                    self._buffered_bytes -= len(chunk)
+                    await self.ws.send(chunk)
+                self._connected.set()
+
+                self._keepalive_task = asyncio.create_task(self._keepalive())
+                async for msg in self.ws:
+                    self._handle_message(msg)
+
+                if self.finishing or self.closed:
+                    break
+                logger.warning("⚠️ Deepgram closed the connection, reconnecting")
+
+            except asyncio.CancelledError:
+                raise
+            except (websockets.exceptions.WebSocketException, OSError, asyncio.TimeoutError) as e:
+                if self.closed or self.finishing:
+                    break
+                logger.warning(f"⚠️ Deepgram connection error: {e!r}")
+            finally:
+                self._connected.clear()
+                await self._stop_keepalive()
+
+            attempts += 1
+            if attempts > self.stt.max_reconnect_attempts:
+                logger.error("❌ Deepgram reconnect attempts exhausted")
+                metrics.incr("deepgram_connect_failures")
+                break
+            metrics.incr("deepgram_reconnects")
+            await asyncio.sleep(min(0.1 * 2 ** (attempts - 1), 2.0))
+
+        await self.transcripts.put(None)
+
+    def _handle_message(self, msg):
+        data = json.loads(msg)
+
+        if data.get("type") != "Results":
+            return
+
+        alt = data["channel"]["alternatives"][0]
+        text = alt.get("transcript", "").strip()
+
+        # Only yield final results
+        if data.get("is_final") and text:
+            self.transcripts.put_nowait(text)
+
+    async def _keepalive(self):
+        """Deepgram drops sockets after ~10 s without audio; keep idle ones open."""
+        interval = self.stt.keepalive_interval
+        while True:
+            await asyncio.sleep(interval / 2)
+            if monotonic() - self.last_audio >= interval:
+                try:
+                    await self.ws.send(json.dumps({"type": "KeepAlive"}))
+                except websockets.exceptions.ConnectionClosed:
+                    # _run notices the closed socket and reconnects
+                    return
+                metrics.incr("deepgram_keepalives")
+                self.last_audio = monotonic()
+
+    async def _stop_keepalive(self):
+        task, self._keepalive_task = self._keepalive_task, None
+        if task:
+            task.cancel()
+            await asyncio.gather(task, return_exceptions=True)
+
+    async def send(self, chunk: bytes):
+        """Send audio, or buffer it while the socket is (re)connecting."""
+        self.last_audio = monotonic()
+        if self._connected.is_set() and not self._buffer:
+            try:
+                await self.ws.send(chunk)
+                return
+            except websockets.exceptions.ConnectionClosed:
+                pass
+
+        self._buffer.append(chunk)
+        self._buffered_bytes += len(chunk)
+        # Bounded: drop the oldest audio rather than grow without limit
+        while self._buffered_bytes > self.stt.max_buffer_bytes:
+            dropped = self._buffer.popleft()
+            self._buffered_bytes -= len(dropped)
+            metrics.incr("deepgram_dropped_bytes", len(dropped))
+
+    async def finish(self):
+        """Ask Deepgram to flush final results and close once they are sent."""
+        self.finishing = True
+        try:
+            await asyncio.wait_for(self._connected.wait(), self.stt.connect_timeout)
+            await self.ws.send(json.dumps({"type": "CloseStream"}))
+        except (websockets.exceptions.WebSocketException, asyncio.TimeoutError):
+            await self.close()
+
+    async def close(self):
+        self.closed = True
+        await self._stop_keepalive()
+        if self.ws:
+            await self.ws.close()
+        if not self._task.done():
+            self._task.cancel()
+            await self.transcripts.put(None)
+
 
 class DeepgramSTT(STTProvider):
     """Cloud-based STT using Deepgram."""
-    
+
     def __init__(
         self,
         api_key: str,
         model: str = "nova-2",
         language: str = "hi",
-        sample_rate: int = 16000
+        sample_rate: int = 16000,
+        keepalive_interval: float = 5.0,
+        connect_timeout: float = 10.0,
+        max_reconnect_attempts: int = 5,
+        max_buffer_seconds: float = 10.0,
+        prepared_ttl: float = 30.0,
     ):
         """
         Initialize Deepgram STT.
-        
+
         Args:
             api_key: Deepgram API key
             model: Model name (nova-2, nova, base, enhanced)
             language: Language code (en, es, fr, etc.)
             sample_rate: Audio sample rate in Hz
+            keepalive_interval: Seconds without audio before a KeepAlive is sent
+            connect_timeout: WebSocket handshake timeout in seconds
+            max_reconnect_attempts: Consecutive failed reconnects before giving up
+            max_buffer_seconds: Audio kept while reconnecting
+            prepared_ttl: Close pre-opened connections not claimed within this time
         """
         self.api_key = api_key
         self.model = model
         self.language = language
         self.sample_rate = sample_rate
-        self.ws = None
-        
+        self.keepalive_interval = keepalive_interval
+        self.connect_timeout = connect_timeout
+        self.max_reconnect_attempts = max_reconnect_attempts
+        self.max_buffer_bytes = int(max_buffer_seconds * sample_rate * 2)
+        self.prepared_ttl = prepared_ttl
+        self._prepared: Deque[_DeepgramConnection] = deque()
+
         self.ws_url = (
             f"wss://api.deepgram.com/v1/listen"
             f"?model={model}"
@@ -42,41 +211,48 @@ class DeepgramSTT(STTProvider):
             f"&interim_results=true"
             f"&endpointing=300"
         )
-    
+
+    def prepare(self):
+        """Start opening a connection for the next stream (call before accepting the client)."""
+        self._prepared.append(_DeepgramConnection(self))
+
+    def _claim(self) -> Tuple[_DeepgramConnection, bool]:
+        """Take a live pre-opened connection, or open a new one."""
+        while self._prepared:
+            conn = self._prepared.popleft()
+            if monotonic() - conn.created < self.prepared_ttl and not conn._task.done():
+                return conn, True
+            asyncio.create_task(conn.close())
+        return _DeepgramConnection(self), False
+
     async def transcribe_stream(self, audio_stream: AsyncIterator[bytes]) -> AsyncIterator[str]:
         """Transcribe streaming audio via Deepgram WebSocket."""
-        async with websockets.connect(
-            self.ws_url,
-            additional_headers={"Authorization": f"Token {self.api_key}"},
-        ) as ws:
-            self.ws = ws
-            
-            # Task to send audio
-            async def send_audio():
-                async for chunk in audio_stream:
-                    await ws.send(chunk)
-            
-            send_task = asyncio.create_task(send_audio())
-            
-            try:
-                # Receive transcriptions
-                async for msg in ws:
-                    data = json.loads(msg)
-                    
-                    if data.get("type") != "Results":
-                        continue
-                    
-                    alt = data["channel"]["alternatives"][0]
-                    text = alt.get("transcript", "").strip()
-                    
-                    # Only yield final results
-                    if data.get("is_final") and text:
-                        yield text
-            finally:
-                send_task.cancel()
-                self.ws = None
-    
+        conn, prepared = self._claim()
+        metrics.incr("deepgram_sessions", prepared=prepared)
+
+        # Task to send audio
+        async def send_audio():
+            async for chunk in audio_stream:
+                await conn.send(chunk)
+            await conn.finish()
+
+        send_task = asyncio.create_task(send_audio())
+
+        try:
+            # Receive transcriptions (None once the connection is finished for good)
+            while True:
+                text = await conn.transcripts.get()
+                if text is None:
+                    break
+                yield text
+        finally:
+            send_task.cancel()
+            await conn.close()
+
     async def close(self):
-        """Close WebSocket connection."""
-        if self.ws:
-            await self.ws.close()
+        """Close pre-opened connections that were never claimed."""
+        # Active connections are closed by their own transcribe_stream
+        stale = [c for c in self._prepared if monotonic() - c.created >= self.prepared_ttl]
+        for conn in stale:
+            self._prepared.remove(conn)
+            await conn.close()
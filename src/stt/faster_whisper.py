@@ -1,83 +1,251 @@
 """Local STT provider using Faster Whisper."""
 import asyncio
-from time import monotonic
+import logging
+import re
 import numpy as np
-from typing import AsyncIterator
+from contextlib import nullcontext
+from typing import AsyncIterator, List, Optional, Tuple
 from faster_whisper import WhisperModel
 
+from src.inference_pool import InferencePool
+from src.model_manager import ModelManager
+from src.stt.batching import STTBatcher
 from src.stt.stt_provider import STTProvider
+from src.stt.vad import SileroVAD, SpeechSegmenter
+
+logger = logging.getLogger("app")
+
+Word = Tuple[float, float, str]  # (start, end, text) relative to the window
+
+
+def _normalize_word(word: str) -> str:
+    return re.sub(r"[^\w]", "", word.lower())
+
+
+class _UtteranceWindow:
+    """
+    Sliding audio window for one utterance with LocalAgreement-2 commits.
+
+    Words that two consecutive partial hypotheses agree on are committed and
+    the audio up to the last committed word is dropped from the window, so
+    each partial decode only re-reads the unsettled tail.
+    """
+
+    def __init__(self, sample_rate: int):
+        self.sample_rate = sample_rate
+        self.chunks: List[np.ndarray] = []
+        self.samples = 0
+        self.samples_since_decode = 0
+        self.committed: List[str] = []
+        self.previous: List[Word] = []
+
+    def append(self, audio: np.ndarray):
+        self.chunks.append(audio)
+        self.samples += len(audio)
+        self.samples_since_decode += len(audio)
+
+    @property
+    def seconds(self) -> float:
+        return self.samples / self.sample_rate
+
+    def audio(self) -> np.ndarray:
+        if len(self.chunks) > 1:
+            self.chunks = [np.concatenate(self.chunks)]
+        return self.chunks[0] if self.chunks else np.zeros(0, dtype=np.float32)
+
+    def prompt(self, max_words: int = 30) -> Optional[str]:
+        return " ".join(self.committed[-max_words:]) or None
+
+    def agree(self, hypothesis: List[Word], force: bool = False):
+        """Commit the prefix shared with the previous hypothesis and trim the window."""
+        agreed = 0
+        for old, new in zip(self.previous, hypothesis):
+            if _normalize_word(old[2]) != _normalize_word(new[2]):
+                break
+            agreed += 1
+
+        # Window too long without agreement: settle all but the last word
+        if force and agreed == 0 and len(hypothesis) > 1:
+            agreed = len(hypothesis) - 1
+
+        if agreed == 0:
+            self.previous = hypothesis
+            return
+
+        cut_time = hypothesis[agreed - 1][1]
+        self.committed.extend(w[2].strip() for w in hypothesis[:agreed])
+
+        cut = min(int(cut_time * self.sample_rate), self.samples)
+        self.chunks = [self.audio()[cut:]]
+        self.samples -= cut
+        self.previous = [(s - cut_time, e - cut_time, w) for s, e, w in hypothesis[agreed:]]
 
 
 class FasterWhisperSTT(STTProvider):
     """Local multilingual STT using Faster Whisper (CPU-based)."""
-    
+
     def __init__(
         self,
-        model: WhisperModel,
+        model: Optional[WhisperModel],
         language: str = "en",
-        vad_filter: bool = True,
-        min_audio_seconds: float = 1.0,
+        vad_filter: bool = False,
+        vad: Optional[SileroVAD] = None,
+        vad_threshold: float = 0.5,
+        min_speech_ms: int = 250,
+        min_silence_ms: int = 500,
+        speech_pad_ms: int = 200,
+        partial_interval: float = 1.0,
+        max_window_seconds: float = 15.0,
+        batcher: Optional[STTBatcher] = None,
+        model_manager: Optional[ModelManager] = None,
+        model_key: Optional[str] = None,
+        inference_pool: Optional[InferencePool] = None,
     ):
         """
         Initialize Faster Whisper model.
-        
+
         Args:
-            model_size: Model size (tiny, base, small, medium, large-v3)
+            model: Loaded WhisperModel (shared across sessions)
             language: Language code (None for auto-detection)
-            device: "cpu" or "cuda"
-            compute_type: "int8", "int16", "float16", "float32"
-            vad_filter: Enable voice activity detection
+            vad_filter: Also run faster-whisper's internal VAD on each decode
+            vad: Shared SileroVAD used for endpointing (created if None)
+            vad_threshold: Speech probability that starts an utterance
+            min_speech_ms: Speech required before an utterance is opened
+            min_silence_ms: Silence that ends an utterance
+            speech_pad_ms: Audio kept from before speech onset
+            partial_interval: Seconds of new speech between partial decodes
+            max_window_seconds: Force-commit words once the window grows past this
+            batcher: Shared STTBatcher (WhisperBatchBackend) to batch decodes across sessions
+            model_manager: Shared ModelManager; `model` may be None when set
+            model_key: Key the model is registered under in `model_manager`
+            inference_pool: Decode in worker processes (WhisperService); `model` may be None when set
         """
+        if model is None and model_manager is None and inference_pool is None:
+            raise ValueError("FasterWhisperSTT needs a model, a model_manager or an inference_pool")
         self.model = model
+        self.model_manager = model_manager
+        self.model_key = model_key
+        self.inference_pool = inference_pool
         self.language = language
         self.vad_filter = vad_filter
         self.sample_rate = 16000
-        self.buffer = bytearray()
-        self.min_chunk_size = self.sample_rate * 2 * min_audio_seconds # 1 second of 16-bit audio
-        self.text_buffer: list[str] = []
+        self.vad = vad or SileroVAD(sample_rate=self.sample_rate)
+        self.vad_threshold = vad_threshold
+        self.min_speech_ms = min_speech_ms
+        self.min_silence_ms = min_silence_ms
+        self.speech_pad_ms = speech_pad_ms
+        self.partial_samples = int(partial_interval * self.sample_rate)
+        self.max_window_seconds = max_window_seconds
+        self.batcher = batcher
+        self.stats = {"utterances": 0, "partial_decodes": 0, "final_decodes": 0}
 
     async def transcribe_stream(self, audio_stream: AsyncIterator[bytes]) -> AsyncIterator[str]:
-        """Transcribe streaming audio chunks."""
+        """Transcribe streaming audio, emitting one final transcript per speech segment."""
+        segmenter = SpeechSegmenter(
+            self.vad,
+            threshold=self.vad_threshold,
+            min_speech_ms=self.min_speech_ms,
+            min_silence_ms=self.min_silence_ms,
+            speech_pad_ms=self.speech_pad_ms,
+        )
+        window: Optional[_UtteranceWindow] = None
+
         async for chunk in audio_stream:
-            self.buffer.extend(chunk)
-            
-            # Process when we have enough data
-            if len(self.buffer) < self.min_chunk_size:
-                continue
-
-            audio_data = bytes(self.buffer)
-            self.buffer.clear()
-            
             # Convert bytes to numpy array (16-bit PCM)
-            audio_np = np.frombuffer(audio_data, dtype=np.int16).astype(np.float32) / 32768.0
-            
-            # Run transcription in thread pool to avoid blocking
-            segments, _ = await asyncio.to_thread(
-                self._transcribe,
-                audio_np
-            )
-            
+            audio_np = np.frombuffer(chunk, dtype=np.int16).astype(np.float32) / 32768.0
+            events = await asyncio.to_thread(segmenter.push, audio_np)
+
+            for kind, audio in events:
+                if kind == "start":
+                    window = _UtteranceWindow(self.sample_rate)
+                    window.append(audio)
+                elif kind == "speech" and window is not None:
+                    window.append(audio)
+                elif kind == "end" and window is not None:
+                    utterance = await self._finalize(window)
+                    window = None
+                    if utterance:
+                        yield utterance
+
+            # Partial decode while the caller is still speaking
+            if window is not None and window.samples_since_decode >= self.partial_samples:
+                await self._partial(window)
+
+        # Flush remaining audio
+        for kind, _ in segmenter.flush():
+            if kind == "end" and window is not None:
+                utterance = await self._finalize(window)
+                if utterance:
+                    yield utterance
+
+    async def _partial(self, window: _UtteranceWindow):
+        """Decode the window and commit words the last two hypotheses agree on."""
+        window.samples_since_decode = 0
+        _, hypothesis = await self._infer(window, word_timestamps=True)
+        self.stats["partial_decodes"] += 1
+        window.agree(hypothesis, force=window.seconds > self.max_window_seconds)
+        logger.debug(f"📝 Partial: committed='{' '.join(window.committed)}' tail={len(window.previous)} words")
+
+    async def _finalize(self, window: _UtteranceWindow) -> str:
+        """Decode the unsettled tail and join it with the committed words."""
+        self.stats["utterances"] += 1
+        tail = ""
+        # Skip decoding fragments shorter than ~100 ms
+        if window.samples > self.sample_rate // 10:
+            tail, _ = await self._infer(window, word_timestamps=False)
+            self.stats["final_decodes"] += 1
 
-            utterance = " ".join(
-                segment.text.strip()
-                for segment in segments
-                if segment.text.strip()
+        return " ".join(window.committed + ([tail] if tail else [])).strip()
+
+    async def _infer(self, window: _UtteranceWindow, word_timestamps: bool) -> Tuple[str, List[Word]]:
+        """Decode the window, through the shared batcher when one is configured."""
+        if self.batcher:
+            # Batched decodes share one prompt, so per-session prompts are dropped
+            return await self.batcher.submit(window.audio(), word_timestamps=word_timestamps)
+
+        if self.inference_pool:
+            return await self.inference_pool.call(
+                "transcribe",
+                window.audio(),
+                initial_prompt=window.prompt(),
+                word_timestamps=word_timestamps,
             )
 
-            if utterance:
-                yield utterance                  
-    
-    def _transcribe(self, audio_np):
-        """Synchronous transcription (run in thread pool)."""
-        segments, info = self.model.transcribe(
-            audio_np,
-            language=self.language,
-            vad_filter=self.vad_filter,
-            without_timestamps=True,    
+        return await asyncio.to_thread(
+            self._transcribe,
+            window.audio(),
+            window.prompt(),
+            word_timestamps,
         )
-        # Convert generator to list to ensure all segments are processed
-        return list(segments), info
-    
+
+    def _use_model(self):
+        if self.model_manager:
+            return self.model_manager.use(self.model_key)
+        return nullcontext(self.model)
+
+    def _transcribe(self, audio_np, initial_prompt=None, word_timestamps=False) -> Tuple[str, List[Word]]:
+        """Synchronous transcription (run in thread pool)."""
+        with self._use_model() as model:
+            segments, _ = model.transcribe(
+                audio_np,
+                language=self.language,
+                vad_filter=self.vad_filter,
+                initial_prompt=initial_prompt,
+                condition_on_previous_text=False,
+                word_timestamps=word_timestamps,
+                without_timestamps=not word_timestamps,
+            )
+            # Consume the generator so all segments are processed in this thread
+            segments = list(segments)
+
+        texts = []
+        words: List[Word] = []
+        for segment in segments:
+            if segment.text.strip():
+                texts.append(segment.text.strip())
+            words.extend((w.start, w.end, w.word) for w in segment.words or [])
+        return " ".join(texts), words
+
     async def close(self):
         """Clean up resources."""
         # Faster Whisper doesn't need explicit cleanup
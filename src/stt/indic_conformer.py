@@ -1,116 +1,222 @@
 import logging
-from typing import AsyncIterator
+from typing import AsyncIterator, List, Optional, Tuple
 import torch
 import torchaudio
 import numpy as np
+import soxr
 import asyncio
-from collections import deque
-from transformers import AutoModel
-
+from contextlib import nullcontext
 from transformers import AutoModel
 
+from src.inference_pool import InferencePool
+from src.model_manager import ModelManager
+from src.stt.batching import STTBatcher
+from src.stt.ring_buffer import AudioRingBuffer
 from src.stt.stt_provider import STTProvider
+from src.stt.vad import Endpointer, SileroVAD
 logger = logging.getLogger("app")
 
+
+class _StreamState:
+    """Per-session input resampler, audio ring and endpointing state."""
+
+    def __init__(self, resampler: Optional[soxr.ResampleStream], ring: AudioRingBuffer, vad_state, endpointer: Endpointer):
+        self.resampler = resampler
+        self.ring = ring
+        self.vad_state = vad_state
+        self.endpointer = endpointer
+        self.vad_pos = 0                          # next frame the VAD will look at
+        self.segment_start: Optional[int] = None  # open segment, absolute sample index
+
+
 class IndicConformerSTT(STTProvider):
     """
     Streaming STT using HuggingFace Indic-Conformer.
-    Endpointing via RMS-based silence detection.
+    Endpointing via silero VAD over a preallocated per-session ring buffer.
+
+    Incoming audio is resampled to the VAD's rate (16 kHz) before it enters
+    the ring, so any input rate works; segments are resampled once more only
+    if the model expects a different rate, before they are batched or decoded.
     """
 
-    def __init__(   
+    def __init__(
         self,
         model: AutoModel,
         language: str = "hi",
         decoder_type: str = "ctc",   # "ctc" or "rnnt"
         input_sample_rate: int = 16000,
         target_sample_rate: int = 16000,
-        silence_threshold: float = 0.02,
-        silence_duration: float = 0.25   ,
+        vad: Optional[SileroVAD] = None,
+        vad_threshold: float = 0.5,
+        silence_duration: float = 0.25,
         min_speech_duration: float = 0.3,
-        chunk_duration: float = 0.256,
+        speech_pad_duration: float = 0.2,
+        hangover_duration: float = 0.1,
+        max_utterance_duration: float = 20.0,
+        batcher: Optional[STTBatcher] = None,
+        model_manager: Optional[ModelManager] = None,
+        model_key: Optional[str] = None,
+        inference_pool: Optional[InferencePool] = None,
     ):
-        if model is None:
+        """
+        Initialize Indic-Conformer STT.
+
+        Args:
+            model: Loaded Indic-Conformer AutoModel (shared across sessions)
+            language: Language code
+            decoder_type: "ctc" or "rnnt"
+            input_sample_rate: Sample rate of incoming PCM16
+            target_sample_rate: Sample rate expected by the model
+            vad: Shared SileroVAD (created at 16 kHz if None)
+            vad_threshold: Speech probability that starts a segment
+            silence_duration: Silence that ends a segment
+            min_speech_duration: Speech required before a segment is opened
+            speech_pad_duration: Pre-roll kept from before speech onset
+            hangover_duration: Trailing audio kept after the last speech frame
+            max_utterance_duration: Longer segments are decoded in pieces
+            batcher: Shared STTBatcher (ConformerBatchBackend) to batch decodes across sessions
+            model_manager: Shared ModelManager; `model` may be None when set
+            model_key: Key the model is registered under in `model_manager`
+            inference_pool: Decode in worker processes (ConformerService); `model` may be None when set
+        """
+        if model is None and model_manager is None and inference_pool is None:
             raise ValueError("IndicConformerSTT received None model")
         self.language = language
         self.decoder_type = decoder_type
         self.input_sample_rate = input_sample_rate
         self.target_sample_rate = target_sample_rate
 
-        self.silence_threshold = silence_threshold
-        self.chunk_duration = chunk_duration
-
-        self.silence_chunks_threshold = int(silence_duration / chunk_duration)
-        self.min_speech_chunks = int(min_speech_duration / chunk_duration)
-
-        self.audio_chunks = deque()
-        self.silence_chunks = 0
+        self.vad = vad or SileroVAD()
+        self.vad_threshold = vad_threshold
+        frame = self.vad.frame_duration
+        self.min_silence_frames = max(1, int(silence_duration / frame))
+        self.min_speech_frames = max(1, int(min_speech_duration / frame))
+
+        # The ring holds audio at the VAD's rate
+        rate = self.vad.sample_rate
+        self.preroll_samples = int(speech_pad_duration * rate)
+        self.hangover_samples = min(
+            int(hangover_duration * rate),
+            self.min_silence_frames * self.vad.frame_samples,
+        )
+        self.max_utterance_samples = int(max_utterance_duration * rate)
+        # Room for the longest utterance, its pre-roll and one second of slack
+        self.ring_capacity = self.max_utterance_samples + self.preroll_samples + rate
 
         self.model = model
+        self.model_manager = model_manager
+        self.model_key = model_key
+        self.inference_pool = inference_pool
+        self.batcher = batcher
 
+        # Segments from the ring to the model's rate (16 kHz models need none)
         self.resampler = None
-        if input_sample_rate != target_sample_rate:
+        if rate != target_sample_rate:
             self.resampler = torchaudio.transforms.Resample(
-                orig_freq=input_sample_rate,
+                orig_freq=rate,
                 new_freq=target_sample_rate
             )
 
-    def _rms(self, x: np.ndarray) -> float:
-        return np.sqrt(np.mean(x ** 2))
+    def _new_stream(self) -> _StreamState:
+        resampler = None
+        if self.input_sample_rate != self.vad.sample_rate:
+            resampler = soxr.ResampleStream(self.input_sample_rate, self.vad.sample_rate, 1, dtype="int16")
+        return _StreamState(
+            resampler,
+            AudioRingBuffer(self.ring_capacity, self.vad.frame_samples),
+            self.vad.new_state(),
+            Endpointer(self.vad_threshold, self.min_speech_frames, self.min_silence_frames),
+        )
+
+    def _endpoint(self, state: _StreamState) -> List[Tuple[int, int]]:
+        """Run the VAD over newly written frames; returns closed (start, end) segments."""
+        ring = state.ring
+        n = self.vad.frame_samples
+        segments = []
+
+        while ring.write_pos - state.vad_pos >= n:
+            prob = self.vad.speech_prob(ring.frame(state.vad_pos), state.vad_state)
+            state.vad_pos += n
+            kind = state.endpointer.update(prob)
+
+            if kind == "start":
+                onset = state.vad_pos - state.endpointer.onset_frames * n
+                state.segment_start = max(onset - self.preroll_samples, ring.oldest)
+
+            elif kind == "end" and state.segment_start is not None:
+                # Keep only `hangover` of the trailing silence
+                end = state.vad_pos - self.min_silence_frames * n + self.hangover_samples
+                segments.append((state.segment_start, end))
+                state.segment_start = None
+
+            elif (
+                state.segment_start is not None
+                and state.vad_pos - state.segment_start >= self.max_utterance_samples
+            ):
+                # About to outgrow the ring: decode what we have and keep listening
+                segments.append((state.segment_start, state.vad_pos))
+                state.segment_start = state.vad_pos
+
+        return segments
+
+    async def _decode_segment(self, state: _StreamState, start: int, end: int) -> str:
+        audio = state.ring.read(start, end)
+        logger.info(f"🧠 Decoding {len(audio)} samples")
 
-    def _decode_buffer(self) -> str:
-        if len(self.audio_chunks) < self.min_speech_chunks:
-            self.audio_chunks.clear()
-            return ""
+        if self.resampler is not None and (self.batcher or self.inference_pool):
+            audio = self._resample(audio)
 
-        audio = np.concatenate(self.audio_chunks)
-        logger.info(f"🧠 Decoding {len(audio)} samples")
+        if self.batcher:
+            # Shared cross-session batch; the backend pads and decodes
+            text = await self.batcher.submit(audio)
+            return text.strip()
 
-        self.audio_chunks.clear()
+        if self.inference_pool:
+            return await self.inference_pool.call("transcribe", audio)
 
-        wav = torch.from_numpy(audio).float()
+        return await asyncio.to_thread(self._decode, audio)
 
-        if self.resampler is not None:
-            wav = self.resampler(wav.unsqueeze(0)).squeeze(0)
+    def _resample(self, audio: np.ndarray) -> np.ndarray:
+        """Ring audio at the model's sample rate."""
+        return self.resampler(torch.from_numpy(audio).unsqueeze(0)).squeeze(0).numpy()
+
+    def _use_model(self):
+        if self.model_manager:
+            return self.model_manager.use(self.model_key)
+        return nullcontext(self.model)
 
-        if wav.ndim > 1:
-            wav = torch.mean(wav, dim=0)
+    def _decode(self, audio: np.ndarray) -> str:
+        if self.resampler is not None:
+            audio = self._resample(audio)
 
-        wav = wav.unsqueeze(0)  # [1, T]
+        wav = torch.from_numpy(audio).unsqueeze(0)  # [1, T]
 
-        with torch.no_grad():
-            text = self.model(wav, self.language, self.decoder_type)
+        with self._use_model() as model, torch.no_grad():
+            text = model(wav, self.language, self.decoder_type)
 
         return text.strip()
 
     async def transcribe_stream(self, audio_stream: AsyncIterator[bytes]) -> AsyncIterator[str]:
-        
+        state = self._new_stream()
+
         async for audio_bytes in audio_stream:
-            chunk = (
-                np.frombuffer(audio_bytes, dtype=np.int16)
-                .astype(np.float32) / 32768.0
-            )
-            # rms = self._rms(chunk)
-            # logger.info(f"🎚 RMS={rms:.4f}")
-                
-            if self._rms(chunk) < self.silence_threshold:
-                self.silence_chunks += 1
-
-                if self.silence_chunks >= self.silence_chunks_threshold:
-                    text = await asyncio.to_thread(self._decode_buffer)
-                    self.silence_chunks = 0
-
-                    if text:
-                        yield text
-            else:
-                self.silence_chunks = 0
-                self.audio_chunks.append(chunk)
+            if state.resampler is not None:
+                audio_bytes = state.resampler.resample_chunk(np.frombuffer(audio_bytes, dtype=np.int16)).tobytes()
+            state.ring.write_pcm16(audio_bytes)
+
+            for start, end in await asyncio.to_thread(self._endpoint, state):
+                text = await self._decode_segment(state, start, end)
+                if text:
+                    yield text
 
         # Flush remaining audio
-        if self.audio_chunks:
-            text = await asyncio.to_thread(self._decode_buffer)
+        if state.resampler is not None:
+            state.ring.write_pcm16(state.resampler.resample_chunk(np.zeros(0, dtype=np.int16), last=True).tobytes())
+        if state.segment_start is not None:
+            text = await self._decode_segment(state, state.segment_start, state.ring.write_pos)
             if text:
                 yield text
 
     async def close(self):
-        self.audio_chunks.clear()
+        # Stream state lives in transcribe_stream; nothing shared to release
+        pass
@@ -0,0 +1,320 @@
+"""
+ONNX Runtime int8 backend for the Indic-Conformer model.
+
+`export_int8()` writes the encoder and CTC decoder to ONNX, applies dynamic
+int8 quantization, and stores the feature preprocessor as TorchScript along
+with the vocabulary. `OnnxConformerModel` loads that directory and is called
+exactly like the HF model, `model(wav, language, "ctc")`, so it drops into
+IndicConformerSTT and ConformerBatchBackend unchanged.
+
+Export once:
+    python -m src.stt.indic_conformer_onnx --out models/indic-conformer-int8
+"""
+import argparse
+import json
+import logging
+import os
+import tempfile
+from typing import Dict, List, Optional, Union
+
+import numpy as np
+import onnxruntime
+
+from src.forking import reopen_after_fork
+
+logger = logging.getLogger("app")
+
+CONFIG_FILE = "config.json"
+
+
+def _external_data(path: str) -> str:
+    """File holding the weights of the graph at `path` (graphs over 2 GB cannot be a single protobuf)."""
+    return os.path.basename(path) + ".data"
+
+
+def _mapped_initializers(path: str) -> Dict[str, onnxruntime.OrtValue]:
+    """
+    Memory-map the external weights of the graph at `path`.
+
+    Sessions given these as initializers read the weights from the page
+    cache instead of copying them, so every session and every forked worker
+    shares one physical copy.
+    """
+    import onnx
+    from onnx.helper import tensor_dtype_to_np_dtype
+
+    graph = onnx.load(path, load_external_data=False).graph
+    weights = {}
+    for tensor in graph.initializer:
+        if tensor.data_location != onnx.TensorProto.EXTERNAL:
+            continue
+        info = {entry.key: entry.value for entry in tensor.external_data}
+        array = np.memmap(
+            os.path.join(os.path.dirname(path), info["location"]),
+            dtype=tensor_dtype_to_np_dtype(tensor.data_type),
+            mode="r",
+            offset=int(info.get("offset", 0)),
+            shape=tuple(tensor.dims),
+        )
+        weights[tensor.name] = onnxruntime.OrtValue.ortvalue_from_numpy(array)
+    return weights
+
+
+def _export_graph(component, path: str, args: tuple, input_names, output_names, dynamic_axes, opset: int):
+    """
+    Export a torch module (or re-save an ORT session's graph) to `path`,
+    with every weight in one external data file next to it.
+    """
+    import onnx
+
+    with tempfile.TemporaryDirectory(dir=os.path.dirname(path) or ".") as tmp:
+        if isinstance(component, onnxruntime.InferenceSession):
+            src = component._model_path
+        else:
+            import torch
+
+            # Large models are written with one external file per tensor
+            src = os.path.join(tmp, os.path.basename(path))
+            torch.onnx.export(
+                component,
+                args,
+                src,
+                input_names=input_names,
+                output_names=output_names,
+                dynamic_axes=dynamic_axes,
+                opset_version=opset,
+                do_constant_folding=True,
+            )
+
+        graph = onnx.load(src, load_external_data=True)
+        onnx.save_model(
+            graph,
+            path,
+            save_as_external_data=True,
+            all_tensors_to_one_file=True,
+            location=_external_data(path),
+        )
+
+
+def export_int8(
+    model,
+    out_dir: str,
+    preprocessor_attr: str = "preprocessor",
+    encoder_attr: str = "encoder",
+    decoder_attr: str = "ctc_decoder",
+    sample_rate: int = 16000,
+    opset: int = 17,
+    keep_fp32: bool = False,
+):
+    """
+    Export an Indic-Conformer model to an int8 ONNX Runtime directory.
+
+    Args:
+        model: Loaded Indic-Conformer AutoModel
+        out_dir: Output directory
+        preprocessor_attr: Attribute holding the mel-feature preprocessor
+        encoder_attr: Attribute holding the conformer encoder
+        decoder_attr: Attribute holding the CTC decoder head
+        sample_rate: Model sample rate
+        opset: ONNX opset for torch export
+        keep_fp32: Keep the float32 graphs next to the quantized ones
+    """
+    import torch
+    from onnxruntime.quantization import QuantType, quantize_dynamic
+
+    os.makedirs(out_dir, exist_ok=True)
+    preprocessor = getattr(model, preprocessor_attr)
+    encoder = getattr(model, encoder_attr)
+    decoder = getattr(model, decoder_attr)
+
+    wav = torch.zeros(1, sample_rate)
+    length = torch.tensor([wav.shape[-1]])
+
+    with torch.no_grad():
+        # The feature extractor is small; it stays in TorchScript
+        scripted = preprocessor if isinstance(preprocessor, torch.jit.ScriptModule) else torch.jit.trace(preprocessor, (wav, length))
+        scripted.save(os.path.join(out_dir, "preprocessor.ts"))
+        features, feature_lengths = preprocessor(wav, length)
+
+        fp32 = {
+            "encoder": os.path.join(out_dir, "encoder.fp32.onnx"),
+            "ctc_decoder": os.path.join(out_dir, "ctc_decoder.fp32.onnx"),
+        }
+        _export_graph(
+            encoder, fp32["encoder"], (features, feature_lengths),
+            ["audio_signal", "length"], ["outputs", "encoded_lengths"],
+            {"audio_signal": {0: "batch", 2: "frames"}, "length": {0: "batch"},
+             "outputs": {0: "batch", 2: "enc_frames"}, "encoded_lengths": {0: "batch"}},
+            opset,
+        )
+        if isinstance(encoder, onnxruntime.InferenceSession):
+            encoded = torch.from_numpy(encoder.run(
+                None, {"audio_signal": features.numpy(), "length": feature_lengths.numpy()}
+            )[0])
+        else:
+            encoded, _ = encoder(features, feature_lengths)
+        _export_graph(
+            decoder, fp32["ctc_decoder"], (encoded,),
+            ["encoder_output"], ["logprobs"],
+            {"encoder_output": {0: "batch", 2: "enc_frames"}, "logprobs": {0: "batch", 1: "enc_frames"}},
+            opset,
+        )
+
+    config = {"sample_rate": sample_rate}
+    for name, src in fp32.items():
+        dst = os.path.join(out_dir, f"{name}.int8.onnx")
+        logger.info(f"⚙️  Quantizing {name} to int8")
+        quantize_dynamic(
+            src, dst,
+            weight_type=QuantType.QInt8,
+            op_types_to_quantize=["MatMul", "Gemm"],
+            use_external_data_format=True,
+        )
+        config[name] = os.path.basename(dst)
+        if not keep_fp32:
+            os.remove(src)
+            os.remove(os.path.join(out_dir, _external_data(src)))
+
+    vocab = getattr(model, "vocab", None)
+    if vocab is not None:
+        with open(os.path.join(out_dir, "vocab.json"), "w", encoding="utf-8") as f:
+            json.dump(vocab, f, ensure_ascii=False)
+
+    masks = getattr(model, "language_masks", None)
+    if masks is not None:
+        masks = {lang: np.asarray(m, dtype=bool).tolist() for lang, m in masks.items()}
+        with open(os.path.join(out_dir, "language_masks.json"), "w", encoding="utf-8") as f:
+            json.dump(masks, f)
+
+    with open(os.path.join(out_dir, CONFIG_FILE), "w", encoding="utf-8") as f:
+        json.dump(config, f, indent=2)
+
+    logger.info(f"✅ Exported int8 Indic-Conformer to {out_dir}")
+
+
+class OnnxConformerModel:
+    """
+    Int8 Indic-Conformer running under ONNX Runtime (CTC decoding only).
+
+    Callable like the HF model: a [1, T] waveform returns a string; a padded
+    [B, T] batch returns a list of strings.
+    """
+
+    def __init__(self, model_dir: str, num_threads: Optional[int] = None):
+        """
+        Load an exported model directory.
+
+        Args:
+            model_dir: Directory written by export_int8()
+            num_threads: ONNX Runtime intra-op threads (None = ORT default)
+        """
+        import torch
+
+        with open(os.path.join(model_dir, CONFIG_FILE), encoding="utf-8") as f:
+            config = json.load(f)
+        self.sample_rate = config.get("sample_rate", 16000)
+
+        self.model_dir = model_dir
+        self.config = config
+        self.num_threads = num_threads
+        self._weights = {
+            name: _mapped_initializers(os.path.join(model_dir, config[name]))
+            for name in ("encoder", "ctc_decoder")
+        }
+        self._open_sessions()
+        # ORT thread pools do not survive fork(); workers forked by serve.py reopen
+        # the sessions over the same mapped weights
+        reopen_after_fork(self._open_sessions)
+
+        self.preprocessor = torch.jit.load(os.path.join(model_dir, "preprocessor.ts"), map_location="cpu").eval()
+
+        self.vocab = self._load_json(model_dir, "vocab.json")
+        masks = self._load_json(model_dir, "language_masks.json") or {}
+        self.language_masks = {lang: np.asarray(m, dtype=bool) for lang, m in masks.items()}
+
+    def _open_sessions(self):
+        def session(name):
+            opts = onnxruntime.SessionOptions()
+            opts.graph_optimization_level = onnxruntime.GraphOptimizationLevel.ORT_ENABLE_ALL
+            if self.num_threads:
+                opts.intra_op_num_threads = self.num_threads
+            # Pre-packing would copy every mapped weight into private memory
+            opts.add_session_config_entry("session.disable_prepacking", "1")
+            for weight, value in self._weights[name].items():
+                opts.add_initializer(weight, value)
+            return onnxruntime.InferenceSession(
+                os.path.join(self.model_dir, self.config[name]),
+                sess_options=opts,
+                providers=["CPUExecutionProvider"],
+            )
+
+        self.encoder = session("encoder")
+        self.ctc_decoder = session("ctc_decoder")
+
+    @staticmethod
+    def _load_json(model_dir: str, name: str):
+        path = os.path.join(model_dir, name)
+        if not os.path.exists(path):
+            return None
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+
+    def __call__(self, wav, lang: str, decoder_type: str = "ctc", lengths=None) -> Union[str, List[str]]:
+        if decoder_type != "ctc":
+            raise ValueError("OnnxConformerModel only supports CTC decoding")
+
+        import torch
+
+        wav = torch.as_tensor(wav, dtype=torch.float32)
+        if wav.ndim == 1:
+            wav = wav.unsqueeze(0)
+        if lengths is None:
+            lengths = torch.full((wav.shape[0],), wav.shape[-1], dtype=torch.int64)
+
+        with torch.no_grad():
+            features, feature_lengths = self.preprocessor(wav, torch.as_tensor(lengths))
+
+        encoded, encoded_lengths = self.encoder.run(
+            None,
+            {"audio_signal": features.numpy(), "length": feature_lengths.numpy()},
+        )
+        logprobs = self.ctc_decoder.run(None, {"encoder_output": encoded})[0]
+
+        texts = [
+            self._greedy_decode(logprobs[i, :int(encoded_lengths[i])], lang)
+            for i in range(logprobs.shape[0])
+        ]
+        return texts[0] if len(texts) == 1 else texts
+
+    def _greedy_decode(self, logprobs: np.ndarray, lang: str) -> str:
+        """CTC greedy decode; blank is the last column after language masking."""
+        mask = self.language_masks.get(lang)
+        if mask is not None:
+            logprobs = logprobs[:, mask]
+        vocab = self.vocab[lang] if isinstance(self.vocab, dict) else self.vocab
+        blank = logprobs.shape[-1] - 1
+
+        ids = logprobs.argmax(axis=-1)
+        if len(ids) == 0:
+            return ""
+        keep = np.ones(len(ids), dtype=bool)
+        keep[1:] = ids[1:] != ids[:-1]
+        tokens = [vocab[i] for i in ids[keep] if i != blank]
+        return "".join(tokens).replace("▁", " ").strip()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export Indic-Conformer to int8 ONNX")
+    parser.add_argument("--model", default="ai4bharat/indic-conformer-600m-multilingual")
+    parser.add_argument("--out", default="models/indic-conformer-int8")
+    parser.add_argument("--keep-fp32", action="store_true")
+    args = parser.parse_args()
+
+    from transformers import AutoModel
+
+    model = AutoModel.from_pretrained(args.model, trust_remote_code=True)
+    export_int8(model, args.out, keep_fp32=args.keep_fp32)
+
+
+if __name__ == "__main__":
+    main()
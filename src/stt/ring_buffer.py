@@ -0,0 +1,77 @@
+"""Preallocated float32 ring buffer for streaming PCM audio."""
+import numpy as np
+
+
+class AudioRingBuffer:
+    """
+    Fixed-capacity float32 audio ring addressed by absolute sample index.
+
+    Incoming PCM16 is scaled straight into the preallocated storage, so the
+    per-frame path allocates nothing. Capacity is rounded up to a multiple of
+    `frame_samples`, which keeps every aligned frame contiguous in memory.
+    """
+
+    def __init__(self, capacity: int, frame_samples: int = 512):
+        """
+        Initialize ring buffer.
+
+        Args:
+            capacity: Minimum number of samples to retain
+            frame_samples: Frame size that must never straddle the wrap point
+        """
+        frames = -(-capacity // frame_samples)
+        self.capacity = frames * frame_samples
+        self.frame_samples = frame_samples
+        self.data = np.zeros(self.capacity, dtype=np.float32)
+        # Scratch for reads that wrap around the end of the ring
+        self._scratch = np.zeros(self.capacity, dtype=np.float32)
+        self.write_pos = 0  # absolute index of the next sample to be written
+
+    @property
+    def oldest(self) -> int:
+        """Absolute index of the oldest sample still held."""
+        return max(0, self.write_pos - self.capacity)
+
+    def write_pcm16(self, pcm: bytes) -> int:
+        """Append little-endian PCM16 bytes; returns the number of samples written."""
+        src = np.frombuffer(pcm, dtype=np.int16)
+        n = len(src)
+        if n > self.capacity:
+            src = src[-self.capacity:]
+            self.write_pos += n - self.capacity
+            n = self.capacity
+
+        start = self.write_pos % self.capacity
+        first = min(n, self.capacity - start)
+        np.multiply(src[:first], 1 / 32768.0, out=self.data[start:start + first], casting="unsafe")
+        if first < n:
+            np.multiply(src[first:], 1 / 32768.0, out=self.data[:n - first], casting="unsafe")
+
+        self.write_pos += n
+        return n
+
+    def frame(self, pos: int) -> np.ndarray:
+        """View of the frame starting at absolute index `pos` (must be frame aligned)."""
+        start = pos % self.capacity
+        return self.data[start:start + self.frame_samples]
+
+    def read(self, start: int, end: int) -> np.ndarray:
+        """
+        Samples in [start, end) as a contiguous array.
+
+        Returns a view when the span does not wrap, otherwise a view of the
+        internal scratch buffer. Either way it is only valid until the next write.
+        """
+        start = max(start, self.oldest)
+        n = end - start
+        if n <= 0:
+            return self.data[:0]
+
+        s = start % self.capacity
+        if s + n <= self.capacity:
+            return self.data[s:s + n]
+
+        first = self.capacity - s
+        self._scratch[:first] = self.data[s:]
+        self._scratch[first:n] = self.data[:n - first]
+        return self._scratch[:n]
@@ -16,6 +16,13 @@ class STTProvider(ABC):
             Final transcribed text when available
         """
         pass
+
+    def prepare(self):
+        """
+        Start acquiring per-stream resources (e.g. a network connection) for
+        the next transcribe_stream call. Optional; the default does nothing.
+        """
+        pass
     
     @abstractmethod
     async def close(self):
@@ -0,0 +1,273 @@
+"""Voice activity detection using the silero-vad ONNX model."""
+import importlib.util
+import os
+from collections import deque
+from typing import List, Optional, Tuple
+
+import numpy as np
+import onnxruntime
+
+from src.forking import reopen_after_fork
+
+
+def _bundled_model_path() -> str:
+    """silero_vad.onnx shipped with the silero-vad package, located without importing it."""
+    # Importing silero_vad would import torch and torchaudio (and set torch's thread count)
+    spec = importlib.util.find_spec("silero_vad")
+    if spec is None or not spec.submodule_search_locations:
+        raise FileNotFoundError("silero-vad is not installed; pass model_path to SileroVAD")
+    return os.path.join(spec.submodule_search_locations[0], "data", "silero_vad.onnx")
+
+
+class VADState:
+    """Recurrent state of one audio stream. Create one per session."""
+
+    def __init__(self, context_size: int):
+        self.state = np.zeros((2, 1, 128), dtype=np.float32)
+        self.context = np.zeros((1, context_size), dtype=np.float32)
+        # Preallocated model input: [context | frame]
+        self.input: Optional[np.ndarray] = None
+
+
+class SileroVAD:
+    """
+    Frame-level speech probability from silero-vad.
+
+    A single ONNX session is shared by every stream; the recurrent state lives
+    in a per-stream VADState, so one instance can serve all sessions.
+    """
+
+    def __init__(
+        self,
+        model_path: Optional[str] = None,
+        sample_rate: int = 16000,
+        num_threads: int = 1,
+    ):
+        """
+        Initialize silero VAD.
+
+        Args:
+            model_path: Path to silero_vad.onnx (defaults to the copy bundled with silero-vad)
+            sample_rate: Audio sample rate in Hz (8000 or 16000)
+            num_threads: ONNX Runtime intra-op threads
+        """
+        if sample_rate not in (8000, 16000):
+            raise ValueError(f"Unsupported VAD sample rate: {sample_rate}")
+
+        if model_path is None:
+            model_path = _bundled_model_path()
+
+        self.model_path = model_path
+        self.num_threads = num_threads
+        self._open_session()
+        # Workers forked by serve.py need their own ORT thread pool
+        reopen_after_fork(self._open_session)
+
+        self.sample_rate = sample_rate
+        self.frame_samples = 512 if sample_rate == 16000 else 256
+        self.context_size = 64 if sample_rate == 16000 else 32
+        self._sr = np.array(sample_rate, dtype=np.int64)
+
+    def _open_session(self):
+        opts = onnxruntime.SessionOptions()
+        opts.inter_op_num_threads = 1
+        opts.intra_op_num_threads = self.num_threads
+        self.session = onnxruntime.InferenceSession(
+            self.model_path,
+            sess_options=opts,
+            providers=["CPUExecutionProvider"],
+        )
+
+    @property
+    def frame_duration(self) -> float:
+        """Duration of one VAD frame in seconds."""
+        return self.frame_samples / self.sample_rate
+
+    def new_state(self) -> VADState:
+        """Create fresh recurrent state for a new stream."""
+        return VADState(self.context_size)
+
+    def speech_prob(self, frame: np.ndarray, state: VADState) -> float:
+        """
+        Speech probability for exactly one frame of float32 audio in [-1, 1].
+
+        Args:
+            frame: `frame_samples` float32 samples
+            state: Stream state, updated in place
+        """
+        if state.input is None:
+            state.input = np.zeros((1, self.context_size + self.frame_samples), dtype=np.float32)
+
+        x = state.input
+        x[0, :self.context_size] = state.context[0]
+        x[0, self.context_size:] = frame
+
+        out, new_state = self.session.run(
+            None,
+            {"input": x, "state": state.state, "sr": self._sr},
+        )
+        state.state = new_state
+        state.context[0] = x[0, -self.context_size:]
+        return float(out[0][0])
+
+
+class Endpointer:
+    """
+    Hysteresis state machine over per-frame speech probabilities.
+
+    `update()` classifies each frame as:
+        "silence"  outside speech (abandons any unconfirmed onset)
+        "onset"    above threshold, not yet `min_speech_frames` long
+        "start"    speech confirmed; `onset_frames` frames belong to the onset
+        "speech"   inside a segment, including hangover silence
+        "end"      silence lasted `min_silence_frames`; segment closed
+    """
+
+    def __init__(self, threshold: float, min_speech_frames: int, min_silence_frames: int):
+        self.threshold = threshold
+        # Once in speech, stay there until prob drops well below threshold
+        self.neg_threshold = max(threshold - 0.15, 0.01)
+        self.min_speech_frames = min_speech_frames
+        self.min_silence_frames = min_silence_frames
+        self.triggered = False
+        self.onset_frames = 0
+        self.silence_frames = 0
+
+    def reset(self):
+        self.triggered = False
+        self.onset_frames = 0
+        self.silence_frames = 0
+
+    def update(self, prob: float) -> str:
+        if self.triggered:
+            if prob < self.neg_threshold:
+                self.silence_frames += 1
+                if self.silence_frames >= self.min_silence_frames:
+                    self.triggered = False
+                    self.silence_frames = 0
+                    self.onset_frames = 0
+                    return "end"
+            else:
+                self.silence_frames = 0
+            return "speech"
+
+        if prob >= self.threshold:
+            self.onset_frames += 1
+            if self.onset_frames >= self.min_speech_frames:
+                self.triggered = True
+                return "start"
+            return "onset"
+
+        self.onset_frames = 0
+        return "silence"
+
+
+class SpeechSegmenter:
+    """
+    Turns a stream of audio into speech segments with pre-roll and hangover.
+
+    `push()` returns a list of events:
+        ("start", audio)  speech confirmed; audio includes the pre-roll
+        ("speech", audio) further audio inside the segment (incl. hangover)
+        ("end", None)     silence lasted `min_silence_ms`
+    """
+
+    def __init__(
+        self,
+        vad: SileroVAD,
+        threshold: float = 0.5,
+        min_speech_ms: int = 250,
+        min_silence_ms: int = 500,
+        speech_pad_ms: int = 200,
+    ):
+        """
+        Initialize segmenter.
+
+        Args:
+            vad: Shared SileroVAD instance
+            threshold: Speech probability that starts a segment
+            min_speech_ms: Speech required before a segment is confirmed
+            min_silence_ms: Hangover; silence required to end a segment
+            speech_pad_ms: Pre-roll kept from before the detected onset
+        """
+        self.vad = vad
+        self.state = vad.new_state()
+
+        frame_ms = vad.frame_duration * 1000
+        self.endpointer = Endpointer(
+            threshold,
+            min_speech_frames=max(1, int(min_speech_ms / frame_ms)),
+            min_silence_frames=max(1, int(min_silence_ms / frame_ms)),
+        )
+        self.preroll: deque = deque(maxlen=max(0, int(speech_pad_ms / frame_ms)))
+
+        self._pending: List[np.ndarray] = []
+        self._leftover = np.zeros(0, dtype=np.float32)
+        self.frames = 0        # frames classified so far
+        self.last_prob = 0.0   # speech probability of the latest frame
+
+    def reset(self):
+        """Forget the current segment and recurrent state."""
+        self.state = self.vad.new_state()
+        self.endpointer.reset()
+        self._pending = []
+        self._leftover = np.zeros(0, dtype=np.float32)
+        self.preroll.clear()
+
+    def push(self, samples: np.ndarray) -> List[Tuple[str, Optional[np.ndarray]]]:
+        """Feed float32 samples; returns segment events in order."""
+        n = self.vad.frame_samples
+        if len(self._leftover):
+            samples = np.concatenate((self._leftover, samples))
+
+        usable = len(samples) - len(samples) % n
+        self._leftover = samples[usable:].copy()
+
+        events: List[Tuple[str, Optional[np.ndarray]]] = []
+        for i in range(0, usable, n):
+            event = self._process_frame(samples[i:i + n])
+            if event is not None:
+                events.append(event)
+        return events
+
+    @property
+    def triggered(self) -> bool:
+        """Whether the stream is currently inside a speech segment."""
+        return self.endpointer.triggered
+
+    def flush(self) -> List[Tuple[str, Optional[np.ndarray]]]:
+        """Close an open segment at end of stream."""
+        if self.endpointer.triggered:
+            self.endpointer.reset()
+            return [("end", None)]
+        return []
+
+    def _process_frame(self, frame: np.ndarray) -> Optional[Tuple[str, Optional[np.ndarray]]]:
+        prob = self.vad.speech_prob(frame, self.state)
+        self.frames += 1
+        self.last_prob = prob
+        kind = self.endpointer.update(prob)
+
+        if kind == "speech":
+            return ("speech", frame.copy())
+
+        if kind == "end":
+            self.preroll.append(frame.copy())
+            return ("end", None)
+
+        if kind == "onset":
+            self._pending.append(frame.copy())
+            return None
+
+        if kind == "start":
+            audio = np.concatenate(list(self.preroll) + self._pending + [frame])
+            self.preroll.clear()
+            self._pending = []
+            return ("start", audio)
+
+        # Onset did not last long enough: treat it as pre-roll
+        if self._pending:
+            self.preroll.extend(self._pending)
+            self._pending = []
+        self.preroll.append(frame.copy())
+        return None
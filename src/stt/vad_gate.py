@@ -0,0 +1,126 @@
+"""Server-side VAD gate that only forwards speech to an STT provider."""
+import asyncio
+import logging
+from typing import AsyncIterator, Awaitable, Callable, Optional
+
+import numpy as np
+
+from src.metrics import metrics
+from src.stt.stt_provider import STTProvider
+from src.stt.vad import SileroVAD, SpeechSegmenter
+
+logger = logging.getLogger("app")
+
+
+def _to_pcm16(audio: np.ndarray) -> bytes:
+    return np.clip(audio * 32768.0, -32768, 32767).astype(np.int16).tobytes()
+
+
+class VADGatedSTT(STTProvider):
+    """
+    Wraps any STTProvider and drops non-speech audio before it is sent on.
+
+    Speech segments are forwarded with `speech_pad_ms` of pre-roll and
+    `hangover_ms` of trailing audio; everything else is withheld. Streaming
+    providers keep their connection alive on their own while nothing is
+    forwarded (Deepgram sends KeepAlive).
+
+    The hangover should be longer than the wrapped provider's own endpointing
+    window (Deepgram `endpointing=300`, the local providers' silence
+    duration) so it still sees enough trailing silence to finalize.
+
+    Callers that react to speech themselves (barge-in) can observe the
+    gate's per-frame speech probabilities instead of running the VAD again.
+    """
+
+    def __init__(
+        self,
+        stt: STTProvider,
+        vad: Optional[SileroVAD] = None,
+        sample_rate: int = 16000,
+        threshold: float = 0.5,
+        min_speech_ms: int = 100,
+        hangover_ms: int = 600,
+        speech_pad_ms: int = 300,
+    ):
+        """
+        Initialize VAD gate.
+
+        Args:
+            stt: Provider that receives the gated audio
+            vad: Shared SileroVAD (created if None)
+            sample_rate: Sample rate of incoming PCM16
+            threshold: Speech probability that opens the gate
+            min_speech_ms: Speech required before the gate opens
+            hangover_ms: Silence forwarded after speech before the gate closes
+            speech_pad_ms: Audio from before the onset forwarded as pre-roll
+        """
+        self.stt = stt
+        self.vad = vad or SileroVAD(sample_rate=sample_rate)
+        self.threshold = threshold
+        self.min_speech_ms = min_speech_ms
+        self.hangover_ms = hangover_ms
+        self.speech_pad_ms = speech_pad_ms
+
+    def prepare(self):
+        self.stt.prepare()
+
+    async def _gate(
+        self,
+        audio_stream: AsyncIterator[bytes],
+        stats: dict,
+        on_speech_prob: Optional[Callable[[float], Awaitable[None]]],
+    ) -> AsyncIterator[bytes]:
+        segmenter = SpeechSegmenter(
+            self.vad,
+            threshold=self.threshold,
+            min_speech_ms=self.min_speech_ms,
+            min_silence_ms=self.hangover_ms,
+            speech_pad_ms=self.speech_pad_ms,
+        )
+        n = self.vad.frame_samples
+
+        async for chunk in audio_stream:
+            stats["in"] += len(chunk)
+            samples = np.frombuffer(chunk, dtype=np.int16).astype(np.float32) / 32768.0
+
+            # One VAD frame at a time, so the observer hears about speech within a frame
+            for i in range(0, len(samples), n):
+                frames = segmenter.frames
+                events = await asyncio.to_thread(segmenter.push, samples[i:i + n])
+                if on_speech_prob and segmenter.frames > frames:
+                    await on_speech_prob(segmenter.last_prob)
+
+                for kind, audio in events:
+                    if audio is None:
+                        continue
+                    pcm = _to_pcm16(audio)
+                    stats["out"] += len(pcm)
+                    yield pcm
+
+    async def transcribe_stream(
+        self,
+        audio_stream: AsyncIterator[bytes],
+        on_speech_prob: Optional[Callable[[float], Awaitable[None]]] = None,
+    ) -> AsyncIterator[str]:
+        """
+        Transcribe the speech in an audio stream.
+
+        Args:
+            audio_stream: Incoming PCM16 chunks
+            on_speech_prob: Awaited with the speech probability of every VAD frame
+        """
+        stats = {"in": 0, "out": 0}
+        try:
+            async for text in self.stt.transcribe_stream(self._gate(audio_stream, stats, on_speech_prob)):
+                yield text
+        finally:
+            if stats["in"]:
+                suppressed = max(0.0, 100.0 * (1 - stats["out"] / stats["in"]))
+                metrics.observe("vad_gate_suppressed_pct", suppressed)
+                metrics.incr("vad_gate_bytes_in", stats["in"])
+                metrics.incr("vad_gate_bytes_forwarded", stats["out"])
+                logger.info(f"🔇 VAD gate suppressed {suppressed:.0f}% of session audio")
+
+    async def close(self):
+        await self.stt.close()
@@ -0,0 +1,31 @@
+"""Process-wide micro-batching of translation requests across sessions."""
+from typing import List
+
+from src.batching import MicroBatcher
+
+
+class TranslationBatcher(MicroBatcher):
+    """
+    Coalesces pending translations from all sessions into one padded batch.
+
+    `translate()` on IndicTrans2Translator (or CT2IndicTrans2Translator)
+    already accepts a list; this service collects sentences until
+    `max_batch_size` are waiting or `max_wait_ms` has passed since the first,
+    runs a single `translate([...])` on a dedicated thread and fans the
+    results back out. Only sentences with the same language pair share a batch.
+    """
+
+    def __init__(self, translator, max_batch_size: int = 16, max_wait_ms: float = 10.0):
+        """
+        Initialize batcher.
+
+        Args:
+            translator: IndicTrans2Translator or CT2IndicTrans2Translator
+            max_batch_size: Maximum sentences per batch
+            max_wait_ms: Latency window for collecting a batch
+        """
+        super().__init__(max_batch_size, max_wait_ms, metric_prefix="translation", thread_name="translate")
+        self.translator = translator
+
+    def run_batch(self, texts: List[str], **options) -> List[str]:
+        return self.translator.translate(texts, **options)
@@ -0,0 +1,97 @@
+"""Cheap checks that let an utterance bypass the translation model."""
+import re
+import threading
+import unicodedata
+from collections import OrderedDict
+from typing import Optional
+
+from src.metrics import metrics
+
+_PUNCT_EDGES = re.compile(r"^[\s\W_]+|[\s\W_]+$")
+_SPACES = re.compile(r"\s+")
+
+
+def indic_ratio(text: str, start: str = "ऀ", end: str = "ॿ") -> float:
+    """Share of letters in `text` that belong to the given script block (Devanagari by default)."""
+    letters = 0
+    indic = 0
+    for ch in text:
+        if ch.isalpha() or unicodedata.category(ch).startswith("M"):
+            letters += 1
+            if start <= ch <= end:
+                indic += 1
+    return indic / letters if letters else 0.0
+
+
+def normalize(text: str) -> str:
+    """Cache key: NFC, case-folded, single-spaced, without edge punctuation."""
+    text = unicodedata.normalize("NFC", text).casefold()
+    return _PUNCT_EDGES.sub("", _SPACES.sub(" ", text))
+
+
+class TranslationFastPath:
+    """
+    Decides whether an utterance needs the translation model at all.
+
+    English and Latin-script Hinglish go straight to the LLM, which handles
+    them fine. Devanagari text is looked up in a bounded LRU cache of
+    normalized source -> translation pairs before the model is called.
+    """
+
+    def __init__(self, min_indic_ratio: float = 0.3, cache_size: int = 1024):
+        """
+        Initialize fast path.
+
+        Args:
+            min_indic_ratio: Share of Devanagari letters that makes an utterance worth translating
+            cache_size: Maximum cached translations (0 disables the cache)
+        """
+        self.min_indic_ratio = min_indic_ratio
+        self.cache_size = cache_size
+        self._cache: "OrderedDict[str, str]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.skipped = 0
+        self.hits = 0
+
+    def lookup(self, text: str) -> Optional[str]:
+        """Text to use without calling the model, or None if the model is needed."""
+        self.requests += 1
+        metrics.incr("translation_requests")
+
+        if indic_ratio(text) < self.min_indic_ratio:
+            self.skipped += 1
+            metrics.incr("translation_skipped")
+            self._report()
+            return text
+
+        result = None
+        if self.cache_size:
+            key = normalize(text)
+            with self._lock:
+                result = self._cache.get(key)
+                if result is not None:
+                    self._cache.move_to_end(key)
+
+        if result is not None:
+            self.hits += 1
+            metrics.incr("translation_cache_hits")
+        self._report()
+        return result
+
+    def store(self, text: str, translation: str):
+        """Remember a model translation."""
+        if not self.cache_size:
+            return
+        key = normalize(text)
+        with self._lock:
+            self._cache[key] = translation
+            self._cache.move_to_end(key)
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+
+    def _report(self):
+        metrics.set("translation_skip_rate", self.skipped / self.requests)
+        looked_up = self.requests - self.skipped
+        if looked_up:
+            metrics.set("translation_cache_hit_rate", self.hits / looked_up)
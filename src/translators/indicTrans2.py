@@ -1,8 +1,12 @@
+from contextlib import nullcontext
+
 import torch
 from huggingface_hub import login
 from transformers import AutoModelForSeq2SeqLM, AutoTokenizer
 from IndicTransToolkit import IndicProcessor
 
+from src.model_manager import ModelManager
+
 
 class IndicTrans2Translator:
     def __init__(
@@ -10,6 +14,7 @@ class IndicTrans2Translator:
         model_name="ai4bharat/indictrans2-indic-en-1B",
         device=None,
         hf_token=None,
+        model_manager: ModelManager = None,
     ):
         """
         Initialize IndicTrans2 translator.
@@ -18,6 +23,7 @@ class IndicTrans2Translator:
             model_name (str): HuggingFace model name
             device (str | None): 'cuda' or 'cpu'. Auto-detected if None
             hf_token (str | None): HuggingFace token (optional)
+            model_manager (ModelManager | None): Load the model lazily through a shared manager
         """
 
         if hf_token:
@@ -30,15 +36,29 @@ class IndicTrans2Translator:
             trust_remote_code=True
         )
 
-        self.model = AutoModelForSeq2SeqLM.from_pretrained(
-            model_name,
-            trust_remote_code=True
-        ).to(self.device)
-
-        self.model.eval()
+        def load():
+            model = AutoModelForSeq2SeqLM.from_pretrained(
+                model_name,
+                trust_remote_code=True
+            ).to(self.device)
+            model.eval()
+            return model
+
+        self.model_manager = model_manager
+        self.model_key = f"translator:{model_name}"
+        if model_manager:
+            model_manager.register(self.model_key, load)
+            self.model = None
+        else:
+            self.model = load()
 
         self.ip = IndicProcessor(inference=True)
 
+    def _use_model(self):
+        if self.model_manager:
+            return self.model_manager.use(self.model_key)
+        return nullcontext(self.model)
+
     def translate(
         self,
         text,
@@ -80,8 +100,8 @@ class IndicTrans2Translator:
         ).to(self.device)
 
         # Generate
-        with torch.no_grad():
-            generated_tokens = self.model.generate(
+        with self._use_model() as model, torch.no_grad():
+            generated_tokens = model.generate(
                 **inputs,
                 use_cache=True,
                 max_length=max_length,
@@ -0,0 +1,244 @@
+"""
+CTranslate2 int8 backend for IndicTrans2.
+
+`convert_int8()` converts the HF IndicTrans2 checkpoint to a CTranslate2
+model directory. The encoder/decoder layout is the M2M100 one with separate
+source and target vocabularies, so the stock M2M100 loader is reused with
+those two differences. `CT2IndicTrans2Translator` loads that directory and
+exposes the same `translate()` as `IndicTrans2Translator`.
+
+Convert once:
+    python -m src.translators.indicTrans2_ct2 --out models/indictrans2-indic-en-1B-ct2
+"""
+import argparse
+import json
+import logging
+import os
+from typing import List, Optional
+
+import ctranslate2
+from transformers import AutoTokenizer
+from IndicTransToolkit import IndicProcessor
+
+from src.forking import reopen_after_fork
+
+logger = logging.getLogger("app")
+
+CONFIG_FILE = "indictrans2.json"
+
+# Translators inherited over fork(); their destructors would join threads that only exist in the parent
+_inherited: List[ctranslate2.Translator] = []
+
+
+def _sorted_tokens(vocab: dict) -> List[str]:
+    return [token for token, _ in sorted(vocab.items(), key=lambda item: item[1])]
+
+
+def _fit(tokens: List[str], size: int) -> List[str]:
+    """Trim or pad a vocabulary to the embedding size of the model."""
+    tokens = tokens[:size]
+    return tokens + [f"madeupword{i}" for i in range(size - len(tokens))]
+
+
+def _vocabularies(model, tokenizer):
+    """Source and target token lists, indexed by id."""
+    src = tokenizer.get_src_vocab() if hasattr(tokenizer, "get_src_vocab") else tokenizer.encoder
+    tgt = tokenizer.get_tgt_vocab() if hasattr(tokenizer, "get_tgt_vocab") else tokenizer.decoder
+    src_size = model.model.encoder.embed_tokens.weight.shape[0]
+    tgt_size = model.model.decoder.embed_tokens.weight.shape[0]
+    return _fit(_sorted_tokens(src), src_size), _fit(_sorted_tokens(tgt), tgt_size)
+
+
+def convert_int8(
+    model_name: str,
+    out_dir: str,
+    quantization: str = "int8",
+    hf_token: Optional[str] = None,
+    force: bool = False,
+):
+    """
+    Convert an HF IndicTrans2 checkpoint to a quantized CTranslate2 model.
+
+    Args:
+        model_name: HuggingFace model name or local path
+        out_dir: Output directory
+        quantization: CTranslate2 weight type (int8, int8_float16, float16, ...)
+        hf_token: HuggingFace token (optional)
+        force: Overwrite an existing output directory
+    """
+    import torch
+    from huggingface_hub import login
+    from transformers import AutoModelForSeq2SeqLM
+    from ctranslate2.converters.transformers import BartLoader, M2M100Loader, TransformersConverter
+
+    if hf_token:
+        login(token=hf_token)
+
+    tokenizer = AutoTokenizer.from_pretrained(model_name, trust_remote_code=True)
+    model = AutoModelForSeq2SeqLM.from_pretrained(model_name, trust_remote_code=True).eval()
+    src_tokens, tgt_tokens = _vocabularies(model, tokenizer)
+
+    class IndicTransLoader(M2M100Loader):
+        def get_model_spec(self, model):
+            config = model.config
+            config.normalize_before = config.encoder_normalize_before
+            config.normalize_embedding = config.layernorm_embedding
+            # Skip M2M100's override, which disables the embedding layer norm
+            return BartLoader.get_model_spec(self, model)
+
+        def set_config(self, config, model, tokenizer):
+            config.bos_token = tokenizer.bos_token
+            config.eos_token = tokenizer.eos_token
+            config.unk_token = tokenizer.unk_token
+            config.decoder_start_token = tgt_tokens[model.config.decoder_start_token_id]
+
+        def get_vocabulary(self, model, tokenizer):
+            return tgt_tokens
+
+        def set_vocabulary(self, spec, tokens):
+            spec.register_source_vocabulary(src_tokens)
+            spec.register_target_vocabulary(tgt_tokens)
+
+    class IndicTransConverter(TransformersConverter):
+        def _load(self):
+            with torch.no_grad():
+                return IndicTransLoader()(model, tokenizer)
+
+    logger.info(f"⚙️  Converting {model_name} to CTranslate2 ({quantization})")
+    IndicTransConverter(model_name).convert(out_dir, quantization=quantization, force=force)
+
+    with open(os.path.join(out_dir, CONFIG_FILE), "w", encoding="utf-8") as f:
+        json.dump({"tokenizer": model_name, "source": src_tokens, "target": tgt_tokens}, f, ensure_ascii=False)
+
+    logger.info(f"✅ Converted IndicTrans2 to {out_dir}")
+
+
+class CT2IndicTrans2Translator:
+    """IndicTrans2 on CTranslate2; drop-in for IndicTrans2Translator."""
+
+    def __init__(
+        self,
+        model_dir: str,
+        device: str = "cpu",
+        compute_type: str = "int8",
+        beam_size: int = 1,
+        inter_threads: int = 1,
+        intra_threads: int = 0,
+        hf_token: Optional[str] = None,
+    ):
+        """
+        Initialize CTranslate2 IndicTrans2 translator.
+
+        Args:
+            model_dir: Directory written by convert_int8()
+            device: 'cpu' or 'cuda'
+            compute_type: CTranslate2 compute type (int8, int8_float16, ...)
+            beam_size: Default beam size (1 = greedy)
+            inter_threads: Batches translated in parallel
+            intra_threads: Threads per batch (0 = CTranslate2 default)
+            hf_token: HuggingFace token, used to fetch the tokenizer (optional)
+        """
+        if hf_token:
+            from huggingface_hub import login
+
+            login(token=hf_token)
+
+        with open(os.path.join(model_dir, CONFIG_FILE), encoding="utf-8") as f:
+            config = json.load(f)
+
+        self.beam_size = beam_size
+        self._translator_args = dict(
+            device=device,
+            compute_type=compute_type,
+            inter_threads=inter_threads,
+            intra_threads=intra_threads,
+        )
+        self.model_dir = model_dir
+        self.translator = ctranslate2.Translator(model_dir, **self._translator_args)
+        # CTranslate2 copies the weights into its own buffers, so a worker forked by
+        # serve.py gains nothing from the parent's copy and reloads with its own threads
+        reopen_after_fork(self._reload)
+        self.tokenizer = AutoTokenizer.from_pretrained(config["tokenizer"], trust_remote_code=True)
+        self.src_tokens = config["source"]
+        self.tgt_ids = {token: i for i, token in enumerate(config["target"])}
+        self.unk_id = self.tgt_ids.get(self.tokenizer.unk_token, 0)
+
+        self.ip = IndicProcessor(inference=True)
+
+    def _reload(self):
+        _inherited.append(self.translator)
+        self.translator = ctranslate2.Translator(self.model_dir, **self._translator_args)
+
+    def translate(
+        self,
+        text,
+        src_lang="hin_Deva",
+        tgt_lang="eng_Latn",
+        max_length=256,
+        num_beams=None,
+    ):
+        """
+        Translate Indic text to target language.
+
+        Args:
+            text (str | list[str]): Input text
+            src_lang (str): Source language code
+            tgt_lang (str): Target language code
+            max_length (int): Max generation length
+            num_beams (int | None): Beam search size (defaults to beam_size)
+
+        Returns:
+            str | list[str]: Translated text
+        """
+        single_input = isinstance(text, str)
+        sentences = [text] if single_input else text
+
+        # Preprocess
+        batch = self.ip.preprocess_batch(
+            sentences,
+            src_lang=src_lang,
+            tgt_lang=tgt_lang,
+        )
+
+        # Tokenize to source pieces
+        input_ids = self.tokenizer(batch, truncation=True, padding=False)["input_ids"]
+        source = [[self.src_tokens[i] for i in ids] for ids in input_ids]
+
+        # Generate
+        results = self.translator.translate_batch(
+            source,
+            beam_size=num_beams or self.beam_size,
+            max_decoding_length=max_length,
+            num_hypotheses=1,
+        )
+
+        # Decode
+        output_ids = [
+            [self.tgt_ids.get(token, self.unk_id) for token in r.hypotheses[0]]
+            for r in results
+        ]
+        with self.tokenizer.as_target_tokenizer():
+            decoded = self.tokenizer.batch_decode(
+                output_ids,
+                skip_special_tokens=True,
+                clean_up_tokenization_spaces=True,
+            )
+
+        # Postprocess
+        translations = self.ip.postprocess_batch(decoded, lang=tgt_lang)
+        return translations[0] if single_input else translations
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Convert IndicTrans2 to CTranslate2")
+    parser.add_argument("--model", default="ai4bharat/indictrans2-indic-en-1B")
+    parser.add_argument("--out", default="models/indictrans2-indic-en-1B-ct2")
+    parser.add_argument("--quantization", default="int8")
+    parser.add_argument("--force", action="store_true")
+    args = parser.parse_args()
+
+    convert_int8(args.model, args.out, args.quantization, hf_token=os.getenv("HF_TOKEN"), force=args.force)
+
+
+if __name__ == "__main__":
+    main()
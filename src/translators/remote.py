@@ -0,0 +1,22 @@
+"""Translator proxy that runs IndicTrans2 in inference worker processes."""
+from src.inference_pool import InferencePool
+
+
+class RemoteTranslator:
+    """
+    Same `translate()` as IndicTrans2Translator, served by an InferencePool
+    of TranslatorService workers. Blocking, like the in-process translators,
+    so it drops into the pipeline's executor and into TranslationBatcher.
+    """
+
+    def __init__(self, pool: InferencePool):
+        """
+        Initialize remote translator.
+
+        Args:
+            pool: InferencePool built with "src.inference_pool:TranslatorService"
+        """
+        self.pool = pool
+
+    def translate(self, text, **options):
+        return self.pool.call_sync("translate", text, **options)
@@ -1,8 +1,64 @@
 import asyncio
+import logging
+from time import perf_counter
+from typing import AsyncIterator, Callable, Optional
+
 import azure.cognitiveservices.speech as speechsdk
 
+from src.forking import reopen_after_fork
+from src.metrics import metrics
 from src.tts.tts_provider import TTSProvider
 
+logger = logging.getLogger("app")
+
+# Raw PCM16 mono output format for each supported sample rate
+_RAW_FORMATS = {
+    8000: speechsdk.SpeechSynthesisOutputFormat.Raw8Khz16BitMonoPcm,
+    16000: speechsdk.SpeechSynthesisOutputFormat.Raw16Khz16BitMonoPcm,
+    24000: speechsdk.SpeechSynthesisOutputFormat.Raw24Khz16BitMonoPcm,
+    48000: speechsdk.SpeechSynthesisOutputFormat.Raw48Khz16BitMonoPcm,
+}
+
+# Synthesizers inherited over fork(); releasing them would close the parent's connections
+_inherited: list = []
+
+
+class _PooledSynthesizer:
+    """Long-lived synthesizer with an open connection; events go to the current request's sink."""
+
+    def __init__(self, speech_config: speechsdk.SpeechConfig):
+        # 👇 NO speaker, NO stream: audio arrives through the synthesizing events
+        self.synthesizer = speechsdk.SpeechSynthesizer(speech_config=speech_config, audio_config=None)
+        self.connection = speechsdk.Connection.from_speech_synthesizer(self.synthesizer)
+        self.connected = False
+        self.sink: Optional[Callable[[object], None]] = None
+
+        self.synthesizer.synthesizing.connect(lambda evt: self._emit(evt.result.audio_data))
+        self.synthesizer.synthesis_completed.connect(lambda evt: self._emit(None))
+        self.synthesizer.synthesis_canceled.connect(self._on_canceled)
+        self.connection.connected.connect(lambda evt: self._set_connected(True))
+        self.connection.disconnected.connect(lambda evt: self._set_connected(False))
+
+    def _set_connected(self, connected: bool):
+        self.connected = connected
+
+    def _emit(self, item):
+        sink = self.sink
+        if sink is not None:
+            sink(item)
+
+    def _on_canceled(self, evt):
+        details = evt.result.cancellation_details
+        self._emit(RuntimeError(f"Azure TTS failed: {details.reason} {details.error_details or ''}".strip()))
+
+    def open(self):
+        """Pre-connect so the first sentence skips the TLS/WebSocket handshake."""
+        self.connection.open(True)
+
+    def close(self):
+        self.sink = None
+        self.connection.close()
+
 
 class AzureTTS(TTSProvider):
     def __init__(
@@ -11,7 +67,23 @@ class AzureTTS(TTSProvider):
         region: str,
         voice: str = "hi-IN-SwaraNeural",
         sample_rate: int = 16000,
+        pool_size: int = 2,
+        max_pool_size: int = 8,
     ):
+        """
+        Initialize Azure TTS.
+
+        Args:
+            speech_key: Azure Speech subscription key
+            region: Azure region
+            voice: Voice name
+            sample_rate: Output sample rate of the raw PCM16 (8000, 16000, 24000 or 48000)
+            pool_size: Synthesizers created and connected at startup
+            max_pool_size: Upper bound when more sessions speak at once
+        """
+        if sample_rate not in _RAW_FORMATS:
+            raise ValueError(f"Unsupported Azure TTS sample rate: {sample_rate}")
+
         self.speech_config = speechsdk.SpeechConfig(
             subscription=speech_key,
             region=region
@@ -19,43 +91,115 @@ class AzureTTS(TTSProvider):
 
         self.speech_config.speech_synthesis_voice_name = voice
 
-        # IMPORTANT: force WAV RIFF output
+        # Raw PCM, so the synthesizing events carry playable audio without a header
         self.speech_config.set_speech_synthesis_output_format(
-            speechsdk.SpeechSynthesisOutputFormat.Raw16Khz16BitMonoPcm
+            _RAW_FORMATS[sample_rate]
         )
 
-        # 👇 NO speaker, NO stream
-        self.audio_config = None
-
         self.sample_rate = sample_rate
-
-    async def synthesize(self, text: str) -> bytes:
+        self.max_pool_size = max(pool_size, max_pool_size)
+
+        self.pool_size = pool_size
+        self._connect_pool()
+        # Workers forked by serve.py open their own connections
+        reopen_after_fork(self._reconnect_pool)
+
+    def _connect_pool(self):
+        self._idle: asyncio.Queue = asyncio.Queue()
+        self._synthesizers = []
+        for _ in range(self.pool_size):
+            self._idle.put_nowait(self._new_synthesizer())
+
+    def _reconnect_pool(self):
+        _inherited.extend(self._synthesizers)
+        self._connect_pool()
+
+    def _new_synthesizer(self) -> _PooledSynthesizer:
+        synth = _PooledSynthesizer(self.speech_config)
+        synth.open()
+        self._synthesizers.append(synth)
+        return synth
+
+    async def _acquire(self) -> _PooledSynthesizer:
+        t0 = perf_counter()
+        try:
+            synth = self._idle.get_nowait()
+        except asyncio.QueueEmpty:
+            if len(self._synthesizers) < self.max_pool_size:
+                synth = self._new_synthesizer()
+            else:
+                synth = await self._idle.get()
+        metrics.observe("azure_pool_wait_ms", (perf_counter() - t0) * 1000)
+        return synth
+
+    async def synthesize_stream(self, text: str) -> AsyncIterator[bytes]:
+        """Yield raw PCM16 chunks as Azure renders them."""
         loop = asyncio.get_running_loop()
+        t0 = perf_counter()
+        synth = await self._acquire()
+
+        chunks: asyncio.Queue = asyncio.Queue()
+        synth.sink = lambda item: loop.call_soon_threadsafe(chunks.put_nowait, item)
+        if not synth.connected:
+            # Azure drops idle connections; reconnect ahead of the request
+            synth.open()
+
+        synth.synthesizer.speak_text_async(text)
+
+        finished = False
+        first = True
+        try:
+            while True:
+                chunk = await chunks.get()
+                if chunk is None:
+                    finished = True
+                    return
+                if isinstance(chunk, Exception):
+                    finished = True
+                    raise chunk
+                if first:
+                    metrics.observe("tts_first_audio_ms", (perf_counter() - t0) * 1000, provider="azure")
+                    first = False
+                if chunk:
+                    yield chunk
+        finally:
+            if finished:
+                synth.sink = None
+                self._idle.put_nowait(synth)
+            else:
+                # Interrupted: stop rendering in the background and recycle the synthesizer
+                asyncio.create_task(self._stop(synth, chunks))
+
+    async def _stop(self, synth: _PooledSynthesizer, chunks: asyncio.Queue):
+        """Cancel an in-flight synthesis; the synthesizer is reused once Azure confirms."""
+        try:
+            await asyncio.to_thread(lambda: synth.synthesizer.stop_speaking_async().get())
+            while True:
+                item = await asyncio.wait_for(chunks.get(), timeout=2.0)
+                if item is None or isinstance(item, Exception):
+                    break
+        except Exception:
+            # Events of the old request could leak into the next one; start over
+            logger.warning("⚠️ Azure synthesizer did not confirm cancellation, replacing it")
+            synth.close()
+            self._synthesizers.remove(synth)
+            synth = self._new_synthesizer()
+        synth.sink = None
+        self._idle.put_nowait(synth)
 
-        def _run():
-            synthesizer = speechsdk.SpeechSynthesizer(
-                speech_config=self.speech_config,
-                audio_config=self.audio_config
-            )
-
-            result = synthesizer.speak_text(text)
-
-            if result.reason != speechsdk.ResultReason.SynthesizingAudioCompleted:
-                raise RuntimeError(f"Azure TTS failed: {result.reason}")
-
-            # 🔑 THIS IS THE KEY LINE
-            audio = result.audio_data
-
-            print(f"🔊 [AzureTTS] bytes={len(audio)} header={audio[:12]}")
-
-            return audio
-
-        return await loop.run_in_executor(None, _run)
+    async def synthesize(self, text: str) -> bytes:
+        audio = b"".join([chunk async for chunk in self.synthesize_stream(text)])
+        logger.debug(f"🔊 [AzureTTS] bytes={len(audio)}")
+        return audio
 
     def get_audio_format(self) -> dict:
         return {
-            "format": "wav",
+            "format": "pcm",
             "sample_rate": self.sample_rate,
             "channels": 1,
             "encoding": "pcm16"
         }
+
+    async def close(self):
+        for synth in self._synthesizers:
+            synth.close()
@@ -1,12 +1,36 @@
 """Cartesia TTS provider."""
+import asyncio
+import base64
+import logging
+import uuid
+from time import perf_counter
+from typing import AsyncIterator, List, Optional
+
 import aiohttp
 
+from src.metrics import metrics
 from src.tts.tts_provider import TTSProvider
 
+logger = logging.getLogger("app")
+
+CARTESIA_VERSION = "2025-04-16"
+
+
+async def _single(text: str) -> AsyncIterator[str]:
+    yield text
+
 
 class CartesiaTTS(TTSProvider):
-    """Cloud-based TTS using Cartesia."""
-    
+    """
+    Cloud-based TTS using Cartesia.
+
+    With `websocket=True` text is sent over a persistent WebSocket instead
+    of one REST request per sentence. Each assistant turn is one
+    continuation context: LLM tokens are forwarded as they arrive and raw
+    PCM comes back while the rest of the reply is still being generated.
+    Idle connections are kept open and reused by the next turn.
+    """
+
     def __init__(
         self,
         api_key: str,
@@ -14,31 +38,54 @@ class CartesiaTTS(TTSProvider):
         model_id: str = "sonic-english",
         output_format: str = "mp3",
         sample_rate: int = 44100,
+        websocket: bool = False,
+        language: str = "en",
+        base_url: str = "https://api.cartesia.ai",
+        max_buffer_delay_ms: Optional[int] = None,
+        idle_connections: int = 2,
     ):
         """
         Initialize Cartesia TTS.
-        
+
         Args:
             api_key: Cartesia API key
             voice_id: Voice ID to use (faf0731e-dfb9-4cfc-8119-259a79b27e12)
             model_id: Model ID (sonic-3, sonic-english, sonic-multilingual)
-            output_format: Audio format (mp3, wav, pcm)
+            output_format: Audio format (mp3, wav, pcm); WebSocket mode always returns raw PCM16
             sample_rate: Sample rate in Hz
+            websocket: Stream over a WebSocket with continuation contexts
+            language: Transcript language (WebSocket mode)
+            base_url: API endpoint (point at benchmarks.cartesia_standin to run offline)
+            max_buffer_delay_ms: How long Cartesia may buffer partial text before speaking it
+            idle_connections: WebSocket connections kept open between turns
         """
         self.api_key = api_key
         self.voice_id = voice_id
         self.model_id = model_id
-        self.output_format = output_format
+        self.output_format = "pcm" if websocket else output_format
         self.sample_rate = sample_rate
-    
+        self.websocket = websocket
+        self.accepts_text_stream = websocket
+        self.language = language
+        self.base_url = base_url.rstrip("/")
+        self.max_buffer_delay_ms = max_buffer_delay_ms
+        self.idle_connections = idle_connections
+
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._idle: List[aiohttp.ClientWebSocketResponse] = []
+        self._warming: Optional[asyncio.Task] = None
+
     async def synthesize(self, text: str) -> bytes:
         """Synthesize text to audio bytes."""
+        if self.websocket:
+            return b"".join([chunk async for chunk in self.synthesize_stream(text)])
+
         async with aiohttp.ClientSession() as session:
             async with session.post(
-                "https://api.cartesia.ai/tts/bytes",
+                f"{self.base_url}/tts/bytes",
                 headers={
                     "Authorization": f"Bearer {self.api_key}",
-                    "Cartesia-Version": "2025-04-16",
+                    "Cartesia-Version": CARTESIA_VERSION,
                     "Content-Type": "application/json",
                 },
                 json={
@@ -53,7 +100,145 @@ class CartesiaTTS(TTSProvider):
                 },
             ) as response:
                 return await response.read()
-    
+
+    async def synthesize_stream(self, text: str) -> AsyncIterator[bytes]:
+        if not self.websocket:
+            yield await self.synthesize(text)
+            return
+        async for chunk in self.synthesize_text_stream(_single(text)):
+            yield chunk
+
+    # ------------------------------------------------------------------
+    # WebSocket mode
+    # ------------------------------------------------------------------
+
+    def prepare(self):
+        """Open a connection in the background so the next turn does not wait for the handshake."""
+        if self.websocket and not self._idle and (self._warming is None or self._warming.done()):
+            self._warming = asyncio.create_task(self._warm())
+
+    async def _warm(self):
+        try:
+            self._release(await self._connect())
+        except Exception as e:
+            logger.warning(f"⚠️ Cartesia pre-connect failed: {e}")
+
+    async def _connect(self) -> aiohttp.ClientWebSocketResponse:
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession()
+        url = self.base_url.replace("https://", "wss://").replace("http://", "ws://") + "/tts/websocket"
+        t0 = perf_counter()
+        ws = await self._session.ws_connect(
+            url,
+            params={"api_key": self.api_key, "cartesia_version": CARTESIA_VERSION},
+            heartbeat=20,
+        )
+        metrics.observe("cartesia_connect_ms", (perf_counter() - t0) * 1000)
+        return ws
+
+    async def _acquire(self) -> aiohttp.ClientWebSocketResponse:
+        while self._idle:
+            ws = self._idle.pop()
+            if not ws.closed:
+                return ws
+        if self._warming and not self._warming.done():
+            await self._warming
+            return await self._acquire()
+        return await self._connect()
+
+    def _release(self, ws: aiohttp.ClientWebSocketResponse):
+        if not ws.closed and len(self._idle) < self.idle_connections:
+            self._idle.append(ws)
+        elif not ws.closed:
+            asyncio.create_task(ws.close())
+
+    def _request(self, context_id: str, transcript: str, more: bool) -> dict:
+        request = {
+            "model_id": self.model_id,
+            "transcript": transcript,
+            "voice": {"mode": "id", "id": self.voice_id},
+            "language": self.language,
+            "context_id": context_id,
+            "continue": more,
+            "output_format": {
+                "container": "raw",
+                "encoding": "pcm_s16le",
+                "sample_rate": self.sample_rate,
+            },
+        }
+        if self.max_buffer_delay_ms is not None:
+            request["max_buffer_delay_ms"] = self.max_buffer_delay_ms
+        return request
+
+    async def synthesize_text_stream(self, text_stream: AsyncIterator[str]) -> AsyncIterator[bytes]:
+        """
+        Speak text as it is generated.
+
+        Args:
+            text_stream: Text pieces (e.g. LLM tokens), in order
+
+        Yields:
+            Raw PCM16 chunks as Cartesia produces them
+        """
+        ws = await self._acquire()
+        context_id = uuid.uuid4().hex
+        t_first_text: Optional[float] = None
+
+        async def send_text():
+            nonlocal t_first_text
+            try:
+                async for piece in text_stream:
+                    if not piece:
+                        continue
+                    if t_first_text is None:
+                        t_first_text = perf_counter()
+                    await ws.send_json(self._request(context_id, piece, more=True))
+                # Flush whatever is still buffered and close the context
+                await ws.send_json(self._request(context_id, "", more=False))
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                # Unblocks the receive loop, which re-raises this
+                await ws.close()
+                raise
+
+        sender = asyncio.create_task(send_text())
+        done = False
+        first = True
+        try:
+            async for msg in ws:
+                if msg.type != aiohttp.WSMsgType.TEXT:
+                    continue
+                data = msg.json()
+                if data.get("context_id") != context_id:
+                    continue  # late messages of a cancelled context
+                if data.get("type") == "chunk":
+                    if first and t_first_text is not None:
+                        metrics.observe("tts_first_audio_ms", (perf_counter() - t_first_text) * 1000, provider="cartesia")
+                        first = False
+                    yield base64.b64decode(data["data"])
+                elif data.get("type") == "done":
+                    done = True
+                    return
+                elif data.get("type") == "error":
+                    done = True
+                    raise RuntimeError(f"Cartesia TTS failed: {data.get('error')}")
+
+            done = True
+            if sender.done() and not sender.cancelled() and sender.exception():
+                raise sender.exception()
+            raise RuntimeError("Cartesia WebSocket closed mid-utterance")
+        finally:
+            if not sender.done():
+                sender.cancel()
+            if not done and not ws.closed:
+                # Interrupted: stop generating the rest of this context
+                try:
+                    await ws.send_json({"context_id": context_id, "cancel": True})
+                except Exception:
+                    pass
+            self._release(ws)
+
     def get_audio_format(self) -> dict:
         """Get audio format information."""
         return {
@@ -61,3 +246,10 @@ class CartesiaTTS(TTSProvider):
             "sample_rate": self.sample_rate,
             "channels": 1,
         }
+
+    async def close(self):
+        for ws in self._idle:
+            await ws.close()
+        self._idle.clear()
+        if self._session:
+            await self._session.close()
@@ -1,14 +1,28 @@
 """Local TTS provider using Coqui TTS."""
 import asyncio
-import io
-import numpy as np
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import nullcontext
+from time import perf_counter
 from typing import Optional
 
+import numpy as np
+from TTS.api import TTS
+
+from src.metrics import metrics
+from src.model_manager import ModelManager
 from src.tts.tts_provider import TTSProvider
 
+logger = logging.getLogger("app")
+
 
 class CoquiTTS(TTSProvider):
-    """Local TTS using Coqui TTS (CPU-based, replaces Piper)."""
+    """
+    Local TTS using Coqui TTS (CPU-based, replaces Piper).
+
+    Audio is synthesized in memory and returned as raw PCM16. A pool of
+    model instances lets several sessions synthesize at the same time.
+    """
     
     def __init__(
         self,
@@ -16,6 +30,9 @@ class CoquiTTS(TTSProvider):
         use_gpu: bool = False,
         speaker_id: Optional[str] = None,
         language: Optional[str] = None,
+        model_manager: Optional[ModelManager] = None,
+        pool_size: int = 1,
+        sample_rate: Optional[int] = None,
     ):
         """
         Initialize Coqui TTS.
@@ -25,6 +42,10 @@ class CoquiTTS(TTSProvider):
             use_gpu: Whether to use GPU (False for CPU)
             speaker_id: Speaker ID for multi-speaker models
             language: Language code for multilingual models
+            model_manager: Load the model lazily through a shared ModelManager
+            pool_size: Model instances for concurrent synthesis
+            sample_rate: Output rate of the model, if known; with a model_manager it
+                is otherwise read from the model at the first synthesis
             
         Popular models:
             - "tts_models/en/ljspeech/tacotron2-DDC" (English, fast)
@@ -32,75 +53,90 @@ class CoquiTTS(TTSProvider):
             - "tts_models/multilingual/multi-dataset/your_tts" (100+ languages)
             - "tts_models/en/vctk/vits" (English, multi-speaker)
         """
-        print(f"Loading Coqui TTS model: {model_name}")
-        self.tts = TTS(model_name=model_name, gpu=use_gpu)
         self.speaker_id = speaker_id
         self.language = language
-        self.sample_rate = self.tts.synthesizer.output_sample_rate if hasattr(self.tts, 'synthesizer') else 22050
+        self.model_manager = model_manager
+        self.pool_size = pool_size
+        # One ModelManager entry per instance, so idle ones can be evicted separately
+        self.model_keys = [f"tts:{model_name}" if i == 0 else f"tts:{model_name}#{i}" for i in range(pool_size)]
+
+        def load():
+            print(f"Loading Coqui TTS model: {model_name}")
+            return TTS(model_name=model_name, gpu=use_gpu)
+
+        if model_manager:
+            for key in self.model_keys:
+                model_manager.register(key, load)
+            self.models = [None] * pool_size
+            # Nothing is loaded until the first synthesis
+            self.sample_rate = sample_rate
+        else:
+            self.models = [load() for _ in range(pool_size)]
+            self.sample_rate = sample_rate or self._output_rate(self.models[0])
+        self.tts = self.models[0]
+
+        self._slots: asyncio.Queue = asyncio.Queue()
+        for slot in range(pool_size):
+            self._slots.put_nowait(slot)
+        self._executor = ThreadPoolExecutor(max_workers=pool_size, thread_name_prefix="coqui")
+
+    @staticmethod
+    def _output_rate(tts) -> int:
+        return tts.synthesizer.output_sample_rate if hasattr(tts, 'synthesizer') else 22050
+
+    def _use_model(self, slot: int = 0):
+        if self.model_manager:
+            return self.model_manager.use(self.model_keys[slot])
+        return nullcontext(self.models[slot])
         
     async def synthesize(self, text: str) -> bytes:
-        """Synthesize text to WAV audio bytes."""
-        # Run synthesis in thread pool to avoid blocking
-        wav_data = await asyncio.to_thread(self._synthesize_sync, text)
-        return wav_data
-    
-    def _synthesize_sync(self, text: str) -> bytes:
-        """Synchronous synthesis (run in thread pool)."""
-        # Create temporary file path
-        import tempfile
-        import wave
-        
-        with tempfile.NamedTemporaryFile(suffix='.wav', delete=False) as tmp_file:
-            tmp_path = tmp_file.name
-        
+        """Synthesize text to raw PCM16 audio bytes."""
+        t0 = perf_counter()
+        slot = await self._slots.get()
+        metrics.observe("coqui_pool_wait_ms", (perf_counter() - t0) * 1000)
         try:
-            # Synthesize to file
-            if self.speaker_id and self.language:
-                # Multilingual multi-speaker
-                self.tts.tts_to_file(
-                    text=text,
-                    file_path=tmp_path,
-                    speaker=self.speaker_id,
-                    language=self.language
-                )
-            elif self.speaker_id:
-                # Multi-speaker only
-                self.tts.tts_to_file(
-                    text=text,
-                    file_path=tmp_path,
-                    speaker=self.speaker_id
-                )
-            elif self.language:
-                # Multilingual only
-                self.tts.tts_to_file(
-                    text=text,
-                    file_path=tmp_path,
-                    language=self.language
-                )
-            else:
-                # Single speaker, single language
-                self.tts.tts_to_file(
-                    text=text,
-                    file_path=tmp_path
-                )
-            
-            # Read WAV file
-            with open(tmp_path, 'rb') as f:
-                wav_bytes = f.read()
-            
-            return wav_bytes
-            
+            # Run synthesis in thread pool to avoid blocking
+            pcm = await asyncio.get_running_loop().run_in_executor(self._executor, self._synthesize_sync, text, slot)
         finally:
-            # Clean up temp file
-            import os
-            if os.path.exists(tmp_path):
-                os.remove(tmp_path)
+            self._slots.put_nowait(slot)
+        metrics.observe("tts_first_audio_ms", (perf_counter() - t0) * 1000, provider="coqui")
+        return pcm
+    
+    def _synthesize_sync(self, text: str, slot: int = 0) -> bytes:
+        """Synchronous synthesis (run in thread pool)."""
+        with self._use_model(slot) as tts:
+            if self.sample_rate is None:
+                self.sample_rate = self._output_rate(tts)
+            wav = self._tts(tts, text)
+
+        # Peak-normalize to int16 like Coqui's save_wav does
+        wav = np.asarray(wav, dtype=np.float32)
+        if wav.size == 0:
+            return b""
+        wav = wav * (32767 / max(0.01, float(np.max(np.abs(wav)))))
+        return wav.astype(np.int16).tobytes()
+
+    def _tts(self, tts, text: str):
+        """Synthesize with the speaker/language options the model takes."""
+        kwargs = {}
+        if self.speaker_id:
+            # Multi-speaker
+            kwargs["speaker"] = self.speaker_id
+        if self.language:
+            # Multilingual
+            kwargs["language"] = self.language
+        return tts.tts(text=text, **kwargs)
     
     def get_audio_format(self) -> dict:
         """Get audio format information."""
         return {
-            "format": "wav",
-            "sample_rate": self.sample_rate,
+            "format": "pcm",
+            # Known once a lazily loaded model has synthesized (callers ask after the first audio)
+            "sample_rate": self.sample_rate or 22050,
             "channels": 1,
             "bit_depth": 16,
-        }
\ No newline at end of file
+        }
+
+    async def close(self):
+        """Clean up resources."""
+        self._executor.shutdown(wait=False, cancel_futures=True)
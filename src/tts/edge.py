@@ -1,6 +1,11 @@
 """Local/Cloud TTS provider using Microsoft Edge TTS (free, no API key needed)."""
+from time import perf_counter
+from typing import AsyncIterator
+
 import edge_tts
 
+from src.metrics import metrics
+from src.tts.pcm import MP3Stream
 from src.tts.tts_provider import TTSProvider
 
 
@@ -37,6 +42,7 @@ class EdgeTTS(TTSProvider):
         rate: str = "+0%",  # -50% to +100%
         volume: str = "+0%",  # -50% to +100%
         pitch: str = "+0Hz",  # -50Hz to +50Hz
+        sample_rate: int = 16000,
     ):
         """
         Initialize Edge TTS.
@@ -46,6 +52,7 @@ class EdgeTTS(TTSProvider):
             rate: Speech rate adjustment
             volume: Volume adjustment
             pitch: Pitch adjustment
+            sample_rate: Output sample rate of the decoded PCM
             
         Examples:
             voice="en-US-AriaNeural"  # US English female
@@ -61,10 +68,12 @@ class EdgeTTS(TTSProvider):
         self.rate = rate
         self.volume = volume
         self.pitch = pitch
-        self.sample_rate = 24000  # Edge TTS output is 24kHz
-    
-    async def synthesize(self, text: str) -> bytes:
-        """Synthesize text to MP3 audio bytes."""
+        # Edge TTS sends 24kHz MP3, decoded and resampled as it arrives
+        self.sample_rate = sample_rate
+
+    async def synthesize_stream(self, text: str) -> AsyncIterator[bytes]:
+        """Yield raw PCM16 while Edge is still sending the MP3 stream."""
+        # A Communicate streams once over its own WebSocket, so each sentence needs a new one
         communicate = edge_tts.Communicate(
             text=text,
             voice=self.voice,
@@ -72,22 +81,36 @@ class EdgeTTS(TTSProvider):
             volume=self.volume,
             pitch=self.pitch
         )
-        
-        # Collect all audio chunks
-        audio_data = b""
+        decoder = MP3Stream(self.sample_rate)
+        t0 = perf_counter()
+        first = True
+
         async for chunk in communicate.stream():
-            if chunk["type"] == "audio":
-                audio_data += chunk["data"]
-        
-        return audio_data
+            if chunk["type"] != "audio":
+                continue
+            pcm = decoder.push(chunk["data"])
+            if not pcm:
+                continue
+            if first:
+                metrics.observe("tts_first_audio_ms", (perf_counter() - t0) * 1000, provider="edge")
+                first = False
+            yield pcm
+
+        tail = decoder.flush()
+        if tail:
+            yield tail
+
+    async def synthesize(self, text: str) -> bytes:
+        """Synthesize text to raw PCM16 audio bytes."""
+        return b"".join([pcm async for pcm in self.synthesize_stream(text)])
     
     def get_audio_format(self) -> dict:
         """Get audio format information."""
         return {
-            "format": "mp3",
+            "format": "pcm",
             "sample_rate": self.sample_rate,
             "channels": 1,
-            "codec": "mp3",
+            "bit_depth": 16,
         }
     
     @staticmethod
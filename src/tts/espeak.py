@@ -1,55 +1,120 @@
 import asyncio
-import os
-import tempfile
-import pyttsx3
+import logging
+import shutil
+import struct
+import subprocess
+from time import perf_counter
+from typing import AsyncIterator, Optional
 
+from src.metrics import metrics
 from src.tts.tts_provider import TTSProvider
 
+logger = logging.getLogger("app")
+
+WAV_HEADER_BYTES = 44
+
 
 class EspeakTTS(TTSProvider):
     """
-    Local fast TTS using espeak-ng (via pyttsx3).
-    Optimized for fake streaming.
+    Local fast TTS using espeak-ng.
+
+    Every sentence is spoken by its own espeak-ng process writing WAV to
+    stdout, so nothing touches the disk and the audio is streamed as raw
+    PCM16 while it is produced. `pool_size` processes may run at once.
     """
 
-    def __init__(self, rate: int = 170, voice_hint: str = "english"):
-        self.engine = pyttsx3.init()
-        self.engine.setProperty("rate", rate)
+    def __init__(
+        self,
+        rate: int = 170,
+        voice_hint: str = "english",
+        pool_size: int = 4,
+        executable: Optional[str] = None,
+    ):
+        """
+        Initialize espeak TTS.
+
+        Args:
+            rate: Speaking rate in words per minute
+            voice_hint: Part of the voice name or language to pick
+            pool_size: espeak-ng processes allowed to run at once
+            executable: espeak-ng binary (default: espeak-ng, else espeak, from PATH)
+        """
+        self.executable = executable or shutil.which("espeak-ng") or shutil.which("espeak")
+        if not self.executable:
+            raise RuntimeError("espeak-ng not found on PATH")
+        self.rate = rate
+        self.voice = self._find_voice(voice_hint)
+        self.pool_size = pool_size
+        self._slots = asyncio.Semaphore(pool_size)
+
+        self.sample_rate = 22050  # espeak-ng default
+
+    def _find_voice(self, voice_hint: str) -> Optional[str]:
+        """Pick the voice explicitly, matching the hint against `--voices` names and files."""
+        listing = subprocess.run([self.executable, "--voices"], capture_output=True, text=True).stdout
+        for line in listing.splitlines()[1:]:
+            # Pty Language Age/Gender VoiceName File Other Languages
+            fields = line.split()
+            if len(fields) >= 5 and voice_hint.lower() in (fields[3] + " " + fields[4]).lower():
+                return fields[4]
+        logger.warning(f"⚠️ [EspeakTTS] No voice matching {voice_hint!r}, using the default")
+        return None
+
+    async def synthesize_stream(self, text: str) -> AsyncIterator[bytes]:
+        """Yield raw PCM16 while espeak-ng is still speaking the text."""
+        if not text.strip():
+            return
+
+        args = [self.executable, "--stdout", "-s", str(self.rate)]
+        if self.voice:
+            args += ["-v", self.voice]
 
-        # Pick English voice explicitly
-        for v in self.engine.getProperty("voices"):
-            if voice_hint.lower() in v.name.lower():
-                self.engine.setProperty("voice", v.id)
-                break
+        t0 = perf_counter()
+        async with self._slots:
+            metrics.observe("espeak_pool_wait_ms", (perf_counter() - t0) * 1000)
+            proc = await asyncio.create_subprocess_exec(
+                *args, "--", text,
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.DEVNULL,
+            )
+            finished = False
+            try:
+                try:
+                    header = await proc.stdout.readexactly(WAV_HEADER_BYTES)
+                except asyncio.IncompleteReadError:
+                    finished = True
+                    logger.error(f"❌ [EspeakTTS] No audio for {text!r}")
+                    return
+                self.sample_rate = struct.unpack_from("<I", header, 24)[0]
 
-        self.sample_rate = 22050  # pyttsx3 default
+                first, carry = True, b""
+                while chunk := await proc.stdout.read(4096):
+                    data = carry + chunk
+                    usable = len(data) - len(data) % 2
+                    carry = data[usable:]
+                    if not usable:
+                        continue
+                    if first:
+                        metrics.observe("tts_first_audio_ms", (perf_counter() - t0) * 1000, provider="espeak")
+                        first = False
+                    yield data[:usable]
+                finished = True
+            finally:
+                # Popen.send_signal() polls (and so reaps) the child; only kill a process that is still speaking
+                if not finished and proc.returncode is None:
+                    try:
+                        proc.kill()
+                    except ProcessLookupError:
+                        pass
+                await proc.wait()
 
     async def synthesize(self, text: str) -> bytes:
-        print("🧪 TTS_ENTER:", repr(text))
-        audio = await asyncio.to_thread(self._synthesize_sync, text)
-        print("🧪 TTS_EXIT bytes=", len(audio))
-        return audio
-
-    def _synthesize_sync(self, text: str) -> bytes:
-        with tempfile.NamedTemporaryFile(
-            suffix=".wav",
-            delete=False
-        ) as f:
-            path = f.name
-            
-        try:
-            with open(path, "rb") as f:
-                data = f.read()
-
-            print("🔊 WAV_BYTES:", len(data))
-
-            return data
-        finally:
-            os.remove(path)
+        """Synthesize text to raw PCM16 audio bytes."""
+        return b"".join([chunk async for chunk in self.synthesize_stream(text)])
 
     def get_audio_format(self) -> dict:
         return {
-            "format": "wav",
+            "format": "pcm",
             "sample_rate": self.sample_rate,
             "channels": 1,
             "bit_depth": 16,
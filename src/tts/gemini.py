@@ -1,68 +1,97 @@
-import asyncio
+import logging
+import re
+from time import perf_counter
+from typing import AsyncIterator, Optional
+
 from google import genai
 from google.genai import types
+
+from src.metrics import metrics
+from src.tts.pcm import PCMStream
 from src.tts.tts_provider import TTSProvider
 
+logger = logging.getLogger("app")
+
+# Gemini returns audio/L16 (raw PCM16); the rate is part of the mime type
+GEMINI_PCM_RATE = 24000
+
+
 class GeminiTTS(TTSProvider):
     def __init__(
         self,
         api_key: str,
         voice: str = "Puck",  # Matches your JS: Puck, Charon, Kore, Fenrir, Aoede
         sample_rate: int = 24000, # Recommended for Gemini Audio
+        model: str = "gemini-2.5-flash-preview-tts",
     ):
+        """
+        Initialize Gemini TTS.
+
+        Args:
+            api_key: Google API key
+            voice: Prebuilt voice name
+            sample_rate: Output sample rate (Gemini's 24 kHz PCM is resampled to it)
+            model: Gemini TTS model
+        """
         # Use the new Unified SDK
         self.client = genai.Client(api_key=api_key)
         self.voice = voice
         self.sample_rate = sample_rate
-        # USE THE EXACT MODEL FROM YOUR WORKING JS CODE
-        self.model_id = "gemini-2.5-flash-preview-tts" 
-
-    async def synthesize(self, text: str) -> bytes:
-        loop = asyncio.get_running_loop()
-
-        def _run():
-            # Match the config structure from your JS code
-            config = types.GenerateContentConfig(
-                response_modalities=["AUDIO"],
-                speech_config=types.SpeechConfig(
-                    voice_config=types.VoiceConfig(
-                        prebuilt_voice_config=types.PrebuiltVoiceConfig(
-                            voice_name=self.voice
-                        )
+        self.model_id = model
+        # Match the config structure from your JS code
+        self.config = types.GenerateContentConfig(
+            response_modalities=["AUDIO"],
+            speech_config=types.SpeechConfig(
+                voice_config=types.VoiceConfig(
+                    prebuilt_voice_config=types.PrebuiltVoiceConfig(
+                        voice_name=self.voice
                     )
                 )
             )
+        )
 
-            try:
-                # Standard generate_content call (not streaming)
-                response = self.client.models.generate_content(
-                    model=self.model_id,
-                    contents=text,
-                    config=config
-                )
+    async def synthesize_stream(self, text: str) -> AsyncIterator[bytes]:
+        """Yield raw PCM16 at `sample_rate` as Gemini streams the audio."""
+        pcm: Optional[PCMStream] = None
+        t0 = perf_counter()
 
-                # Extract audio from the response candidates
-                # Matches JS: response.candidates[0].content.parts[0].inlineData.data
-                if response.candidates and response.candidates[0].content.parts:
-                    for part in response.candidates[0].content.parts:
-                        if part.inline_data:
-                            audio_data = part.inline_data.data
-                            print(f"🔊 [GeminiTTS] Success: {len(audio_data)} bytes")
-                            return audio_data
-                
-                print("⚠️ [GeminiTTS] No audio data in response")
-                return b""
+        try:
+            stream = await self.client.aio.models.generate_content_stream(
+                model=self.model_id,
+                contents=text,
+                config=self.config,
+            )
+            async for response in stream:
+                if not response.candidates or not response.candidates[0].content:
+                    continue
+                for part in response.candidates[0].content.parts or []:
+                    if not part.inline_data or not part.inline_data.data:
+                        continue
+                    if pcm is None:
+                        rate = re.search(r"rate=(\d+)", part.inline_data.mime_type or "")
+                        pcm = PCMStream(int(rate.group(1)) if rate else GEMINI_PCM_RATE, self.sample_rate)
+                        metrics.observe("tts_first_audio_ms", (perf_counter() - t0) * 1000, provider="gemini")
+                    audio = pcm.push(part.inline_data.data)
+                    if audio:
+                        yield audio
+        except Exception as e:
+            logger.error(f"❌ [GeminiTTS] API Error: {e}")
+            return
 
-            except Exception as e:
-                print(f"❌ [GeminiTTS] API Error: {e}")
-                return b""
+        if pcm is None:
+            logger.warning("⚠️ [GeminiTTS] No audio data in response")
+            return
+        tail = pcm.flush()
+        if tail:
+            yield tail
 
-        return await loop.run_in_executor(None, _run)
+    async def synthesize(self, text: str) -> bytes:
+        return b"".join([chunk async for chunk in self.synthesize_stream(text)])
 
     def get_audio_format(self) -> dict:
         return {
-            "format": "wav",
+            "format": "pcm",
             "sample_rate": self.sample_rate,
             "channels": 1,
             "encoding": "pcm16",
-        }
\ No newline at end of file
+        }
@@ -0,0 +1,194 @@
+"""Composite TTS provider that hedges a slow preferred provider with a fallback."""
+import asyncio
+import logging
+from contextlib import aclosing
+from time import perf_counter
+from typing import AsyncIterator, Dict
+
+from src.metrics import metrics
+from src.tts.pcm import converter_for
+from src.tts.tts_provider import TTSProvider
+
+logger = logging.getLogger("app")
+
+
+class HedgedTTS(TTSProvider):
+    """
+    Sends each sentence to the preferred provider and, if it has produced no
+    audio after `hedge_after_ms` (or fails), to the fallback as well. The
+    provider whose first audio arrives first speaks the sentence; the other
+    request is cancelled.
+
+    Both providers' output is converted to PCM16 mono at `sample_rate`, so
+    the audio format does not change with the provider that won.
+
+    Example:
+        tts = HedgedTTS(
+            primary=ProviderFactory.create_tts("azure", ...),
+            fallback=ProviderFactory.create_tts("piper", model_path="models/en_US-lessac-medium.onnx"),
+            primary_name="azure",
+            fallback_name="piper",
+        )
+    """
+
+    def __init__(
+        self,
+        primary: TTSProvider,
+        fallback: TTSProvider,
+        hedge_after_ms: float = 400.0,
+        primary_name: str = "primary",
+        fallback_name: str = "fallback",
+        sample_rate: int = 16000,
+    ):
+        """
+        Initialize hedged TTS.
+
+        Args:
+            primary: Preferred provider (e.g. a cloud voice)
+            fallback: Provider raced against it (e.g. local Piper)
+            hedge_after_ms: Start the fallback when the primary has no audio after this long
+            primary_name: Name of the primary in metrics
+            fallback_name: Name of the fallback in metrics
+            sample_rate: Output sample rate of the PCM16 audio
+        """
+        self.primary = primary
+        self.fallback = fallback
+        self.hedge_after = hedge_after_ms / 1000
+        self.primary_name = primary_name
+        self.fallback_name = fallback_name
+        self.sample_rate = sample_rate
+        self.counts: Dict[str, int] = {"requests": 0, "hedged": 0, "fallback": 0}
+        # Losing requests are wound down in the background
+        self._discarding = set()
+
+    async def _pcm(self, tts: TTSProvider, text: str) -> AsyncIterator[bytes]:
+        """The provider's audio converted to the common output format."""
+        converter = None
+        async with aclosing(tts.synthesize_stream(text)) as pieces:
+            async for audio in pieces:
+                if converter is None:
+                    converter = converter_for(tts.get_audio_format(), self.sample_rate)
+                audio = converter.push(audio)
+                if audio:
+                    yield audio
+        if converter is not None:
+            tail = converter.flush()
+            if tail:
+                yield tail
+
+    async def _discard(self, tasks, streams):
+        """Cancel losing requests and close their streams."""
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        for stream in streams:
+            try:
+                await stream.aclose()
+            except Exception:
+                logger.exception("Error closing hedged TTS request")
+
+    def _record(self, winner: str, hedged: bool):
+        self.counts["requests"] += 1
+        self.counts["hedged"] += hedged
+        self.counts["fallback"] += winner == self.fallback_name
+        metrics.set("tts_hedge_rate", self.counts["hedged"] / self.counts["requests"], provider=self.primary_name)
+        metrics.set("tts_fallback_rate", self.counts["fallback"] / self.counts["requests"], provider=self.primary_name)
+
+    async def synthesize_stream(self, text: str) -> AsyncIterator[bytes]:
+        """Yield PCM16 from whichever provider produces audio first."""
+        if not text.strip():
+            return
+
+        streams: Dict[str, AsyncIterator[bytes]] = {}
+        pending: Dict[asyncio.Future, str] = {}
+
+        def start(name: str, tts: TTSProvider):
+            streams[name] = self._pcm(tts, text)
+            pending[asyncio.ensure_future(streams[name].__anext__())] = name
+
+        t0 = perf_counter()
+        start(self.primary_name, self.primary)
+        winner, first, error, hedged = None, b"", None, False
+
+        try:
+            timeout = self.hedge_after
+            while pending and winner is None:
+                done, _ = await asyncio.wait(pending, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+                timeout = None
+                if not done:
+                    # No audio from the primary in time: race the fallback
+                    hedged = True
+                    metrics.incr("tts_hedges", provider=self.primary_name)
+                    start(self.fallback_name, self.fallback)
+                    continue
+
+                for task in done:
+                    name = pending.pop(task)
+                    try:
+                        first = task.result()
+                    except StopAsyncIteration:
+                        error = RuntimeError(f"{name} TTS returned no audio")
+                    except Exception as e:
+                        error = e
+                    else:
+                        winner = name
+                        break
+                    logger.warning(f"⚠️ [HedgedTTS] {name} failed: {error}")
+
+                if winner is None and self.fallback_name not in streams:
+                    # The primary failed before the hedge deadline
+                    metrics.incr("tts_fallbacks", provider=self.primary_name)
+                    start(self.fallback_name, self.fallback)
+
+            if winner is None:
+                raise error
+
+            self._record(winner, hedged)
+            metrics.incr("tts_hedge_wins", provider=winner)
+            metrics.observe("tts_first_audio_ms", (perf_counter() - t0) * 1000, provider=f"hedged:{winner}")
+
+            losers = [stream for name, stream in streams.items() if name != winner]
+            if pending or losers:
+                job = asyncio.ensure_future(self._discard(list(pending), losers))
+                self._discarding.add(job)
+                job.add_done_callback(self._discarding.discard)
+                pending.clear()
+                streams = {winner: streams[winner]}
+
+            yield first
+            async for audio in streams[winner]:
+                yield audio
+
+        finally:
+            if pending:
+                # Interrupted while racing
+                job = asyncio.ensure_future(self._discard(list(pending), list(streams.values())))
+                self._discarding.add(job)
+                job.add_done_callback(self._discarding.discard)
+            elif winner is not None:
+                await streams[winner].aclose()
+
+    async def synthesize(self, text: str) -> bytes:
+        """Synthesize text to raw PCM16 audio bytes."""
+        return b"".join([audio async for audio in self.synthesize_stream(text)])
+
+    def prepare(self):
+        self.primary.prepare()
+        self.fallback.prepare()
+
+    def get_audio_format(self) -> dict:
+        return {
+            "format": "pcm",
+            "sample_rate": self.sample_rate,
+            "channels": 1,
+            "bit_depth": 16,
+        }
+
+    def stats(self) -> dict:
+        """Share of sentences that were hedged and that the fallback spoke."""
+        requests = self.counts["requests"] or 1
+        return {
+            "requests": self.counts["requests"],
+            "hedge_rate": self.counts["hedged"] / requests,
+            "fallback_rate": self.counts["fallback"] / requests,
+        }
@@ -1,8 +1,19 @@
 """OpenAI Text-to-Speech provider."""
+import logging
+from time import perf_counter
+from typing import AsyncIterator, Optional
+
 from openai import AsyncOpenAI
 
+from src.metrics import metrics
+from src.tts.pcm import PCMStream
 from src.tts.tts_provider import TTSProvider
 
+logger = logging.getLogger("app")
+
+# response_format="pcm" is always 24 kHz, 16-bit signed little-endian, mono
+OPENAI_PCM_RATE = 24000
+
 
 class OpenAITTS(TTSProvider):
     """TTS provider using OpenAI voices (low latency, high quality)."""
@@ -13,32 +24,65 @@ class OpenAITTS(TTSProvider):
         model: str = "gpt-4o-mini-tts",
         voice: str = "alloy",
         sample_rate: int = 16000,
+        instructions: Optional[str] = None,
+        chunk_bytes: int = 4800,
     ):
+        """
+        Initialize OpenAI TTS.
+
+        Args:
+            api_key: OpenAI API key
+            model: Speech model (gpt-4o-mini-tts, tts-1, tts-1-hd)
+            voice: Voice name
+            sample_rate: Output sample rate (OpenAI's 24 kHz PCM is resampled to it)
+            instructions: Speaking style instructions (gpt-4o-mini-tts only)
+            chunk_bytes: Read size of the streamed response
+        """
         self.client = AsyncOpenAI(api_key=api_key)
         self.model = model
         self.voice = voice
         self.sample_rate = sample_rate
+        self.instructions = instructions
+        self.chunk_bytes = chunk_bytes
+
+    async def synthesize_stream(self, text: str) -> AsyncIterator[bytes]:
+        """Yield raw PCM16 at `sample_rate` while OpenAI is still sending the response."""
+        extra = {"instructions": self.instructions} if self.instructions else {}
+        pcm = PCMStream(OPENAI_PCM_RATE, self.sample_rate)
+        t0 = perf_counter()
+        first = True
+
+        async with self.client.audio.speech.with_streaming_response.create(
+            model=self.model,
+            voice=self.voice,
+            input=text,
+            response_format="pcm",
+            **extra,
+        ) as response:
+            async for chunk in response.iter_bytes(self.chunk_bytes):
+                audio = pcm.push(chunk)
+                if not audio:
+                    continue
+                if first:
+                    metrics.observe("tts_first_audio_ms", (perf_counter() - t0) * 1000, provider="openai")
+                    first = False
+                yield audio
+
+        tail = pcm.flush()
+        if tail:
+            yield tail
 
     async def synthesize(self, text: str) -> bytes:
         """
-        Synthesize text to WAV audio bytes.
+        Synthesize text to raw PCM16 audio bytes.
         """
-        # Call the async create method directly
-        response = await self.client.audio.speech.create(
-            model="gpt-4o-mini-tts",
-            voice="coral",
-            input=text,
-            response_format="wav",  # Specify WAV format
-        )
-    
-        audio_bytes = response.content
-        
-        print("🔊 WAV_BYTES:", len(audio_bytes))
+        audio_bytes = b"".join([chunk async for chunk in self.synthesize_stream(text)])
+        logger.debug(f"🔊 [OpenAITTS] PCM bytes: {len(audio_bytes)}")
         return audio_bytes
 
     def get_audio_format(self) -> dict:
         return {
-            "format": "wav",
+            "format": "pcm",
             "sample_rate": self.sample_rate,
             "channels": 1,
             "bit_depth": 16,
@@ -0,0 +1,200 @@
+"""
+Incremental conversion of streamed TTS audio to PCM16.
+
+Every provider describes its output with get_audio_format(); `converter_for`
+picks the matching converter, which turns arbitrarily split chunks of that
+format into mono PCM16 at one output rate (resampled with soxr).
+"""
+import struct
+from typing import Optional, Union
+
+import numpy as np
+import soxr
+
+Chunk = Union[bytes, memoryview]
+
+
+class PCMStream:
+    """
+    Turns arbitrarily split PCM16 byte chunks into whole-sample chunks,
+    resampled from `src_rate` to `dst_rate` with a streaming soxr resampler
+    (no resampling when the rates match) and downmixed to mono.
+    """
+
+    def __init__(self, src_rate: int, dst_rate: int, channels: int = 1):
+        """
+        Initialize PCM stream.
+
+        Args:
+            src_rate: Sample rate of the incoming PCM16
+            dst_rate: Sample rate to produce
+            channels: Interleaved channels of the incoming PCM16
+        """
+        self.src_rate = src_rate
+        self.dst_rate = dst_rate
+        self.channels = channels
+        self._frame = 2 * channels
+        self._carry = b""
+        self._resampler = soxr.ResampleStream(src_rate, dst_rate, 1, dtype="int16") if src_rate != dst_rate else None
+
+    def push(self, data: Chunk) -> bytes:
+        """Add a chunk; returns the audio that is ready (possibly empty)."""
+        if self._carry:
+            data = self._carry + bytes(data)
+        usable = len(data) - len(data) % self._frame
+        self._carry = bytes(data[usable:])
+        if not usable:
+            return b""
+        if self._resampler is None and self.channels == 1:
+            # Pass-through: no copy unless the chunk was split mid-sample
+            return data if usable == len(data) and isinstance(data, bytes) else bytes(data[:usable])
+
+        samples = np.frombuffer(data, dtype=np.int16, count=usable // 2)
+        if self.channels > 1:
+            samples = samples.reshape(-1, self.channels).mean(axis=1).astype(np.int16)
+        if self._resampler is not None:
+            samples = self._resampler.resample_chunk(samples)
+        return samples.tobytes()
+
+    def flush(self) -> bytes:
+        """Audio still held by the resampler at the end of the stream."""
+        self._carry = b""
+        if self._resampler is None:
+            return b""
+        return self._resampler.resample_chunk(np.zeros(0, dtype=np.int16), last=True).tobytes()
+
+
+def _parse_wav_header(head: bytes):
+    """(sample_rate, channels, data offset) once the header is complete, else None."""
+    if len(head) < 12:
+        return None
+    if head[:4] != b"RIFF" or head[8:12] != b"WAVE":
+        raise ValueError("TTS audio is not a RIFF/WAVE stream")
+
+    fmt, pos = None, 12
+    while pos + 8 <= len(head):
+        chunk_id, size = head[pos:pos + 4], struct.unpack_from("<I", head, pos + 4)[0]
+        if chunk_id == b"data":
+            if fmt is None:
+                raise ValueError("WAV data chunk before fmt chunk")
+            return fmt[0], fmt[1], pos + 8
+        if chunk_id == b"fmt ":
+            if pos + 24 > len(head):
+                return None
+            tag, channels, rate = struct.unpack_from("<HHI", head, pos + 8)
+            bits = struct.unpack_from("<H", head, pos + 22)[0]
+            # 0xFFFE is WAVE_FORMAT_EXTENSIBLE, used for PCM as well
+            if tag not in (1, 0xFFFE) or bits != 16:
+                raise ValueError(f"Unsupported WAV encoding (format tag {tag}, {bits} bits)")
+            fmt = (rate, channels)
+        # Chunks are word aligned
+        pos += 8 + size + (size & 1)
+    return None
+
+
+class WAVStream:
+    """Strips the header of a streamed WAV and converts its data chunk like PCMStream."""
+
+    def __init__(self, dst_rate: int):
+        """
+        Initialize WAV stream.
+
+        Args:
+            dst_rate: Sample rate to produce (the source rate is read from the header)
+        """
+        self.dst_rate = dst_rate
+        self._head = b""
+        self._pcm: Optional[PCMStream] = None
+
+    def push(self, data: Chunk) -> bytes:
+        """Add a chunk; returns the audio that is ready (possibly empty)."""
+        if self._pcm is not None:
+            return self._pcm.push(data)
+
+        self._head += bytes(data)
+        parsed = _parse_wav_header(self._head)
+        if parsed is None:
+            return b""
+        rate, channels, offset = parsed
+        self._pcm = PCMStream(rate, self.dst_rate, channels)
+        head, self._head = self._head, b""
+        # Everything after the header is sample data; hand it on without copying
+        return self._pcm.push(memoryview(head)[offset:])
+
+    def flush(self) -> bytes:
+        """Audio still held at the end of the stream."""
+        return self._pcm.flush() if self._pcm is not None else b""
+
+
+class MP3Stream:
+    """Incremental MP3 decoder (PyAV) feeding a PCMStream."""
+
+    def __init__(self, dst_rate: int):
+        """
+        Initialize MP3 stream.
+
+        Args:
+            dst_rate: Sample rate to produce (the source rate comes from the frames)
+        """
+        # Imported here: only MP3 providers need FFmpeg
+        import av
+
+        self._av = av
+        self.dst_rate = dst_rate
+        self._codec = av.CodecContext.create("mp3", "r")
+        # Convert to interleaved PCM16 mono at the source rate; soxr does the resampling
+        self._resampler = av.AudioResampler(format="s16", layout="mono")
+        self._pcm: Optional[PCMStream] = None
+
+    def _decode(self, packet):
+        try:
+            return self._codec.decode(packet)
+        except self._av.error.InvalidDataError:
+            # Skip what is not an audio frame (e.g. a tag)
+            return []
+
+    def _frames(self, frames) -> bytes:
+        out = []
+        for frame in frames:
+            for pcm in self._resampler.resample(frame):
+                if self._pcm is None:
+                    self._pcm = PCMStream(pcm.sample_rate, self.dst_rate)
+                out.append(self._pcm.push(pcm.to_ndarray().tobytes()))
+        return b"".join(out)
+
+    def push(self, data: Chunk) -> bytes:
+        """Add MP3 bytes; returns the PCM decoded so far (possibly empty)."""
+        return b"".join(self._frames(self._decode(packet)) for packet in self._codec.parse(bytes(data)))
+
+    def flush(self) -> bytes:
+        """PCM still held by the parser, decoder and resamplers."""
+        out = [self._frames(self._decode(packet)) for packet in self._codec.parse(None)]
+        out.append(self._frames(self._decode(None)))
+        out.append(self._frames([None]))
+        if self._pcm is not None:
+            out.append(self._pcm.flush())
+        return b"".join(out)
+
+
+def converter_for(audio_format: dict, sample_rate: int):
+    """
+    Streaming converter from a provider's output to mono PCM16 at `sample_rate`.
+
+    Args:
+        audio_format: The provider's get_audio_format()
+        sample_rate: Output sample rate
+    """
+    fmt = audio_format.get("format", "pcm")
+    if fmt == "pcm":
+        return PCMStream(audio_format["sample_rate"], sample_rate, audio_format.get("channels", 1))
+    if fmt == "wav":
+        return WAVStream(sample_rate)
+    if fmt == "mp3":
+        return MP3Stream(sample_rate)
+    raise ValueError(f"Unsupported TTS audio format: {fmt}")
+
+
+def to_pcm16(audio: bytes, audio_format: dict, sample_rate: int) -> bytes:
+    """Convert a complete clip in the provider's format to mono PCM16 at `sample_rate`."""
+    stream = converter_for(audio_format, sample_rate)
+    return stream.push(audio) + stream.flush()
@@ -1,180 +1,167 @@
-"""Local TTS provider using Piper with streaming."""
+"""Local TTS provider using Piper voices in-process (ONNX Runtime) with streaming."""
 import asyncio
+import dataclasses
+import logging
+import os
 import re
-import wave
-import io
-import struct
-from typing import Optional
-import subprocess
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from time import perf_counter
+from typing import AsyncIterator, Optional
+
+import onnxruntime
+from piper import PiperVoice, SynthesisConfig
+
+from src.forking import reopen_after_fork
+from src.metrics import metrics
 from src.tts.tts_provider import TTSProvider
 
+logger = logging.getLogger("app")
+
+
 class PiperTTS(TTSProvider):
-    """Local TTS using Piper (CPU-based) with streaming."""
-    
+    """
+    Local TTS using Piper (CPU-based) with per-sentence streaming.
+
+    The voice is loaded once and backed by a pool of ONNX Runtime sessions,
+    so several sessions can synthesize at the same time. Piper splits the
+    text into sentences and yields one audio chunk per sentence; each is
+    handed to the caller as raw PCM16 as soon as it is ready, and the end of
+    the generator marks the end of the utterance.
+    """
+
     def __init__(
         self,
         model_path: str,
         config_path: Optional[str] = None,
         speaker_id: Optional[int] = None,
+        pool_size: Optional[int] = None,
+        threads_per_session: Optional[int] = None,
+        use_cuda: bool = False,
+        length_scale: Optional[float] = None,
     ):
         """
         Initialize Piper TTS.
-        
+
         Args:
             model_path: Path to .onnx model file
             config_path: Path to .json config file (optional, auto-derived from model_path)
             speaker_id: Speaker ID for multi-speaker models
+            pool_size: Concurrent synthesis sessions (default: half the cores)
+            threads_per_session: ONNX Runtime intra-op threads per session (default: cores / pool_size)
+            use_cuda: Run on the CUDA execution provider
+            length_scale: Speaking rate override (< 1 is faster)
         """
         print(f"Loading Piper voice model: {model_path}")
-        self.model_path = model_path
-        self.config_path = config_path
-        self.speaker_id = speaker_id
-        self.sample_rate = 22050
-        self._process = None
-        self._lock = asyncio.Lock()
-        
-    async def _ensure_process(self):
-        """Ensure Piper process is running."""
-        if self._process is None or self._process.returncode is not None:
-            cmd = [
-                "piper",
-                "--model", self.model_path,
-                "--output-raw",  # Output raw PCM to stdout
-            ]
-            
-            if self.config_path:
-                cmd.extend(["--config", self.config_path])
-            
-            if self.speaker_id is not None:
-                cmd.extend(["--speaker", str(self.speaker_id)])
-            
-            self._process = await asyncio.create_subprocess_exec(
-                *cmd,
-                stdin=subprocess.PIPE,
-                stdout=subprocess.PIPE,
-                stderr=subprocess.PIPE,
-            )
+        cores = os.cpu_count() or 1
+        self.pool_size = pool_size or max(1, cores // 2)
+        threads = threads_per_session or max(1, cores // self.pool_size)
+
+        voice = PiperVoice.load(model_path, config_path=config_path, use_cuda=use_cuda)
+        self.model_path = str(model_path)
+        self.threads = threads
+        self.providers = ["CUDAExecutionProvider", "CPUExecutionProvider"] if use_cuda else ["CPUExecutionProvider"]
+
+        # The session PiperVoice.load() opened is slot 0 (with ORT's default threading)
+        self._voices: asyncio.Queue = asyncio.Queue()
+        self._voices.put_nowait(voice)
+        for _ in range(self.pool_size - 1):
+            self._voices.put_nowait(dataclasses.replace(voice, session=self._new_session()))
+        # Workers forked by serve.py need sessions with their own ORT thread pools
+        reopen_after_fork(self._reopen_sessions)
+
+        self.sample_rate = voice.config.sample_rate
+        self.syn_config = SynthesisConfig(speaker_id=speaker_id, length_scale=length_scale)
+        self._executor = ThreadPoolExecutor(max_workers=self.pool_size, thread_name_prefix="piper")
+        logger.info(f"✅ Piper voice ready: {self.pool_size} sessions x {threads} threads @ {self.sample_rate} Hz")
+
+    def _new_session(self) -> onnxruntime.InferenceSession:
+        options = onnxruntime.SessionOptions()
+        options.intra_op_num_threads = self.threads
+        options.inter_op_num_threads = 1
+        return onnxruntime.InferenceSession(self.model_path, sess_options=options, providers=self.providers)
+
+    def _reopen_sessions(self):
+        """Replace the session of every pooled voice (all are idle before serve.py forks)."""
+        voices = []
+        while not self._voices.empty():
+            voices.append(self._voices.get_nowait())
+        for voice in voices:
+            self._voices.put_nowait(dataclasses.replace(voice, session=self._new_session()))
+
     def _normalize_text(self, text: str) -> str:
-            """Normalize text for faster TTS."""
-            # Expand abbreviations
-            text = re.sub(r'\bProf\.\s*', 'Professor ', text)
-            text = re.sub(r'\bDr\.\s*', 'Doctor ', text)
-            text = re.sub(r'\bMrs\.\s*', 'Misses ', text)
-            text = re.sub(r'\bMr\.\s*', 'Mister ', text)
-            
-            # Break up complex names (helps Piper chunk better)
-            text = re.sub(r'([A-Z][a-z]+)\s+([A-Z]\.)\s+([A-Z][a-z]+)', 
-                        r'\1, \2 \3', text)
-            return text
-    async def synthesize(self, text: str) -> bytes:
-        """Synthesize text to WAV audio bytes."""
+        """Normalize text for faster TTS."""
+        # Expand abbreviations
+        text = re.sub(r'\bProf\.\s*', 'Professor ', text)
+        text = re.sub(r'\bDr\.\s*', 'Doctor ', text)
+        text = re.sub(r'\bMrs\.\s*', 'Misses ', text)
+        text = re.sub(r'\bMr\.\s*', 'Mister ', text)
+
+        # Break up complex names (helps Piper chunk better)
+        text = re.sub(r'([A-Z][a-z]+)\s+([A-Z]\.)\s+([A-Z][a-z]+)',
+                    r'\1, \2 \3', text)
+        return text
+
+    async def synthesize_stream(self, text: str) -> AsyncIterator[bytes]:
+        """Yield raw PCM16 for each sentence as soon as Piper finishes it."""
         if not text.strip():
-            return self._create_empty_wav()
-        
-        # Normalize before synthesis
+            return
+
         normalized = self._normalize_text(text)
-        
-        async with self._lock:
-            await self._ensure_process()
-            
-            # Send text to Piper
-            self._process.stdin.write(normalized.encode("utf-8") + b"\n")
-            await self._process.stdin.drain()
-            
-            # Read raw PCM output
-            pcm_data = await self._read_pcm_output()
-            
-            if len(pcm_data) == 0:
-                raise RuntimeError("Piper produced no audio data")
-            
-            # Convert PCM to WAV
-            wav_bytes = self._pcm_to_wav(pcm_data)
-            
-            if len(wav_bytes) <= 44:
-                raise RuntimeError("Piper produced header-only WAV")
-            
-            return wav_bytes
-    
-    async def _read_pcm_output(self) -> bytes:
-        """Read PCM output from Piper process."""
-        # Read until we get a size marker or timeout
-        # Piper outputs raw PCM, you may need to adjust based on your version
-        chunks = []
-        
-        # Read in chunks with timeout
-        try:
-            while True:
-                chunk = await asyncio.wait_for(
-                    self._process.stdout.read(8192),
-                    timeout=5.0
-                )
-                if not chunk:
-                    break
-                chunks.append(chunk)
-                
-                # Check if we have enough data (simple heuristic)
-                # Adjust based on typical sentence length
-                if len(b"".join(chunks)) > 16384:  # ~0.37s at 22050Hz
-                    # Check if more data is immediately available
-                    try:
-                        extra = await asyncio.wait_for(
-                            self._process.stdout.read(8192),
-                            timeout=0.1
-                        )
-                        if extra:
-                            chunks.append(extra)
-                        else:
-                            break
-                    except asyncio.TimeoutError:
+        loop = asyncio.get_running_loop()
+
+        t0 = perf_counter()
+        voice = await self._voices.get()
+        metrics.observe("piper_pool_wait_ms", (perf_counter() - t0) * 1000)
+
+        pieces: asyncio.Queue = asyncio.Queue()
+        cancelled = threading.Event()
+
+        def run():
+            try:
+                for chunk in voice.synthesize(normalized, syn_config=self.syn_config):
+                    if cancelled.is_set():
                         break
-        except asyncio.TimeoutError:
-            pass
-        
-        return b"".join(chunks)
-    
-    def _pcm_to_wav(self, pcm_data: bytes) -> bytes:
-        """Convert raw PCM to WAV format."""
-        wav_buffer = io.BytesIO()
-        
-        with wave.open(wav_buffer, 'wb') as wav_file:
-            wav_file.setnchannels(1)
-            wav_file.setsampwidth(2)  # 16-bit
-            wav_file.setframerate(self.sample_rate)
-            wav_file.writeframes(pcm_data)
-        
-        return wav_buffer.getvalue()
-    
-    def _create_empty_wav(self) -> bytes:
-        """Create empty WAV file."""
-        wav_buffer = io.BytesIO()
-        with wave.open(wav_buffer, 'wb') as wav_file:
-            wav_file.setnchannels(1)
-            wav_file.setsampwidth(2)
-            wav_file.setframerate(self.sample_rate)
-            wav_file.writeframes(b"")
-        return wav_buffer.getvalue()
-    
+                    loop.call_soon_threadsafe(pieces.put_nowait, chunk.audio_int16_bytes)
+            except Exception as e:
+                loop.call_soon_threadsafe(pieces.put_nowait, e)
+            finally:
+                loop.call_soon_threadsafe(pieces.put_nowait, None)
+
+        future = loop.run_in_executor(self._executor, run)
+        first = True
+        try:
+            while (piece := await pieces.get()) is not None:
+                if isinstance(piece, Exception):
+                    raise piece
+                if first:
+                    metrics.observe("tts_first_audio_ms", (perf_counter() - t0) * 1000, provider="piper")
+                    first = False
+                yield piece
+        finally:
+            # Stops after the current sentence; the session goes back once its thread is done
+            cancelled.set()
+            future.add_done_callback(lambda _: self._voices.put_nowait(voice))
+
+    async def synthesize(self, text: str) -> bytes:
+        """Synthesize text to raw PCM16 audio bytes."""
+        return b"".join([piece async for piece in self.synthesize_stream(text)])
+
     def get_audio_format(self) -> dict:
         """Get audio format information."""
         return {
-            "format": "wav",
+            "format": "pcm",
             "sample_rate": self.sample_rate,
             "channels": 1,
             "bit_depth": 16,
         }
-    
+
     async def close(self):
         """Clean up resources."""
-        if self._process:
-            self._process.stdin.close()
-            try:
-                await asyncio.wait_for(self._process.wait(), timeout=2.0)
-            except asyncio.TimeoutError:
-                self._process.kill()
-                await self._process.wait()
-    
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
     async def __aenter__(self):
         return self
-    
+
     async def __aexit__(self, exc_type, exc_val, exc_tb):
-        await self.close()
\ No newline at end of file
+        await self.close()
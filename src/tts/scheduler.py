@@ -0,0 +1,255 @@
+"""
+Shared TTS scheduler: priority queues, concurrency limits and rate limits per provider.
+
+All sessions' sentence requests for a provider wait in one priority queue
+(a "lane"). The first sentence of an utterance goes first, because the
+caller is hearing silence until it arrives; later sentences follow in the
+order of their playback deadline, i.e. when the audio already sent for
+their utterance runs out. Each lane admits at most `concurrency` requests
+at a time and, optionally, draws one token per request from a token bucket
+so that a rate-limited service (Azure, OpenAI, ...) is never asked faster
+than it allows.
+
+The pipeline declares what a request is with `tts_priority()`; providers
+wrapped with `TTSScheduler.wrap()` pick that up, so the priority reaches
+every provider a call passes through without changing their interface.
+"""
+import asyncio
+import heapq
+import itertools
+import math
+from contextlib import aclosing, asynccontextmanager, contextmanager
+from contextvars import ContextVar
+from time import monotonic, perf_counter
+from typing import AsyncIterator, Dict, Optional, Tuple
+
+from src.metrics import metrics
+from src.tts.tts_provider import TTSProvider
+
+# Priority classes, most urgent first
+FIRST = "first"            # first sentence of an utterance
+NEXT = "next"              # later sentences, ordered by playback deadline
+BACKGROUND = "background"  # nobody is waiting (e.g. pre-rendering filler clips)
+_RANK = {FIRST: 0, NEXT: 1, BACKGROUND: 2}
+
+# (priority, deadline as time.monotonic()) of the TTS request made from this context
+_request: ContextVar[Tuple[str, float]] = ContextVar("tts_request", default=(NEXT, math.inf))
+
+
+@contextmanager
+def tts_priority(priority: str, deadline: Optional[float] = None):
+    """
+    Declare the priority of the TTS requests made inside the block.
+
+    Args:
+        priority: FIRST, NEXT or BACKGROUND
+        deadline: time.monotonic() by which the audio is needed (None: no deadline)
+    """
+    if priority not in _RANK:
+        raise ValueError(f"Unknown TTS priority: {priority}")
+    token = _request.set((priority, math.inf if deadline is None else deadline))
+    try:
+        yield
+    finally:
+        _request.reset(token)
+
+
+class _Lane:
+    """Priority queue, concurrency limit and token bucket of one provider."""
+
+    def __init__(
+        self,
+        name: str,
+        concurrency: Optional[int] = None,
+        rate_per_sec: Optional[float] = None,
+        burst: Optional[float] = None,
+    ):
+        self.name = name
+        self.concurrency = concurrency
+        self.rate = rate_per_sec
+        self.burst = burst or max(1.0, rate_per_sec or 1.0)
+        self.tokens = self.burst
+        self.updated = monotonic()
+        self.active = 0
+        self.waiting = []  # heap of (rank, deadline, order, future)
+        self._order = itertools.count()
+        self._timer: Optional[asyncio.TimerHandle] = None
+
+    def _take_token(self) -> bool:
+        if not self.rate:
+            return True
+        now = monotonic()
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        if self.tokens < 1:
+            return False
+        self.tokens -= 1
+        return True
+
+    def _dispatch(self):
+        """Admit waiting requests, most urgent first, while the limits allow."""
+        while self.waiting and (self.concurrency is None or self.active < self.concurrency):
+            future = self.waiting[0][3]
+            if future.done():
+                # Cancelled while waiting
+                heapq.heappop(self.waiting)
+                continue
+            if not self._take_token():
+                if self._timer is None:
+                    delay = (1 - self.tokens) / self.rate
+                    self._timer = asyncio.get_running_loop().call_later(delay, self._on_refill)
+                break
+            heapq.heappop(self.waiting)
+            self.active += 1
+            future.set_result(None)
+        metrics.set("tts_queue_depth", len(self.waiting), provider=self.name)
+
+    def _on_refill(self):
+        self._timer = None
+        self._dispatch()
+
+    async def acquire(self, priority: str, deadline: float):
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self.waiting, (_RANK[priority], deadline, next(self._order), future))
+        self._dispatch()
+        try:
+            await future
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                # Admitted just as the caller gave up
+                self.release()
+            raise
+
+    def release(self):
+        self.active -= 1
+        self._dispatch()
+
+
+class TTSScheduler:
+    """
+    One scheduler shared by all sessions, with a lane per provider.
+
+    Example:
+        scheduler = TTSScheduler({"azure": {"concurrency": 4, "rate_per_sec": 20}})
+        tts = scheduler.wrap(ProviderFactory.create_tts("azure", ...), "azure")
+    """
+
+    def __init__(self, limits: Optional[Dict[str, dict]] = None, default_concurrency: Optional[int] = None):
+        """
+        Initialize TTS scheduler.
+
+        Args:
+            limits: {provider: {"concurrency": int, "rate_per_sec": float, "burst": float}};
+                every key is optional
+            default_concurrency: Concurrency of providers not listed in limits (None: unlimited)
+        """
+        self.limits = limits or {}
+        self.default_concurrency = default_concurrency
+        self._lanes: Dict[str, _Lane] = {}
+
+    def _lane(self, name: str) -> _Lane:
+        if name not in self._lanes:
+            limits = {"concurrency": self.default_concurrency, **self.limits.get(name, {})}
+            self._lanes[name] = _Lane(name, **limits)
+        return self._lanes[name]
+
+    async def acquire(self, name: str):
+        """Wait for a turn at provider `name` with the priority of the current context."""
+        priority, deadline = _request.get()
+        t0 = perf_counter()
+        await self._lane(name).acquire(priority, deadline)
+        metrics.observe("tts_queue_wait_ms", (perf_counter() - t0) * 1000, provider=name, priority=priority)
+
+    def release(self, name: str):
+        """End a turn taken with acquire()."""
+        self._lane(name).release()
+
+    @asynccontextmanager
+    async def slot(self, name: str):
+        """acquire() / release() around a block."""
+        await self.acquire(name)
+        try:
+            yield
+        finally:
+            self.release(name)
+
+    def wrap(self, tts: TTSProvider, name: str) -> "ScheduledTTS":
+        """Route a provider's requests through lane `name`."""
+        return ScheduledTTS(tts, self, name)
+
+    def stats(self) -> dict:
+        """Queue length and requests in flight per provider."""
+        return {
+            name: {"waiting": len(lane.waiting), "active": lane.active}
+            for name, lane in self._lanes.items()
+        }
+
+
+class ScheduledTTS(TTSProvider):
+    """A TTS provider whose requests wait for their turn in a TTSScheduler lane."""
+
+    def __init__(self, tts: TTSProvider, scheduler: TTSScheduler, name: str):
+        """
+        Initialize scheduled TTS.
+
+        Args:
+            tts: Provider to schedule
+            scheduler: Shared scheduler
+            name: Lane (normally the provider name) whose limits apply
+        """
+        self.tts = tts
+        self.scheduler = scheduler
+        self.name = name
+        self.accepts_text_stream = tts.accepts_text_stream
+
+    async def synthesize(self, text: str) -> bytes:
+        async with self.scheduler.slot(self.name):
+            return await self.tts.synthesize(text)
+
+    async def synthesize_stream(self, text: str) -> AsyncIterator[bytes]:
+        # The slot is held until the provider has produced the whole sentence
+        async with self.scheduler.slot(self.name):
+            async with aclosing(self.tts.synthesize_stream(text)) as pieces:
+                async for piece in pieces:
+                    yield piece
+
+    async def synthesize_text_stream(self, text_stream: AsyncIterator[str]) -> AsyncIterator[bytes]:
+        """
+        Speak a whole turn of streamed text.
+
+        The turn holds a slot only from its first text to its first audio,
+        which is what the caller is waiting for. After that the provider
+        streams on outside the lane, so a long LLM turn (and the gaps between
+        its tokens) never keeps other callers' first sentences waiting. The
+        concurrency and rate limits therefore count a turn as one request.
+        """
+        state = "waiting"  # -> "held" at the first text -> "done" at the first audio
+
+        async def text():
+            nonlocal state
+            async for piece in text_stream:
+                if state == "waiting":
+                    await self.scheduler.acquire(self.name)
+                    state = "held"
+                yield piece
+
+        try:
+            async with aclosing(self.tts.synthesize_text_stream(text())) as pieces:
+                async for piece in pieces:
+                    if state == "held":
+                        self.scheduler.release(self.name)
+                    state = "done"
+                    yield piece
+        finally:
+            if state == "held":
+                self.scheduler.release(self.name)
+
+    def prepare(self):
+        self.tts.prepare()
+
+    def get_audio_format(self) -> dict:
+        return self.tts.get_audio_format()
+
+    def __getattr__(self, name):
+        # Provider-specific attributes and methods (close(), voice, ...)
+        return getattr(self.tts, name)
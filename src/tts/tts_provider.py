@@ -1,8 +1,18 @@
+import re
 from abc import ABC, abstractmethod
+from contextlib import aclosing
+from typing import AsyncIterator
+
+# Sentence end (including the Devanagari danda) followed by whitespace
+_SENTENCE_END = re.compile(r"(?<=[.!?।])\s+")
 
 
 class TTSProvider(ABC):
     """Base class for Text-to-Speech providers."""
+
+    # True when synthesize_text_stream() speaks text while it is still being generated,
+    # without waiting for sentence ends
+    accepts_text_stream = False
     
     @abstractmethod
     async def synthesize(self, text: str) -> bytes:
@@ -16,6 +26,56 @@ class TTSProvider(ABC):
             Audio bytes (format depends on provider)
         """
         pass
+
+    async def synthesize_stream(self, text: str) -> AsyncIterator[bytes]:
+        """
+        Synthesize text to audio, yielding pieces as soon as they are ready.
+
+        Providers that can stream override this; by default the whole
+        synthesize() result is yielded at once.
+
+        Args:
+            text: Text to convert to speech
+
+        Yields:
+            Audio bytes in the format of get_audio_format()
+        """
+        yield await self.synthesize(text)
+
+    async def synthesize_text_stream(self, text_stream: AsyncIterator[str]) -> AsyncIterator[bytes]:
+        """
+        Synthesize text that arrives incrementally (e.g. LLM tokens).
+
+        By default the text is cut into sentences and each complete sentence
+        goes through synthesize_stream(). Providers that take streamed text
+        natively override this and set `accepts_text_stream`.
+
+        Args:
+            text_stream: Text pieces, in order
+
+        Yields:
+            Audio bytes in the format of get_audio_format()
+        """
+        buffer = ""
+        async for piece in text_stream:
+            buffer += piece
+            *sentences, buffer = _SENTENCE_END.split(buffer)
+            for sentence in sentences:
+                async with aclosing(self.synthesize_stream(sentence.strip())) as pieces:
+                    async for audio in pieces:
+                        yield audio
+
+        if buffer.strip():
+            async with aclosing(self.synthesize_stream(buffer.strip())) as pieces:
+                async for audio in pieces:
+                    yield audio
+
+    def prepare(self):
+        """
+        Start acquiring resources (e.g. a network connection) for the next
+        synthesis. Optional; the default does nothing.
+        """
+        pass
     
     @abstractmethod
     def get_audio_format(self) -> dict: